@@ -1,7 +1,11 @@
+import time
+_IMPORT_STARTED = time.perf_counter()
+
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
 from flask_login import LoginManager
+from loguru import logger
 from config import get_config
 
 # 初始化数据库
@@ -10,17 +14,46 @@ db = SQLAlchemy()
 # 初始化登录管理器
 login_manager = LoginManager()
 
+# 导入 app 包（Flask、SQLAlchemy 等依赖）的耗时
+_IMPORT_TIME = time.perf_counter() - _IMPORT_STARTED
+
+
+class StartupTimer:
+    """
+    启动耗时统计：按阶段记录 create_app 各步骤的耗时
+    """
+
+    def __init__(self):
+        self.phases = [('import', _IMPORT_TIME)]
+        self._last = time.perf_counter()
+
+    def mark(self, name):
+        """
+        记录从上一个阶段结束到现在的耗时
+        """
+        now = time.perf_counter()
+        self.phases.append((name, now - self._last))
+        self._last = now
+
+    def report(self):
+        total = sum(elapsed for _, elapsed in self.phases)
+        parts = ' '.join(f'{name}={elapsed * 1000:.1f}ms' for name, elapsed in self.phases)
+        return f'启动耗时 {total * 1000:.1f}ms | {parts}'
+
+
 def create_app():
     """
     创建并配置Flask应用
     Returns:
         app: Flask应用实例
     """
+    timer = StartupTimer()
     app = Flask(__name__)
 
     # 加载配置
     app.config.from_object(get_config())
-    
+    timer.mark('config')
+
     # 初始化CORS
     CORS(app,
          supports_credentials=True,  # 允许携带凭证
@@ -28,28 +61,63 @@ def create_app():
              "http://localhost:5173",
          ],  # 明确指定允许的源
          methods=["GET", "POST", "PUT", "DELETE"],  # 允许的方法
-         allow_headers=["Content-Type", "Authorization"]  # 允许的请求头
+         allow_headers=["Content-Type", "Authorization"],  # 允许的请求头
+         expose_headers=["X-Next-Cursor", "ETag"]  # 允许前端读取的响应头（分页游标、ETag）
         )
-    
+
     # 初始化SQLAlchemy
     db.init_app(app)
 
-    with app.app_context():
-        from app.models import RoleGroup, User, Report
-        db.create_all()
-        print('数据库表创建完成')
-
     # 初始化登录管理器
     login_manager.init_app(app)
-    
-    # 注册蓝图
+    timer.mark('extensions')
+
+    # 注册蓝图（同时导入全部模型和服务）
     from app.routes import register_routes
     register_routes(app)
-    
-    # 用户加载回调
+    timer.mark('routes')
+
+    # 开发环境启动时建表；生产环境以 Alembic 迁移为准（DB_CREATE_ALL=False），启动时不访问数据库
+    if app.config.get('DB_CREATE_ALL', True):
+        with app.app_context():
+            from app.models import RoleGroup, User, Report
+            db.create_all()
+        logger.info('数据库表创建完成')
+        timer.mark('create_all')
+
+    # 请求日志（JSON行，后台线程写入）
+    from app.utils.request_log import init_request_logging
+    init_request_logging(app)
+
+    # 运行指标（/metrics）
+    from app.utils.metrics import init_metrics
+    init_metrics(app)
+
+    # SQL预算与N+1检查
+    from app.utils.query_budget import init_query_budget
+    init_query_budget(app)
+    timer.mark('hooks')
+
+    # 注册命令行命令
+    from app.cli import register_commands
+    register_commands(app)
+    timer.mark('cli')
+
+    # 用户加载回调：返回缓存的用户快照，命中时不查询用户表；已停用的用户视为未登录
     @login_manager.user_loader
     def load_user(user_id):
-        from app.models.user import User
-        return User.query.get(int(user_id))
-    
-    return app 
\ No newline at end of file
+        from app.services.principal_service import PrincipalService
+        principal = PrincipalService.get(int(user_id))
+        return principal if principal is not None and principal.is_active else None
+
+    # 令牌认证：会话中没有用户时，从 Authorization: Bearer 请求头解析
+    @login_manager.request_loader
+    def load_user_from_request(request):
+        from app.services.token_service import TokenService
+        return TokenService.load_request_principal(request)
+
+    app.extensions['startup_timer'] = timer
+    if app.config.get('STARTUP_TIMING'):
+        logger.info(timer.report())
+
+    return app
@@ -0,0 +1,90 @@
+import click
+from app.services.dingtalk_client import DingtalkError
+from app.services.directory_sync_service import DirectorySyncService
+from app.services.report_import_service import ReportImportService, ReportImportError, FORMATS
+
+
+def register_commands(app):
+    """
+    注册 flask 命令行命令
+    Args:
+        app: Flask应用实例
+    """
+
+    @app.cli.command('import-reports')
+    @click.argument('path', type=click.Path(exists=True, dir_okay=False))
+    @click.option('--format', 'fmt', type=click.Choice(FORMATS), help='文件格式，未指定时按扩展名推断')
+    @click.option('--batch-size', type=int, default=None, help='每条upsert语句的行数')
+    def import_reports(path, fmt, batch_size):
+        """
+        从CSV/JSONL文件批量导入报表（按powerbi_id新增或更新）
+        """
+        fmt = fmt or ReportImportService.detect_format(path)
+        if not fmt:
+            raise click.UsageError('无法根据扩展名识别文件格式，请使用 --format 指定')
+        with open(path, encoding='utf-8-sig') as f:
+            text = f.read()
+        try:
+            rows = ReportImportService.parse(text, fmt)
+        except ReportImportError as e:
+            raise click.ClickException(str(e))
+
+        summary = ReportImportService.import_reports(rows, batch_size=batch_size)
+        for result in summary['results']:
+            if result['status'] in ('failed', 'skipped'):
+                click.echo(f"第{result['line']}行 {result['status']}: {result['error']}", err=True)
+        click.echo(f"新增 {summary['created']}，更新 {summary['updated']}，"
+                   f"失败 {summary['failed']}，跳过 {summary['skipped']}")
+
+    @app.cli.command('sync-directory')
+    @click.option('--full', is_flag=True, help='忽略上次同步记录，对全部成员与用户表做比较')
+    @click.option('--deactivate', is_flag=True, help='停用已离开组织或在钉钉中已停用的成员')
+    def sync_directory(full, deactivate):
+        """
+        从钉钉通讯录增量同步用户
+        """
+        try:
+            summary = DirectorySyncService.sync(full=full, deactivate=deactivate)
+        except DingtalkError as e:
+            raise click.ClickException(str(e))
+        click.echo(f"部门 {summary['departments']}，成员 {summary['members']}，变化 {summary['changed']}；"
+                   f"新增 {summary['created']}，绑定 {summary['bound']}，更新 {summary['updated']}，"
+                   f"停用 {summary['deactivated']}，耗时 {summary['elapsed']}s")
+
+    @app.cli.command('seed-bench')
+    @click.option('--scale', type=click.Choice(['small', 'medium', 'large']), default=None,
+                  help='预设规模，单独指定的数量优先')
+    @click.option('--users', type=int, default=None, help='用户数')
+    @click.option('--role-groups', type=int, default=None, help='角色组数')
+    @click.option('--reports', type=int, default=None, help='报表数')
+    @click.option('--tags', type=int, default=None, help='标签数')
+    @click.option('--seed', type=int, default=42, help='随机种子')
+    @click.option('--reset', is_flag=True, help='先清空并重建全部表')
+    def seed_bench(scale, users, role_groups, reports, tags, seed, reset):
+        """
+        生成基准测试数据（只用于基准测试数据库）
+        """
+        import time
+        from app import db
+        from app.models.user import User
+        from benchmarks.seed import SCALES, seed_database, reset_database
+
+        preset = SCALES[scale or 'large']
+        if reset:
+            if not click.confirm(f"将清空数据库 {app.config['SQLALCHEMY_DATABASE_URI']} 中的全部数据，继续？"):
+                return
+            reset_database()
+        elif db.session.query(User.id).first() is not None:
+            raise click.ClickException('数据库中已有数据，请使用 --reset 或换一个空数据库')
+
+        started = time.perf_counter()
+        counts = seed_database(
+            users=users or preset['users'],
+            role_groups=role_groups or preset['role_groups'],
+            reports=reports or preset['reports'],
+            tags=tags or preset['tags'],
+            seed=seed,
+            echo=click.echo
+        )
+        click.echo(f"完成，耗时 {time.perf_counter() - started:.1f}s：" +
+                   '，'.join(f'{table} {count}' for table, count in counts.items()))
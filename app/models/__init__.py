@@ -8,3 +8,6 @@ from .user_role_group import UserRoleGroup
 from .report import Report
 from .tag import Tag
 from .report_tags import report_tags
+from .catalog_version import CatalogVersion
+from .token_revocation import TokenRevocation
+from .sync_state import SyncState
@@ -0,0 +1,23 @@
+from app import db
+
+
+class CatalogVersion(db.Model):
+    """
+    数据版本模型
+    每个数据范围（报表、角色组、用户）一行，任何写操作都会递增对应范围的版本号，
+    用于生成ETag以及判断各类缓存是否过期
+    """
+    __tablename__ = 'catalog_versions'
+
+    scope = db.Column(db.String(30), primary_key=True, comment='数据范围')
+    version = db.Column(db.BigInteger, nullable=False, default=0, comment='版本号')
+    updated_at = db.Column(db.DateTime, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp(), comment='更新时间')
+
+    def __repr__(self):
+        """
+        返回数据版本对象的字符串表示
+
+        Returns:
+            str: 数据版本对象的字符串表示
+        """
+        return f'<CatalogVersion {self.scope}={self.version}>'
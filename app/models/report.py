@@ -23,6 +23,13 @@ class Report(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)  # 创建时间
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)  # 更新时间
 
+    # 列表过滤与游标分页使用的索引；powerbi_id 唯一，批量导入按其 upsert
+    __table_args__ = (
+        db.Index('ix_reports_name_id', 'name', 'id'),
+        db.Index('ix_reports_created_at_id', 'created_at', 'id'),
+        db.Index('uq_reports_powerbi_id', 'powerbi_id', unique=True),
+    )
+
     # 关系定义
     tags = db.relationship('Tag', secondary='report_tags', backref='reports')
 
@@ -4,5 +4,7 @@ from app import db
 report_tags = db.Table('report_tags',
     db.Column('report_id', db.Integer, db.ForeignKey('reports.id'), primary_key=True),
     db.Column('tag_id', db.Integer, db.ForeignKey('tags.id'), primary_key=True),
-    db.Column('created_at', db.DateTime, default=db.func.current_timestamp())
+    db.Column('created_at', db.DateTime, default=db.func.current_timestamp()),
+    # 主键已覆盖按报表查询，按标签反查需要单独索引
+    db.Index('ix_report_tags_tag_id', 'tag_id')
 )
\ No newline at end of file
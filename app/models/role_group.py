@@ -15,6 +15,12 @@ class RoleGroup(db.Model):
     created_at = db.Column(db.DateTime, default=db.func.current_timestamp(), comment='创建时间')
     updated_at = db.Column(db.DateTime, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp(), comment='更新时间')
 
+    # 列表过滤与游标分页使用的索引
+    __table_args__ = (
+        db.Index('ix_role_groups_name_id', 'name', 'id'),
+        db.Index('ix_role_groups_created_at_id', 'created_at', 'id'),
+    )
+
     # 与用户的关联关系
     users = db.relationship('User', secondary='user_role_groups', backref=db.backref('role_groups', lazy='dynamic'))
 
@@ -47,16 +53,18 @@ class RoleGroup(db.Model):
                 'created_at': self.created_at.isoformat() if self.created_at else None,
                 'updated_at': self.updated_at.isoformat() if self.updated_at else None
             }
+        users = self.users
+        report_ids = [report.id for report in self.visible_reports]
         return {
             'id': self.id,
             'name': self.name,
             'description': self.description,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-            'users': [user.to_dict() for user in self.users],  # 包含组内所有用户信息
-            'user_count': len(self.users),  # 用户数量
-            'reports': [report.id for report in self.visible_reports],  # 可见报表ID列表
-            'visible_reports': [report.id for report in self.visible_reports]  # 可见报表ID列表
+            'users': [user.to_dict() for user in users],  # 包含组内所有用户信息
+            'user_count': len(users),  # 用户数量
+            'reports': report_ids,  # 可见报表ID列表
+            'visible_reports': list(report_ids)  # 可见报表ID列表
         }
 
     def __repr__(self):
@@ -72,5 +80,7 @@ class RoleGroup(db.Model):
 # 关联表
 group_visible_reports = db.Table('group_visible_reports',
                                  db.Column('group_id', db.Integer, db.ForeignKey('role_groups.id'), primary_key=True),
-                                 db.Column('report_id', db.Integer, db.ForeignKey('reports.id'), primary_key=True)
+                                 db.Column('report_id', db.Integer, db.ForeignKey('reports.id'), primary_key=True),
+                                 # 主键已覆盖按角色组查询，按报表反查需要单独索引
+                                 db.Index('ix_group_visible_reports_report_id', 'report_id')
                                  )
\ No newline at end of file
@@ -0,0 +1,22 @@
+from app import db
+
+
+class SyncState(db.Model):
+    """
+    同步任务状态
+    以键值形式保存各同步任务的高水位标记（上次同步时间、通讯录快照摘要等）
+    """
+    __tablename__ = 'sync_states'
+
+    key = db.Column(db.String(64), primary_key=True, comment='状态键')
+    value = db.Column(db.Text, nullable=True, comment='状态值（JSON）')
+    updated_at = db.Column(db.DateTime, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp(), comment='更新时间')
+
+    def __repr__(self):
+        """
+        返回同步状态对象的字符串表示
+
+        Returns:
+            str: 同步状态对象的字符串表示
+        """
+        return f'<SyncState {self.key}>'
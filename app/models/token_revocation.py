@@ -0,0 +1,23 @@
+from app import db
+
+
+class TokenRevocation(db.Model):
+    """
+    访问令牌吊销记录
+    key 为 'jti:<令牌ID>'（吊销单个令牌）或 'user:<用户ID>'（吊销该用户在 revoked_at 之前签发的全部令牌），
+    过期时间之后对应令牌本身已失效，记录可以清理
+    """
+    __tablename__ = 'token_revocations'
+
+    key = db.Column(db.String(64), primary_key=True, comment='吊销键')
+    revoked_at = db.Column(db.Float, nullable=False, comment='吊销时间（Unix时间戳）')
+    expires_at = db.Column(db.Float, nullable=False, index=True, comment='记录过期时间（Unix时间戳）')
+
+    def __repr__(self):
+        """
+        返回吊销记录的字符串表示
+
+        Returns:
+            str: 吊销记录的字符串表示
+        """
+        return f'<TokenRevocation {self.key}>'
@@ -2,6 +2,26 @@ from app import db
 from flask_login import UserMixin
 from datetime import datetime
 
+# 各角色的权限映射（管理员和编辑者拥有所有权限）
+PERMISSION_MAP = {
+    'user': ['view_reports'],  # 普通用户只能查看报表
+}
+
+
+def role_has_permission(role, permission):
+    """
+    检查角色是否具有特定权限
+    Args:
+        role (str): 用户角色
+        permission (str): 需要检查的权限名称
+    Returns:
+        bool: 是否具有权限
+    """
+    if role == 'admin' or role == 'editor':
+        return True
+    return permission in PERMISSION_MAP.get(role, [])
+
+
 class User(UserMixin, db.Model):
     """
     用户模型类
@@ -17,13 +37,19 @@ class User(UserMixin, db.Model):
     email = db.Column(db.String(120))  # 用户邮箱
     
     # 用户权限相关字段
-    role = db.Column(db.String(20), default='user')  # 用户角色：admin-管理员, editor-编辑者, user-普通用户
+    role = db.Column(db.String(20), default='user', index=True)  # 用户角色：admin-管理员, editor-编辑者, user-普通用户
     is_active = db.Column(db.Boolean, default=True)  # 用户是否激活
     
     # 时间相关字段
     created_at = db.Column(db.DateTime, default=datetime.utcnow)  # 用户创建时间
     last_login = db.Column(db.DateTime)  # 最后登录时间
 
+    # 列表过滤与游标分页使用的索引
+    __table_args__ = (
+        db.Index('ix_users_name_id', 'name', 'id'),
+        db.Index('ix_users_created_at_id', 'created_at', 'id'),
+    )
+
     def has_permission(self, permission):
         """
         检查用户是否具有特定权限
@@ -32,16 +58,7 @@ class User(UserMixin, db.Model):
         Returns:
             bool: 是否具有权限
         """
-        # 管理员和编辑者拥有所有权限
-        if self.role == 'admin' or self.role == 'editor':
-            return True
-        
-        # 定义各角色的权限映射
-        permission_map = {
-            'user': ['view_reports'],  # 普通用户只能查看报表
-        }
-        
-        return permission in permission_map.get(self.role, [])
+        return role_has_permission(self.role, permission)
 
     def to_dict(self):
         """
@@ -75,10 +92,7 @@ class User(UserMixin, db.Model):
         if self.role == 'admin':
             return True
             
-        # 检查用户的角色组是否可以查看该报表
-        for role_group in self.role_groups:
-            if report in role_group.visible_reports:
-                return True
-                
-        return False
+        # 检查报表是否在用户角色组的可见报表集合中（集合已预先计算并缓存）
+        from app.services.visibility_service import VisibilityService
+        return report.id in VisibilityService.get_visible_report_ids(self.id)
 
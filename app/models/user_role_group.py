@@ -8,8 +8,8 @@ class UserRoleGroup(db.Model):
     __tablename__ = 'user_role_groups'
     
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False, comment='用户ID')
-    role_group_id = db.Column(db.Integer, db.ForeignKey('role_groups.id', ondelete='CASCADE'), nullable=False, comment='角色组ID')
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True, comment='用户ID')
+    role_group_id = db.Column(db.Integer, db.ForeignKey('role_groups.id', ondelete='CASCADE'), nullable=False, index=True, comment='角色组ID')
     created_at = db.Column(db.DateTime, default=db.func.current_timestamp(), comment='创建时间')
     
     # 添加唯一约束，确保一个用户在一个角色组中只能出现一次
@@ -0,0 +1,7 @@
+# 只读查询包初始化文件
+# 列表接口使用的只读查询层，基于SQLAlchemy Core查询并返回轻量记录对象
+
+from app.queries.records import ReportRecord, UserRecord, RoleGroupRecord
+from app.queries.report_query import ReportQuery
+from app.queries.user_query import UserQuery
+from app.queries.role_group_query import RoleGroupQuery
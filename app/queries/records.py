@@ -0,0 +1,126 @@
+from datetime import datetime
+from typing import NamedTuple, Optional, Tuple
+
+# 未加载字段的占位符（例如列表查询默认不加载报表描述）
+UNLOADED = object()
+
+
+class RoleGroupRecord(NamedTuple):
+    """
+    角色组只读记录
+    users / visible_report_ids 为None时表示未加载，只输出简要信息；
+    摘要模式只加载 user_count / report_count，不包含成员和报表列表
+    """
+    id: int
+    name: str
+    description: Optional[str]
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+    users: Optional[Tuple['UserRecord', ...]] = None
+    visible_report_ids: Optional[Tuple[int, ...]] = None
+    user_count: Optional[int] = None
+    report_count: Optional[int] = None
+
+    def to_dict(self, simple=False):
+        """
+        转换为字典，格式与 RoleGroup.to_dict 保持一致
+
+        Returns:
+            dict: 包含角色组信息的字典
+        """
+        data = {
+            'id': self.id,
+            'name': self.name,
+            'description': self.description,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+        if simple:
+            return data
+        if self.users is None:
+            if self.user_count is not None:
+                data.update({'user_count': self.user_count, 'report_count': self.report_count})
+            return data
+        report_ids = list(self.visible_report_ids or ())
+        data.update({
+            'users': [user.to_dict() for user in self.users],
+            'user_count': len(self.users),
+            'reports': report_ids,
+            'visible_reports': report_ids
+        })
+        return data
+
+
+class UserRecord(NamedTuple):
+    """
+    用户只读记录
+    """
+    id: int
+    dingtalk_id: Optional[str]
+    name: Optional[str]
+    email: Optional[str]
+    role: Optional[str]
+    is_active: Optional[bool]
+    created_at: Optional[datetime]
+    last_login: Optional[datetime]
+    role_groups: Tuple[RoleGroupRecord, ...] = ()
+
+    def to_dict(self):
+        """
+        转换为字典，格式与 User.to_dict 保持一致
+
+        Returns:
+            dict: 包含用户信息的字典
+        """
+        return {
+            'id': self.id,
+            'name': self.name,
+            'email': self.email,
+            'is_bind': not self.dingtalk_id == self.name,
+            'role': self.role,
+            'is_active': self.is_active,
+            'created_at': self.created_at,
+            'last_login': self.last_login if self.last_login else None,
+            'role_groups': [group.to_dict(simple=True) for group in self.role_groups]
+        }
+
+
+class ReportRecord(NamedTuple):
+    """
+    报表只读记录
+    description为UNLOADED时表示查询未加载该字段，输出中将不包含它
+    is_view为None时表示未计算可见标记
+    """
+    id: int
+    name: str
+    description: Optional[str]
+    powerbi_id: str
+    is_active: Optional[bool]
+    is_hide_report: Optional[bool]
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+    tags: Tuple[str, ...] = ()
+    is_view: Optional[bool] = None
+
+    def to_dict(self, need_pbi_id=False):
+        """
+        转换为字典，格式与 Report.to_dict 保持一致
+
+        Returns:
+            dict: 包含报表信息的字典
+        """
+        data = {
+            'id': self.id,
+            'name': self.name,
+            'powerbi_id': self.powerbi_id if need_pbi_id else None,
+            'is_active': self.is_active,
+            'is_hide_report': self.is_hide_report,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
+            'tags': list(self.tags)
+        }
+        if self.description is not UNLOADED:
+            data['description'] = self.description
+        if self.is_view is not None:
+            data['is_view'] = self.is_view
+        return data
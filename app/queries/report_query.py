@@ -0,0 +1,256 @@
+from sqlalchemy import select, exists, true, false, func
+from app import db
+from app.models.report import Report
+from app.models.tag import Tag
+from app.models.report_tags import report_tags
+from app.models.role_group import group_visible_reports
+from app.models.user_role_group import UserRoleGroup
+from app.queries.records import ReportRecord, UNLOADED
+
+reports_table = Report.__table__
+tags_table = Tag.__table__
+user_role_groups_table = UserRoleGroup.__table__
+
+
+class ReportQuery:
+    """
+    报表只读查询
+    直接使用SQLAlchemy Core查询，返回轻量的 ReportRecord，不经过ORM对象
+    """
+
+    @staticmethod
+    def is_view_clause(role, user_id):
+        """
+        构造报表可见标记的SQL表达式
+
+        Args:
+            role: 当前用户角色，未登录时为None
+            user_id: 当前用户ID
+
+        Returns:
+            ColumnElement: 布尔表达式
+        """
+        if role == 'admin':
+            return true()
+        if user_id is None:
+            return false()
+        return exists().where(
+            group_visible_reports.c.report_id == reports_table.c.id,
+            group_visible_reports.c.group_id == user_role_groups_table.c.role_group_id,
+            user_role_groups_table.c.user_id == user_id
+        )
+
+    @staticmethod
+    def listing_filters(role):
+        """
+        构造报表列表的角色过滤条件
+        管理员和编辑者可以看到全部报表，普通用户只能看到已激活且未隐藏的报表
+
+        Args:
+            role: 当前用户角色
+
+        Returns:
+            list: WHERE条件列表
+        """
+        if role in ('admin', 'editor'):
+            return []
+        return [
+            reports_table.c.is_active == True,
+            func.coalesce(reports_table.c.is_hide_report, False) == False
+        ]
+
+    # 可排序字段（均有索引支撑）
+    SORT_COLUMNS = {
+        'id': reports_table.c.id,
+        'name': reports_table.c.name,
+        'created_at': reports_table.c.created_at
+    }
+
+    @staticmethod
+    def filters(is_active=None, tag=None, group_id=None, name=None, not_in_group_id=None, tags=None, tag_mode='and'):
+        """
+        构造报表列表的过滤条件
+
+        Args:
+            is_active: 是否激活
+            tag: 标签名称
+            tags: 标签名称列表（多标签过滤）
+            tag_mode: 多标签的组合方式，'and'-包含全部标签，'or'-包含任一标签
+            group_id: 只返回该角色组可见的报表
+            name: 报表名称前缀
+            not_in_group_id: 只返回不在该角色组可见列表中的报表
+
+        Returns:
+            list: WHERE条件列表
+        """
+        clauses = []
+        if is_active is not None:
+            clauses.append(reports_table.c.is_active == is_active)
+        if tag:
+            # 列表查询本身会外连接标签表，这里使用别名避免子查询被自动关联
+            filter_report_tags = report_tags.alias('filter_report_tags')
+            filter_tags = tags_table.alias('filter_tags')
+            clauses.append(exists().where(
+                filter_report_tags.c.report_id == reports_table.c.id,
+                filter_report_tags.c.tag_id == filter_tags.c.id,
+                filter_tags.c.name == tag
+            ))
+        if tags:
+            clauses.append(ReportQuery.tags_clause(tags, tag_mode))
+        if group_id is not None:
+            clauses.append(exists().where(
+                group_visible_reports.c.report_id == reports_table.c.id,
+                group_visible_reports.c.group_id == group_id
+            ))
+        if not_in_group_id is not None:
+            clauses.append(~exists().where(
+                group_visible_reports.c.report_id == reports_table.c.id,
+                group_visible_reports.c.group_id == not_in_group_id
+            ))
+        if name:
+            clauses.append(reports_table.c.name.startswith(name, autoescape=True))
+        return clauses
+
+    @staticmethod
+    def tags_clause(tags, mode='and'):
+        """
+        多标签过滤条件
+        and模式通过 GROUP BY ... HAVING COUNT(DISTINCT tag_id) = 标签数 求交集，or模式求并集
+
+        Args:
+            tags: 标签名称列表
+            mode: 'and' 或 'or'
+
+        Returns:
+            ColumnElement: WHERE条件
+        """
+        tags = set(tags)
+        filter_report_tags = report_tags.alias('facet_report_tags')
+        filter_tags = tags_table.alias('facet_tags')
+        matched = select(filter_report_tags.c.report_id) \
+            .join(filter_tags, filter_tags.c.id == filter_report_tags.c.tag_id) \
+            .where(filter_tags.c.name.in_(tags))
+        if mode == 'and':
+            matched = matched.group_by(filter_report_tags.c.report_id) \
+                .having(func.count(func.distinct(filter_report_tags.c.tag_id)) == len(tags))
+        return reports_table.c.id.in_(matched)
+
+    @staticmethod
+    def tag_counts(where=()):
+        """
+        统计满足条件的报表中各标签的出现次数（一条聚合SQL）
+
+        Args:
+            where: 报表的WHERE条件
+
+        Returns:
+            list: [(标签名称, 报表数量)]，按数量降序、名称升序排列
+        """
+        count = func.count(func.distinct(reports_table.c.id))
+        stmt = select(tags_table.c.name, count.label('count')) \
+            .select_from(tags_table) \
+            .join(report_tags, report_tags.c.tag_id == tags_table.c.id) \
+            .join(reports_table, reports_table.c.id == report_tags.c.report_id) \
+            .where(*where) \
+            .group_by(tags_table.c.id, tags_table.c.name) \
+            .order_by(count.desc(), tags_table.c.name)
+        return [(row.name, row.count) for row in db.session.execute(stmt)]
+
+    @staticmethod
+    def list_reports(where=(), page=None, with_description=False, is_view=None):
+        """
+        查询报表列表
+        报表、标签和可见标记在同一条SQL中查出，再按报表ID组装；
+        分页时先在子查询中按键集取出当前页的报表ID，再连接标签
+
+        Args:
+            where: WHERE条件
+            page: 分页请求 PageRequest，None表示按ID排序返回全部
+            with_description: 是否加载描述字段
+            is_view: 可见标记表达式（见 is_view_clause），None表示不计算
+
+        Returns:
+            list: ReportRecord 列表
+        """
+        return list(ReportQuery.iter_reports(where, page, with_description, is_view))
+
+    @staticmethod
+    def iter_reports(where=(), page=None, with_description=False, is_view=None, yield_per=None):
+        """
+        逐条生成报表记录，参数同 list_reports
+        指定yield_per时使用服务端游标分批读取，内存占用与结果总数无关
+
+        Args:
+            yield_per: 每批从数据库读取的行数，None表示一次读取全部
+
+        Yields:
+            ReportRecord: 报表记录
+        """
+        columns = [
+            reports_table.c.id,
+            reports_table.c.name,
+            reports_table.c.powerbi_id,
+            reports_table.c.is_active,
+            reports_table.c.is_hide_report,
+            reports_table.c.created_at,
+            reports_table.c.updated_at,
+            tags_table.c.name.label('tag_name')
+        ]
+        if with_description:
+            columns.append(reports_table.c.description)
+        if is_view is not None:
+            columns.append(is_view.label('is_view'))
+
+        stmt = select(*columns).select_from(reports_table)
+        if page is not None and page.limit is not None:
+            page_ids = page.apply(
+                select(reports_table.c.id).where(*where), ReportQuery.SORT_COLUMNS, reports_table.c.id
+            ).subquery()
+            stmt = stmt.join(page_ids, page_ids.c.id == reports_table.c.id)
+        else:
+            stmt = stmt.where(*where)
+
+        order_by = page.order_by(ReportQuery.SORT_COLUMNS, reports_table.c.id) if page else [reports_table.c.id]
+        stmt = stmt \
+            .outerjoin(report_tags, report_tags.c.report_id == reports_table.c.id) \
+            .outerjoin(tags_table, tags_table.c.id == report_tags.c.tag_id) \
+            .order_by(*order_by)
+        if yield_per:
+            stmt = stmt.execution_options(yield_per=yield_per)
+
+        return ReportQuery._assemble(db.session.execute(stmt), with_description, is_view is not None)
+
+    @staticmethod
+    def _assemble(rows, with_description, with_is_view):
+        """
+        把 报表 x 标签 的连接结果折叠为每个报表一条记录
+        结果按报表排序，同一报表的行相邻，因此可以边读边生成
+        """
+        head = None
+        tags = []
+        for row in rows:
+            if head is not None and row.id != head.id:
+                yield ReportQuery._record(head, tags, with_description, with_is_view)
+                head = None
+            if head is None:
+                head = row
+                tags = []
+            if row.tag_name is not None:
+                tags.append(row.tag_name)
+        if head is not None:
+            yield ReportQuery._record(head, tags, with_description, with_is_view)
+
+    @staticmethod
+    def _record(row, tags, with_description, with_is_view):
+        return ReportRecord(
+            id=row.id,
+            name=row.name,
+            description=row.description if with_description else UNLOADED,
+            powerbi_id=row.powerbi_id,
+            is_active=row.is_active,
+            is_hide_report=row.is_hide_report,
+            created_at=row.created_at,
+            updated_at=row.updated_at,
+            tags=tuple(tags),
+            is_view=bool(row.is_view) if with_is_view else None
+        )
@@ -0,0 +1,188 @@
+from sqlalchemy import select, func
+from app import db
+from app.models.role_group import RoleGroup, group_visible_reports
+from app.models.user_role_group import UserRoleGroup
+from app.queries.records import RoleGroupRecord
+from app.queries.user_query import UserQuery, users_table
+
+role_groups_table = RoleGroup.__table__
+user_role_groups_table = UserRoleGroup.__table__
+
+
+class RoleGroupQuery:
+    """
+    角色组只读查询
+    直接使用SQLAlchemy Core查询，返回轻量的 RoleGroupRecord，不经过ORM对象
+    """
+
+    # 可排序字段（均有索引支撑）
+    SORT_COLUMNS = {
+        'id': role_groups_table.c.id,
+        'name': role_groups_table.c.name,
+        'created_at': role_groups_table.c.created_at
+    }
+
+    @staticmethod
+    def filters(name=None):
+        """
+        构造角色组列表的过滤条件
+
+        Args:
+            name: 角色组名称前缀
+
+        Returns:
+            list: WHERE条件列表
+        """
+        clauses = []
+        if name:
+            clauses.append(role_groups_table.c.name.startswith(name, autoescape=True))
+        return clauses
+
+    @staticmethod
+    def list_role_groups(where=(), page=None):
+        """
+        查询角色组列表（含成员和可见报表）
+        角色组、成员关系、成员用户、可见报表各一条SQL，查询次数与角色组数量无关
+
+        Args:
+            where: WHERE条件
+            page: 分页请求 PageRequest，None表示按ID排序返回全部
+
+        Returns:
+            list: RoleGroupRecord 列表
+        """
+        return list(RoleGroupQuery.iter_role_groups(where, page))
+
+    @staticmethod
+    def iter_role_groups(where=(), page=None, batch_size=None):
+        """
+        逐条生成角色组记录，参数同 list_role_groups
+        指定batch_size时按批读取角色组，每批再各用三条SQL加载成员和可见报表，
+        内存占用只与批大小有关
+
+        Args:
+            batch_size: 每批角色组数量，None表示一次加载全部
+
+        Yields:
+            RoleGroupRecord: 角色组记录
+        """
+        stmt = select(role_groups_table).where(*where)
+        if page is not None:
+            stmt = page.apply(stmt, RoleGroupQuery.SORT_COLUMNS, role_groups_table.c.id)
+        else:
+            stmt = stmt.order_by(role_groups_table.c.id)
+
+        if not batch_size:
+            group_rows = db.session.execute(stmt).all()
+            if group_rows:
+                yield from RoleGroupQuery._assemble_batch(group_rows)
+            return
+
+        # 批内的子查询会在同一连接上执行，先把本批角色组读完再加载关联数据
+        result = db.session.execute(stmt.execution_options(yield_per=batch_size))
+        for group_rows in result.partitions():
+            yield from RoleGroupQuery._assemble_batch(group_rows)
+
+    @staticmethod
+    def list_summaries(where=(), page=None):
+        """
+        查询角色组摘要列表（成员数、可见报表数）
+        两个关联表各自 GROUP BY 后与角色组外连接，一条SQL完成，与角色组大小无关；
+        成员和报表明细通过角色组的分页子资源获取
+
+        Args:
+            where: WHERE条件
+            page: 分页请求 PageRequest，None表示按ID排序返回全部
+
+        Returns:
+            list: RoleGroupRecord 列表（只含 user_count / report_count）
+        """
+        return list(RoleGroupQuery.iter_summaries(where, page))
+
+    @staticmethod
+    def iter_summaries(where=(), page=None, yield_per=None):
+        """
+        逐条生成角色组摘要记录，参数同 list_summaries
+
+        Args:
+            yield_per: 每批从数据库读取的行数，None表示一次读取全部
+
+        Yields:
+            RoleGroupRecord: 角色组摘要记录
+        """
+        user_counts = select(
+            user_role_groups_table.c.role_group_id.label('group_id'),
+            func.count(func.distinct(user_role_groups_table.c.user_id)).label('user_count')
+        ).group_by(user_role_groups_table.c.role_group_id).subquery('user_counts')
+        report_counts = select(
+            group_visible_reports.c.group_id,
+            func.count().label('report_count')
+        ).group_by(group_visible_reports.c.group_id).subquery('report_counts')
+
+        stmt = select(
+            role_groups_table,
+            func.coalesce(user_counts.c.user_count, 0).label('user_count'),
+            func.coalesce(report_counts.c.report_count, 0).label('report_count')
+        ).select_from(role_groups_table) \
+            .outerjoin(user_counts, user_counts.c.group_id == role_groups_table.c.id) \
+            .outerjoin(report_counts, report_counts.c.group_id == role_groups_table.c.id) \
+            .where(*where)
+        if page is not None:
+            stmt = page.apply(stmt, RoleGroupQuery.SORT_COLUMNS, role_groups_table.c.id)
+        else:
+            stmt = stmt.order_by(role_groups_table.c.id)
+        if yield_per:
+            stmt = stmt.execution_options(yield_per=yield_per)
+
+        for row in db.session.execute(stmt):
+            yield RoleGroupRecord(
+                id=row.id,
+                name=row.name,
+                description=row.description,
+                created_at=row.created_at,
+                updated_at=row.updated_at,
+                user_count=row.user_count,
+                report_count=row.report_count
+            )
+
+    @staticmethod
+    def _assemble_batch(group_rows):
+        """
+        为一批角色组加载成员和可见报表并组装记录
+        """
+        group_ids = [row.id for row in group_rows]
+
+        # 成员关系
+        member_ids = {row.id: {} for row in group_rows}
+        for group_id, user_id in db.session.execute(
+                select(user_role_groups_table.c.role_group_id, user_role_groups_table.c.user_id)
+                .where(user_role_groups_table.c.role_group_id.in_(group_ids))
+                .order_by(user_role_groups_table.c.id)):
+            member_ids[group_id][user_id] = None
+
+        # 成员用户（含其所属角色组）
+        members = UserQuery.list_users(where=[users_table.c.id.in_(
+            select(user_role_groups_table.c.user_id)
+            .where(user_role_groups_table.c.role_group_id.in_(group_ids))
+        )])
+        users_by_id = {user.id: user for user in members}
+
+        # 可见报表
+        report_ids = {row.id: [] for row in group_rows}
+        for group_id, report_id in db.session.execute(
+                select(group_visible_reports.c.group_id, group_visible_reports.c.report_id)
+                .where(group_visible_reports.c.group_id.in_(group_ids))):
+            report_ids[group_id].append(report_id)
+
+        return [
+            RoleGroupRecord(
+                id=row.id,
+                name=row.name,
+                description=row.description,
+                created_at=row.created_at,
+                updated_at=row.updated_at,
+                users=tuple(users_by_id[user_id] for user_id in member_ids[row.id] if user_id in users_by_id),
+                visible_report_ids=tuple(report_ids[row.id])
+            )
+            for row in group_rows
+        ]
@@ -0,0 +1,155 @@
+from sqlalchemy import select, exists
+from app import db
+from app.models.user import User
+from app.models.role_group import RoleGroup
+from app.models.user_role_group import UserRoleGroup
+from app.queries.records import UserRecord, RoleGroupRecord
+
+users_table = User.__table__
+role_groups_table = RoleGroup.__table__
+user_role_groups_table = UserRoleGroup.__table__
+
+
+class UserQuery:
+    """
+    用户只读查询
+    直接使用SQLAlchemy Core查询，返回轻量的 UserRecord，不经过ORM对象
+    """
+
+    # 可排序字段（均有索引支撑；姓名可为空，空值排在最后，见 PageRequest）
+    SORT_COLUMNS = {
+        'id': users_table.c.id,
+        'name': users_table.c.name,
+        'created_at': users_table.c.created_at
+    }
+
+    @staticmethod
+    def filters(role=None, is_active=None, group_id=None, name=None):
+        """
+        构造用户列表的过滤条件
+
+        Args:
+            role: 用户角色
+            is_active: 是否激活
+            group_id: 只返回该角色组的成员
+            name: 用户姓名前缀
+
+        Returns:
+            list: WHERE条件列表
+        """
+        clauses = []
+        if role:
+            clauses.append(users_table.c.role == role)
+        if is_active is not None:
+            clauses.append(users_table.c.is_active == is_active)
+        if group_id is not None:
+            # 列表查询本身会外连接成员关系表，这里使用别名避免子查询被自动关联
+            memberships = user_role_groups_table.alias('filter_user_role_groups')
+            clauses.append(exists().where(
+                memberships.c.user_id == users_table.c.id,
+                memberships.c.role_group_id == group_id
+            ))
+        if name:
+            clauses.append(users_table.c.name.startswith(name, autoescape=True))
+        return clauses
+
+    @staticmethod
+    def list_users(where=(), page=None):
+        """
+        查询用户列表
+        用户及其所属角色组在同一条SQL中查出，再按用户ID组装；
+        分页时先在子查询中按键集取出当前页的用户ID，再连接角色组
+
+        Args:
+            where: WHERE条件
+            page: 分页请求 PageRequest，None表示按ID排序返回全部
+
+        Returns:
+            list: UserRecord 列表
+        """
+        return list(UserQuery.iter_users(where, page))
+
+    @staticmethod
+    def iter_users(where=(), page=None, yield_per=None):
+        """
+        逐条生成用户记录，参数同 list_users
+        指定yield_per时使用服务端游标分批读取，内存占用与结果总数无关
+
+        Args:
+            yield_per: 每批从数据库读取的行数，None表示一次读取全部
+
+        Yields:
+            UserRecord: 用户记录
+        """
+        stmt = select(
+            users_table.c.id,
+            users_table.c.dingtalk_id,
+            users_table.c.name,
+            users_table.c.email,
+            users_table.c.role,
+            users_table.c.is_active,
+            users_table.c.created_at,
+            users_table.c.last_login,
+            role_groups_table.c.id.label('group_id'),
+            role_groups_table.c.name.label('group_name'),
+            role_groups_table.c.description.label('group_description'),
+            role_groups_table.c.created_at.label('group_created_at'),
+            role_groups_table.c.updated_at.label('group_updated_at')
+        ).select_from(users_table)
+        if page is not None and page.limit is not None:
+            page_ids = page.apply(
+                select(users_table.c.id).where(*where), UserQuery.SORT_COLUMNS, users_table.c.id
+            ).subquery()
+            stmt = stmt.join(page_ids, page_ids.c.id == users_table.c.id)
+        else:
+            stmt = stmt.where(*where)
+
+        order_by = page.order_by(UserQuery.SORT_COLUMNS, users_table.c.id) if page else [users_table.c.id]
+        stmt = stmt \
+            .outerjoin(user_role_groups_table, user_role_groups_table.c.user_id == users_table.c.id) \
+            .outerjoin(role_groups_table, role_groups_table.c.id == user_role_groups_table.c.role_group_id) \
+            .order_by(*order_by, role_groups_table.c.id)
+        if yield_per:
+            stmt = stmt.execution_options(yield_per=yield_per)
+
+        return UserQuery._assemble(db.session.execute(stmt))
+
+    @staticmethod
+    def _assemble(rows):
+        """
+        把 用户 x 角色组 的连接结果折叠为每个用户一条记录
+        结果按用户排序，同一用户的行相邻，因此可以边读边生成
+        """
+        head = None
+        groups = {}
+        for row in rows:
+            if head is not None and row.id != head.id:
+                yield UserQuery._record(head, groups)
+                head = None
+            if head is None:
+                head = row
+                groups = {}
+            if row.group_id is not None and row.group_id not in groups:
+                groups[row.group_id] = RoleGroupRecord(
+                    id=row.group_id,
+                    name=row.group_name,
+                    description=row.group_description,
+                    created_at=row.group_created_at,
+                    updated_at=row.group_updated_at
+                )
+        if head is not None:
+            yield UserQuery._record(head, groups)
+
+    @staticmethod
+    def _record(row, groups):
+        return UserRecord(
+            id=row.id,
+            dingtalk_id=row.dingtalk_id,
+            name=row.name,
+            email=row.email,
+            role=row.role,
+            is_active=row.is_active,
+            created_at=row.created_at,
+            last_login=row.last_login,
+            role_groups=tuple(groups.values())
+        )
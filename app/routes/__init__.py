@@ -2,6 +2,8 @@ from app.routes.reports import reports
 from app.routes.auth import auth
 from app.routes.role_groups import role_groups
 from app.routes.users import users
+from app.routes.system import system
+from app.utils.pagination import PaginationError
 
 def register_routes(app):
     """
@@ -16,4 +18,11 @@ def register_routes(app):
     # 注册角色组相关路由
     app.register_blueprint(role_groups)
     # 注册用户相关路由
-    app.register_blueprint(users)
\ No newline at end of file
+    app.register_blueprint(users)
+    # 注册系统运行状态相关路由
+    app.register_blueprint(system)
+
+    # 分页/过滤参数错误统一返回400
+    @app.errorhandler(PaginationError)
+    def pagination_error(error):
+        return {'error': str(error)}, 400
\ No newline at end of file
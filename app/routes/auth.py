@@ -1,6 +1,12 @@
 from flask import Blueprint, jsonify, request
 from flask_login import login_user, logout_user, login_required, current_user
 from app.services.auth_service import DingtalkAuthService
+from app.services.dingtalk_client import DingtalkUnavailable
+from app.services.catalog_version_service import CatalogVersionService
+from app.utils.http_cache import conditional_get
+from app.services.principal_service import PrincipalService
+from app.services.token_service import TokenService, TokenError, REFRESH
+from flask import current_app
 from urllib.parse import urlencode
 from config import Config
 from loguru import logger
@@ -38,6 +44,11 @@ def dingtalk_callback():
     if not code:
         return jsonify({'error': '无效的请求'}), 400
 
+    # auth_mode为token时签发访问令牌，不建立cookie会话（需启用令牌认证）
+    token_mode = request.json.get('auth_mode') == 'token'
+    if token_mode and not current_app.config.get('TOKEN_AUTH_ENABLED'):
+        return jsonify({'error': '未启用令牌认证'}), 400
+
     try:
         # 获取用户信息
         user_info = DingtalkAuthService.get_user_info(code)
@@ -46,12 +57,21 @@ def dingtalk_callback():
 
         # 登录或创建用户
         user = DingtalkAuthService.login_or_create_user(user_info)
+        if token_mode:
+            return jsonify({
+                'message': '登录成功',
+                'user': user.to_dict(),
+                **TokenService.issue(PrincipalService.get(user.id))
+            })
         login_user(user)
 
         return jsonify({
             'message': '登录成功',
             'user': user.to_dict()
         })
+    except DingtalkUnavailable as e:
+        logger.error(f"钉钉登录失败: {str(e)}")
+        return jsonify({'error': str(e)}), 503
     except Exception as e:
         logger.error(f"钉钉登录失败: {str(e)}")
         return jsonify({'error': str(e)}), 500
@@ -65,11 +85,53 @@ def logout():
     Returns:
         dict: 包含登出结果的JSON响应
     """
+    # 令牌模式下吊销当前访问令牌，以及请求体中一并提交的刷新令牌
+    claims = getattr(current_user, 'claims', None)
+    refresh_token = (request.get_json(silent=True) or {}).get('refresh_token')
+    refresh_claims = None
+    if refresh_token:
+        try:
+            refresh_claims = TokenService.decode(refresh_token, REFRESH)
+        except TokenError:
+            pass
+    TokenService.revoke(claims, refresh_claims)
     logout_user()
     return jsonify({'message': '登出成功'})
 
+
+@auth.route('/api/auth/token/refresh', methods=['POST'])
+def refresh_token():
+    """
+    使用刷新令牌换取新的访问令牌和刷新令牌（旧的刷新令牌随即作废）
+
+    Request Body:
+        refresh_token: 刷新令牌
+
+    Returns:
+        dict: {access_token, refresh_token, token_type, expires_in}
+    """
+    if not current_app.config.get('TOKEN_AUTH_ENABLED'):
+        return jsonify({'error': '未启用令牌认证'}), 400
+    token = (request.get_json(silent=True) or {}).get('refresh_token')
+    if not token:
+        return jsonify({'error': '无效的请求'}), 400
+    try:
+        claims = TokenService.decode(token, REFRESH)
+    except TokenError as e:
+        return jsonify({'error': str(e)}), 401
+
+    # 按最新的用户信息签发，角色和角色组变更在刷新后生效
+    principal = PrincipalService.get(int(claims['sub']))
+    if principal is None or not principal.is_active:
+        return jsonify({'error': '用户不存在或已停用'}), 401
+    # 旧的刷新令牌只能换取一次：并发刷新时只有先写入吊销记录的请求签发新令牌
+    if not TokenService.consume(claims):
+        return jsonify({'error': '令牌已被吊销'}), 401
+    return jsonify(TokenService.issue(principal))
+
 @auth.route('/api/auth/user', methods=['GET'])
 @login_required
+@conditional_get(CatalogVersionService.USERS, CatalogVersionService.ROLE_GROUPS, vary='user')
 def get_current_user():
     """
     获取当前登录用户信息
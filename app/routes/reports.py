@@ -1,24 +1,108 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, current_app
 from app.services.report_service import ReportService
+from app.services.report_import_service import ReportImportService, ReportImportError
 from flask_login import login_required, current_user
-from app.utils.decorators import permission_required
+from app.utils.decorators import permission_required, check_report_access
+from app.utils.pagination import (parse_page_request, paginated_response, report_filter_args, get_int_arg,
+                                  PaginationError, parse_stream_arg, streamed_response)
+from app.queries.report_query import ReportQuery
+from app.services.catalog_version_service import CatalogVersionService
+from app.utils.http_cache import conditional_get
+from app.utils.query_budget import query_budget
 
 # 创建报表蓝图
 reports = Blueprint('reports', __name__)
 
 @reports.route('/api/reports', methods=['GET'])
+@query_budget(max_statements=8)
 @permission_required('view_reports')
+@conditional_get(CatalogVersionService.REPORTS, CatalogVersionService.ROLE_GROUPS, cache=True)
 def get_reports():
     """
     获取所有报表列表
     
+    Query Params:
+        description: 传入0/false时不返回报表描述，减少查询和响应体积
+        is_active / tag / group_id / name: 过滤条件（name为名称前缀）
+        limit / cursor / sort: 游标分页参数，下一页游标见响应头 X-Next-Cursor
+        stream: 传入1/true时流式输出全部报表（用于导出，不能与limit/cursor同时使用）
+
     Returns:
         JSON: 报表列表
     """
-    all_reports = ReportService.get_all_reports()
-    return jsonify(all_reports)
+    page = parse_page_request(request.args, ReportQuery.SORT_COLUMNS)
+    stream = parse_stream_arg(request.args, page)
+    with_description = request.args.get('description', 'true').lower() not in ('0', 'false')
+    all_reports = ReportService.get_all_reports(
+        filters=report_filter_args(request.args),
+        page=page,
+        with_description=with_description,
+        stream=stream
+    )
+    if stream:
+        return streamed_response(all_reports)
+    return paginated_response(all_reports, page)
+
+@reports.route('/api/reports/facets', methods=['GET'])
+@permission_required('view_reports')
+@conditional_get(CatalogVersionService.REPORTS, CatalogVersionService.ROLE_GROUPS, cache=True)
+def get_report_facets():
+    """
+    多标签分面查询：按多个标签过滤报表，并返回结果集中各标签的数量
+
+    Query Params:
+        tags: 标签名称，逗号分隔或重复传参
+        mode: and-包含全部标签（默认），or-包含任一标签
+        description / is_active / group_id / name: 同 /api/reports
+        limit / cursor / sort: 游标分页参数（只作用于报表列表），下一页游标见响应头 X-Next-Cursor
+
+    Returns:
+        JSON: {reports: 报表列表, facets: [{name, count}]}
+    """
+    page = parse_page_request(request.args, ReportQuery.SORT_COLUMNS)
+    mode = request.args.get('mode', 'and').lower()
+    if mode not in ('and', 'or'):
+        raise PaginationError('mode必须为and或or')
+    tags = [tag.strip() for value in request.args.getlist('tags') for tag in value.split(',') if tag.strip()]
+    filters = dict(report_filter_args(request.args), tags=tags, tag_mode=mode)
+    with_description = request.args.get('description', 'true').lower() not in ('0', 'false')
+
+    records, tag_counts = ReportService.get_report_facets(filters=filters, page=page, with_description=with_description)
+    records, next_cursor = page.split(records)
+    response = jsonify({
+        'reports': [record.to_dict() for record in records],
+        'facets': [{'name': name, 'count': count} for name, count in tag_counts]
+    })
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
+
+@reports.route('/api/reports/search', methods=['GET'])
+@permission_required('view_reports')
+def search_reports():
+    """
+    全文检索报表（名称、描述、标签）
+
+    Query Params:
+        q: 查询文本，中文按二元组匹配，英文按单词匹配
+        limit: 最多返回条数，默认20
+
+    Returns:
+        JSON: 按相关度排序的报表列表（含is_view和score）
+    """
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify([])
+    limit = get_int_arg(request.args, 'limit')
+    if limit is None:
+        limit = 20
+    elif limit <= 0:
+        raise PaginationError('limit必须大于0')
+    limit = min(limit, current_app.config.get('PAGE_MAX_LIMIT', 500))
+    return jsonify(ReportService.search_reports(query, limit=limit))
 
 @reports.route('/api/reports/<int:report_id>', methods=['GET'])
+@query_budget(max_statements=8)
 @permission_required(resource_type='report')
 def get_report(report_id):
     """
@@ -30,8 +114,9 @@ def get_report(report_id):
     Returns:
         JSON: 报表详情
     """
-    report = ReportService.get_report_by_id(report_id)
-    if current_user.can_view_report(report):
+    # 报表和可见性已在 permission_required 中加载并缓存到本次请求
+    report, visible = check_report_access(report_id)
+    if visible:
         return jsonify(report.to_dict())
     else:
         return jsonify({'error': '无该报表访问权限'}), 403
@@ -53,6 +138,40 @@ def create_report():
     return jsonify(report.to_dict()), 201
 
 
+@reports.route('/api/reports/import', methods=['POST'])
+@query_budget(max_repeats=None)  # 分批upsert会重复执行相同语句
+@permission_required(resource_type='edit_reports')
+def import_reports():
+    """
+    批量导入报表（CSV/JSONL），按 powerbi_id 新增或更新
+
+    文件通过 multipart 的 file 字段上传，或直接作为请求体发送；
+    CSV表头/JSONL字段: name, powerbi_id, description, is_active, is_hide_report, tags（多个标签用 | 或 , 分隔）
+
+    Query Params:
+        format: csv / jsonl，未传时根据文件名或Content-Type推断
+
+    Returns:
+        JSON: {created, updated, failed, skipped, results: 逐行结果}
+    """
+    upload = request.files.get('file')
+    if upload is not None:
+        content = upload.read()
+        fmt = request.args.get('format') or ReportImportService.detect_format(upload.filename, upload.mimetype)
+    else:
+        content = request.get_data()
+        fmt = request.args.get('format') or ReportImportService.detect_format(content_type=request.content_type)
+    if not fmt:
+        return jsonify({'error': '无法识别导入格式，请通过format参数指定csv或jsonl'}), 400
+    try:
+        rows = ReportImportService.parse(content.decode('utf-8-sig'), fmt.lower())
+    except UnicodeDecodeError:
+        return jsonify({'error': '文件必须为UTF-8编码'}), 400
+    except ReportImportError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(ReportImportService.import_reports(rows))
+
+
 @reports.route('/api/reports/<int:report_id>', methods=['POST'])
 @permission_required(resource_type='edit_reports')
 def update_report(report_id):
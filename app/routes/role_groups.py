@@ -2,25 +2,52 @@ from flask import Blueprint, request, jsonify
 from app import db
 from app.models import RoleGroup
 from app.utils.decorators import permission_required
+from app.utils.query_budget import query_budget
 from app.services.role_group_service import RoleGroupService
+from app.utils.pagination import (parse_page_request, paginated_response,
+                                  user_filter_args, report_filter_args, role_group_filter_args,
+                                  parse_stream_arg, streamed_response, PaginationError)
+from app.queries.user_query import UserQuery
+from app.queries.report_query import ReportQuery
+from app.queries.role_group_query import RoleGroupQuery
+from app.services.catalog_version_service import CatalogVersionService
+from app.utils.http_cache import conditional_get
 
 role_groups = Blueprint('role_groups', __name__)
 
 
 @role_groups.route('/api/role_groups', methods=['GET'])
+@query_budget(max_statements=8)
 @permission_required('view_role_groups')
+@conditional_get(CatalogVersionService.ROLE_GROUPS, CatalogVersionService.USERS, vary='role', cache=True)
 def get_role_groups():
     """
     获取所有角色组列表
     
+    Query Params:
+        name: 角色组名称前缀
+        limit / cursor / sort: 游标分页参数，下一页游标见响应头 X-Next-Cursor
+        stream: 传入1/true时流式输出全部角色组（用于导出，不能与limit/cursor同时使用）
+        view: summary-只返回成员数(user_count)和可见报表数(report_count)，
+              明细见 /api/role_groups/<id>/users 和 /api/role_groups/<id>/visible_reports
+
     Returns:
         JSON: 角色组列表
     """
-    all_role_groups = RoleGroupService.get_all_role_groups()
-    return jsonify([role_group.to_dict() for role_group in all_role_groups])
+    page = parse_page_request(request.args, RoleGroupQuery.SORT_COLUMNS)
+    stream = parse_stream_arg(request.args, page)
+    view = request.args.get('view', 'full')
+    if view not in ('full', 'summary'):
+        raise PaginationError('view必须为full或summary')
+    all_role_groups = RoleGroupService.get_all_role_groups(
+        filters=role_group_filter_args(request.args), page=page, stream=stream, summary=view == 'summary')
+    if stream:
+        return streamed_response(all_role_groups)
+    return paginated_response(all_role_groups, page)
 
 
 @role_groups.route('/api/role_groups/<int:group_id>', methods=['GET'])
+@query_budget(max_statements=8)
 @permission_required('view_role_groups')
 def get_role_group(group_id):
     """
@@ -32,7 +59,7 @@ def get_role_group(group_id):
     Returns:
         JSON: 角色组详情
     """
-    role_group = RoleGroupService.get_role_group_by_id(group_id)
+    role_group = RoleGroupService.get_role_group_detail(group_id)
     return jsonify(role_group.to_dict())
 
 
@@ -92,11 +119,18 @@ def get_group_users(group_id):
     Args:
         group_id: 角色组ID
         
+    Query Params:
+        role / is_active / name: 过滤条件（name为姓名前缀）
+        limit / cursor / sort: 游标分页参数，下一页游标见响应头 X-Next-Cursor
+
     Returns:
         JSON: 用户列表
     """
-    users = RoleGroupService.get_group_users(group_id)
-    return jsonify([user.to_dict() for user in users])
+    page = parse_page_request(request.args, UserQuery.SORT_COLUMNS)
+    filters = user_filter_args(request.args)
+    filters.pop('group_id')
+    users = RoleGroupService.get_group_users(group_id, filters=filters, page=page)
+    return paginated_response(users, page)
 
 
 @role_groups.route('/api/role_groups/<int:group_id>/users', methods=['POST'])
@@ -117,6 +151,31 @@ def add_users_to_group(group_id):
     return jsonify({'message': '用户添加成功'})
 
 
+@role_groups.route('/api/role_groups/<int:group_id>/users/bulk', methods=['POST'])
+@permission_required('manage_role_groups')
+def sync_group_users(group_id):
+    """
+    批量添加/移除/替换角色组成员
+
+    Args:
+        group_id: 角色组ID
+
+    Request Body:
+        user_ids: 用户ID列表
+        mode: add-添加（默认），remove-移除，set-替换为user_ids
+
+    Returns:
+        JSON: {added: 新增的用户ID, removed: 移除的用户ID}
+    """
+    data = request.get_json() or {}
+    try:
+        added, removed = RoleGroupService.sync_group_users(
+            group_id, data.get('user_ids', []), mode=data.get('mode', 'add'))
+    except (ValueError, TypeError) as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'added': added, 'removed': removed})
+
+
 @role_groups.route('/api/role_groups/<int:group_id>/users/<int:user_id>', methods=['DELETE'])
 @permission_required('manage_role_groups')
 def remove_user_from_group(group_id, user_id):
@@ -143,11 +202,41 @@ def get_group_visible_reports(group_id):
     Args:
         group_id: 角色组ID
 
+    Query Params:
+        is_active / tag / name: 过滤条件（name为名称前缀）
+        limit / cursor / sort: 游标分页参数，下一页游标见响应头 X-Next-Cursor
+
     Returns:
         JSON: 可见报表列表
     """
-    reports = RoleGroupService.get_group_visible_reports(group_id)
-    return jsonify([report.to_dict() for report in reports])
+    page = parse_page_request(request.args, ReportQuery.SORT_COLUMNS)
+    filters = report_filter_args(request.args)
+    filters.pop('group_id')
+    reports = RoleGroupService.get_group_visible_reports(group_id, filters=filters, page=page)
+    return paginated_response(reports, page)
+
+
+@role_groups.route('/api/role_groups/<int:group_id>/available_reports', methods=['GET'])
+@permission_required('view_role_groups')
+def get_group_available_reports(group_id):
+    """
+    获取不在角色组可见列表中的报表（用于添加可见报表）
+
+    Args:
+        group_id: 角色组ID
+
+    Query Params:
+        is_active / tag / name: 过滤条件（name为名称前缀）
+        limit / cursor / sort: 游标分页参数，下一页游标见响应头 X-Next-Cursor
+
+    Returns:
+        JSON: 报表列表
+    """
+    page = parse_page_request(request.args, ReportQuery.SORT_COLUMNS)
+    filters = report_filter_args(request.args)
+    filters.pop('group_id')
+    reports = RoleGroupService.get_reports_not_in_group(group_id, filters=filters, page=page)
+    return paginated_response(reports, page)
 
 
 @role_groups.route('/api/role_groups/<int:group_id>/visible_reports', methods=['POST'])
@@ -185,6 +274,31 @@ def add_visible_report_to_group(group_id, report_id):
     return jsonify({'message': '报表添加成功'})
 
 
+@role_groups.route('/api/role_groups/<int:group_id>/visible_reports/bulk', methods=['POST'])
+@permission_required('manage_role_groups')
+def sync_group_visible_reports(group_id):
+    """
+    批量添加/移除/替换角色组可见报表
+
+    Args:
+        group_id: 角色组ID
+
+    Request Body:
+        report_ids: 报表ID列表
+        mode: add-添加（默认），remove-移除，set-替换为report_ids
+
+    Returns:
+        JSON: {added: 新增的报表ID, removed: 移除的报表ID}
+    """
+    data = request.get_json() or {}
+    try:
+        added, removed = RoleGroupService.sync_group_reports(
+            group_id, data.get('report_ids', []), mode=data.get('mode', 'add'))
+    except (ValueError, TypeError) as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'added': added, 'removed': removed})
+
+
 @role_groups.route('/api/role_groups/<int:group_id>/visible_reports/<int:report_id>', methods=['DELETE'])
 @permission_required('manage_role_groups')
 def remove_visible_report_from_group(group_id, report_id):
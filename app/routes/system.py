@@ -0,0 +1,37 @@
+import hmac
+from flask import Blueprint, Response, jsonify, request, current_app
+from app.services.metrics import registry
+from app.services.response_cache import ResponseCache
+from app.utils.decorators import permission_required
+
+# 创建系统运行状态蓝图
+system = Blueprint('system', __name__)
+
+
+@system.route('/api/system/cache_stats', methods=['GET'])
+@permission_required('view_system')
+def get_cache_stats():
+    """
+    获取响应缓存的命中统计
+
+    Returns:
+        JSON: 命中/未命中次数、命中率、条目数等
+    """
+    return jsonify({'response_cache': ResponseCache.stats()})
+
+
+@system.route('/metrics', methods=['GET'])
+def get_metrics():
+    """
+    Prometheus 文本格式的运行指标（需携带 Authorization: Bearer <METRICS_TOKEN>，未配置 METRICS_TOKEN 时拒绝访问）
+
+    Returns:
+        text/plain: 指标文本
+    """
+    token = current_app.config.get('METRICS_TOKEN')
+    if not token:
+        return jsonify({'error': '未配置METRICS_TOKEN，指标接口已关闭'}), 403
+    if not hmac.compare_digest(request.headers.get('Authorization', '').encode('utf-8'),
+                               f'Bearer {token}'.encode('utf-8')):
+        return jsonify({'error': '未授权'}), 401
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
@@ -4,20 +4,38 @@ from app.models import User
 from app.utils.decorators import permission_required
 from app.services.user_service import UserService
 from app.services.auth_service import DingtalkAuthService
+from app.services.directory_sync_service import DirectorySyncService
+from app.services.dingtalk_client import DingtalkError, DingtalkUnavailable
+from app.utils.pagination import (parse_page_request, paginated_response, user_filter_args,
+                                  parse_stream_arg, streamed_response)
+from app.queries.user_query import UserQuery
+from app.services.catalog_version_service import CatalogVersionService
+from app.utils.http_cache import conditional_get
+from app.utils.query_budget import query_budget
 
 users = Blueprint('users', __name__)
 
 @users.route('/api/users', methods=['GET'])
 @permission_required('view_users')
+@conditional_get(CatalogVersionService.USERS, CatalogVersionService.ROLE_GROUPS, vary='role', cache=True)
 def get_users():
     """
     获取所有用户列表
     
+    Query Params:
+        role / is_active / group_id / name: 过滤条件（name为姓名前缀）
+        limit / cursor / sort: 游标分页参数，下一页游标见响应头 X-Next-Cursor
+        stream: 传入1/true时流式输出全部用户（用于导出，不能与limit/cursor同时使用）
+
     Returns:
         JSON: 用户列表
     """
-    all_users = UserService.get_all_users()
-    return jsonify([user.to_dict() for user in all_users])
+    page = parse_page_request(request.args, UserQuery.SORT_COLUMNS)
+    stream = parse_stream_arg(request.args, page)
+    all_users = UserService.get_all_users(filters=user_filter_args(request.args), page=page, stream=stream)
+    if stream:
+        return streamed_response(all_users)
+    return paginated_response(all_users, page)
 
 
 @users.route('/api/users/<int:user_id>', methods=['GET'])
@@ -126,4 +144,28 @@ def remove_user_from_role_group(user_id, role_group_id):
         空响应，状态码204
     """
     UserService.remove_user_from_role_group(user_id, role_group_id)
-    return '', 204 
\ No newline at end of file
+    return '', 204 
+
+@users.route('/api/users/sync_directory', methods=['POST'])
+@query_budget(max_repeats=None)  # 按批次执行相同的IN查询和写入
+@permission_required('manage_users')
+def sync_directory():
+    """
+    从钉钉通讯录同步用户（只处理自上次同步后变化的成员）
+
+    请求体（可选）:
+        full: 是否忽略上次同步记录，全量比较
+        deactivate: 是否停用已离开组织或已停用的成员
+
+    Returns:
+        JSON: 同步结果统计
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        summary = DirectorySyncService.sync(full=bool(data.get('full')),
+                                            deactivate=bool(data.get('deactivate')))
+    except DingtalkUnavailable as e:
+        return jsonify({'error': str(e)}), 503
+    except DingtalkError as e:
+        return jsonify({'error': str(e)}), 502
+    return jsonify(summary)
@@ -2,4 +2,5 @@
 # 为了使Python将目录视为包，需要此文件
 
 from app.services.auth_service import DingtalkAuthService
-from app.services.report_service import ReportService 
\ No newline at end of file
+from app.services.report_service import ReportService 
+from app.services.visibility_service import VisibilityService
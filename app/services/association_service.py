@@ -0,0 +1,103 @@
+from sqlalchemy import select, insert, delete
+from app import db
+from app.models.user import User
+from app.models.report import Report
+from app.models.role_group import RoleGroup, group_visible_reports
+from app.models.tag import Tag
+from app.models.report_tags import report_tags
+from app.models.user_role_group import UserRoleGroup
+
+# 同步方式
+MODES = ('add', 'remove', 'set')
+
+
+class Association:
+    """
+    多对多关联表描述
+
+    Attributes:
+        table: 关联表
+        targets: 关联列名 -> 该列引用的表
+    """
+
+    __slots__ = ('table', 'targets')
+
+    def __init__(self, table, targets):
+        self.table = table
+        self.targets = targets
+
+    def other(self, column):
+        """
+        另一侧的关联列名
+        """
+        return next(name for name in self.targets if name != column)
+
+
+USER_ROLE_GROUPS = Association(UserRoleGroup.__table__, {
+    'user_id': User.__table__,
+    'role_group_id': RoleGroup.__table__
+})
+GROUP_VISIBLE_REPORTS = Association(group_visible_reports, {
+    'group_id': RoleGroup.__table__,
+    'report_id': Report.__table__
+})
+REPORT_TAGS = Association(report_tags, {
+    'report_id': Report.__table__,
+    'tag_id': Tag.__table__
+})
+
+
+class AssociationService:
+    """
+    关联关系同步服务类
+    以集合差异的方式修改多对多关联：一次读取当前关联，算出新增和删除的集合，
+    再用一条批量INSERT和一条批量DELETE写入，查询次数与关联数量无关
+    """
+
+    @staticmethod
+    def sync(association, owner_column, owner_id, target_ids, mode='set'):
+        """
+        同步一个对象的关联（不提交，由调用方提交）
+
+        Args:
+            association: 关联表描述，如 USER_ROLE_GROUPS
+            owner_column: 当前对象一侧的关联列名，如 'role_group_id'
+            owner_id: 当前对象ID
+            target_ids: 另一侧的对象ID列表，不存在的ID会被忽略
+            mode: add-追加，remove-移除，set-替换为target_ids
+
+        Returns:
+            tuple: (新增的ID列表, 删除的ID列表)，均已排序
+
+        Raises:
+            ValueError: mode不支持
+        """
+        if mode not in MODES:
+            raise ValueError(f"mode必须为{'/'.join(MODES)}之一")
+        table = association.table
+        target_column = association.other(owner_column)
+        owner = table.c[owner_column]
+        target = table.c[target_column]
+        target_ids = {int(target_id) for target_id in target_ids}
+
+        current = set(db.session.execute(select(target).where(owner == owner_id)).scalars())
+        if mode == 'add':
+            added, removed = target_ids - current, set()
+        elif mode == 'remove':
+            added, removed = set(), target_ids & current
+        else:
+            added, removed = target_ids - current, current - target_ids
+
+        if added:
+            # 只关联实际存在的对象
+            target_table = association.targets[target_column]
+            added = set(db.session.execute(
+                select(target_table.c.id).where(target_table.c.id.in_(added))
+            ).scalars())
+        if removed:
+            db.session.execute(delete(table).where(owner == owner_id, target.in_(removed)))
+        if added:
+            db.session.execute(insert(table), [
+                {owner_column: owner_id, target_column: target_id} for target_id in sorted(added)
+            ])
+        return sorted(added), sorted(removed)
@@ -1,12 +1,15 @@
-import json
 import re
-import requests
 from app import db
+from app.services.catalog_version_service import CatalogVersionService
 from app.models.user import User
 from datetime import datetime
 from sqlalchemy import or_
+from sqlalchemy.orm.attributes import set_committed_value
 from app.services.user_service import UserService
+from app.services.principal_service import PrincipalService
+from app.services.login_stamp_service import LoginStampService
 from config import Config
+from app.services.dingtalk_client import get_dingtalk_client, DingtalkError
 
 
 class DingtalkAuthService:
@@ -26,11 +29,7 @@ class DingtalkAuthService:
 
     @staticmethod
     def get_user_token(code):
-        """获取用户token"""
-        url = "https://api.dingtalk.com/v1.0/oauth2/userAccessToken"
-        headers = {
-            'Content-Type': 'application/json'
-        }
+        """获取用户token（经由带连接池、超时、重试和熔断的钉钉客户端）"""
         data = {
             "clientSecret": Config.DINGTALK_APP_SECRET,
             "clientId": Config.DINGTALK_APP_KEY,
@@ -38,71 +37,88 @@ class DingtalkAuthService:
             "grantType": "authorization_code",
             "refreshToken": "1"
         }
-        response = requests.post(url,headers=headers, data=json.dumps(data))
-        if "accessToken" in response.json():
-            return response.json()
+        result = get_dingtalk_client().post('/v1.0/oauth2/userAccessToken', json=data)
+        if "accessToken" in result:
+            return result
         else:
-            raise Exception("获取用户token失败")
+            raise DingtalkError("获取用户token失败")
 
     @staticmethod
     def get_user_info(code):
         """获取用户信息"""
         # 1. 获取用户token
-        print(code)
         user_token = DingtalkAuthService.get_user_token(code)
-        url = "https://api.dingtalk.com/v1.0/contact/users/me"
-        headers = {
-            'Content-Type': 'application/json',
+        # 2. 获取当前用户信息
+        return get_dingtalk_client().get('/v1.0/contact/users/me', headers={
             'x-acs-dingtalk-access-token': user_token["accessToken"]
-        }
-        response = requests.get(url,headers=headers)
-        print(response.json())
-        return response.json()
+        })
 
     @staticmethod
     def login_or_create_user(dingtalk_info):
-        """登录或创建用户（支持预注册用户绑定）"""
-        # 首先尝试用钉钉ID查找已注册用户
+        """
+        登录或创建用户（支持预注册用户绑定）
+        老用户且姓名未变时只查询一次、不写数据库；新建和改名用一条 INSERT ... ON CONFLICT DO UPDATE 完成，
+        同一用户并发首次登录不会因唯一约束失败。最后登录时间由 LoginStampService 延迟批量写入
+
+        Args:
+            dingtalk_info: 钉钉用户信息（nick/name、unionId、email，管理员创建时可带 role_group_ids）
+
+        Returns:
+            User: 登录的用户
+        """
+        from app.utils.upsert import upsert_insert  # app.utils 会导入服务层，延迟导入避免循环
         username = dingtalk_info.get('nick', dingtalk_info.get('name'))
-        if dingtalk_info.get('unionId') is None:
-            user = None
-        else:
-            user = User.query.filter_by(dingtalk_id=dingtalk_info['unionId']).first()
+        union_id = dingtalk_info.get('unionId')
+        now = datetime.utcnow()
+
+        # 首先用钉钉ID查找已注册用户，姓名未变时直接登录
+        user = User.query.filter_by(dingtalk_id=union_id).first() if union_id is not None else None
+        if user is not None and user.name == username:
+            return DingtalkAuthService._stamp_login(user, now)
 
-        if not user:
+        if user is None:
             # 获取用户名（使用钉钉返回的昵称）
             chinese_username = DingtalkAuthService.remove_english_characters(username)
             # 查找预注册用户（同名且未绑定钉钉的用户）
-            pre_registered_user = User.query.filter(
+            user = User.query.filter(
                 or_(User.name == username, User.name == chinese_username),
                 or_(User.dingtalk_id == username, User.dingtalk_id == chinese_username)
             ).first()
+            if user is not None:
+                # 绑定钉钉账号到预注册用户，并把用户名修正为钉钉全名
+                user.dingtalk_id = union_id
+                user.name = username
+                CatalogVersionService.bump(CatalogVersionService.USERS)
+                db.session.commit()
+                PrincipalService.invalidate_users([user.id])
+                return DingtalkAuthService._stamp_login(user, now)
 
-            if pre_registered_user: # 如果找到预注册用户，则绑定钉钉账号，否则创建新用户
-                # 绑定钉钉账号到预注册用户
-                pre_registered_user.dingtalk_id = dingtalk_info['unionId']
-                # 把用户名修正为钉钉全名
-                if pre_registered_user.name != username:
-                    pre_registered_user.name = username
-                user = pre_registered_user
-            else:
-                # 创建全新用户
-                dink_id = dingtalk_info.get("unionId",dingtalk_info.get("dingtalk_id"))
-                if not dink_id:
-                    dink_id = username
-                user = User(
-                    dingtalk_id=dink_id,
-                    name=username,
-                    email=dingtalk_info.get('email', '')
-                )
-                db.session.add(user)
-                user_id = User.query.filter_by(dingtalk_id=dink_id).first()
-                UserService.add_user_to_role_groups(user_id.id, dingtalk_info.get('role_group_ids', []))
+        # 创建全新用户，或更新已注册用户的姓名
+        dink_id = union_id or dingtalk_info.get('dingtalk_id') or username
+        stmt = upsert_insert(User).values(
+            dingtalk_id=dink_id,
+            name=username,
+            email=dingtalk_info.get('email', ''),
+            role='user',
+            is_active=True,
+            created_at=now
+        )
+        stmt = stmt.on_conflict_do_update(index_elements=['dingtalk_id'], set_={'name': stmt.excluded.name})
+        user = db.session.scalars(stmt.returning(User), execution_options={'populate_existing': True}).one()
+        CatalogVersionService.bump(CatalogVersionService.USERS)
+        if user.created_at == now and dingtalk_info.get('role_group_ids'):
+            # 新建的用户（created_at 为本次写入的时间）按请求加入角色组，由其提交事务
+            UserService.add_user_to_role_groups(user.id, dingtalk_info['role_group_ids'])
         else:
-            # 更新用户信息（如果需要）
-            if user.name != username:
-                user.name = username
-        # 更新最后登录时间（无论新老用户都更新）
-        user.last_login = datetime.utcnow()
-        db.session.commit()
+            db.session.commit()
+        PrincipalService.invalidate_users([user.id])
+        return DingtalkAuthService._stamp_login(user, now)
+
+    @staticmethod
+    def _stamp_login(user, login_at):
+        """
+        记录最后登录时间：写入延迟缓冲区，同时设置到返回的对象上（不标记为待提交的修改）
+        """
+        LoginStampService.record(user.id, login_at)
+        set_committed_value(user, 'last_login', login_at)
         return user
@@ -0,0 +1,71 @@
+from flask import g, has_app_context, has_request_context
+from sqlalchemy import select, update, insert
+from app import db
+from app.models.catalog_version import CatalogVersion
+from app.services.response_cache import ResponseCache
+
+
+class CatalogVersionService:
+    """
+    数据版本服务类
+    各服务的写操作在提交前调用 bump 递增版本号（与业务修改在同一事务中提交），
+    读接口据此生成ETag，多个工作进程之间也能保持一致
+    """
+
+    # 数据范围
+    REPORTS = 'reports'          # 报表及其标签
+    ROLE_GROUPS = 'role_groups'  # 角色组、成员关系及可见报表
+    USERS = 'users'              # 用户信息
+
+    @staticmethod
+    def bump(*scopes):
+        """
+        递增指定范围的版本号（不提交，由调用方提交），并清除本进程中依赖这些范围的响应缓存
+
+        Args:
+            scopes: 数据范围列表
+        """
+        scopes = set(scopes)
+        result = db.session.execute(
+            update(CatalogVersion)
+            .where(CatalogVersion.scope.in_(scopes))
+            .values(version=CatalogVersion.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount < len(scopes):
+            # 首次写入时补齐缺失的版本行
+            existing = set(db.session.execute(
+                select(CatalogVersion.scope).where(CatalogVersion.scope.in_(scopes))
+            ).scalars())
+            missing = scopes - existing
+            if missing:
+                db.session.execute(insert(CatalogVersion), [{'scope': scope, 'version': 1} for scope in missing])
+        if has_app_context():
+            # 本次请求之后读取的版本号应包含这次递增
+            g.pop('_catalog_versions', None)
+        ResponseCache.invalidate_scopes(scopes)
+
+    @staticmethod
+    def get_versions(*scopes, reload=False):
+        """
+        读取指定范围的当前版本号
+        同一个请求内只查询一次（用户快照、可见性缓存和条件GET共用同一组版本号），bump 后重新读取
+
+        Args:
+            scopes: 数据范围列表
+            reload: 为真时直接查询数据库（不使用也不更新本次请求已读取的版本号）
+
+        Returns:
+            tuple: 与scopes顺序一致的版本号元组，未写入过的范围为0
+        """
+        if has_request_context() and not reload:
+            versions = g.get('_catalog_versions')
+            if versions is None:
+                versions = g._catalog_versions = CatalogVersionService._load()
+        else:
+            versions = CatalogVersionService._load()
+        return tuple(versions.get(scope, 0) for scope in scopes)
+
+    @staticmethod
+    def _load():
+        return dict(db.session.execute(select(CatalogVersion.scope, CatalogVersion.version)).all())
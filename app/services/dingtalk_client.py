@@ -0,0 +1,236 @@
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+from flask import current_app
+from loguru import logger
+from app.services.metrics import DINGTALK_LATENCY
+
+
+class DingtalkError(Exception):
+    """
+    钉钉接口返回错误（业务错误或无法解析的响应）
+    """
+
+
+class DingtalkUnavailable(DingtalkError):
+    """
+    钉钉接口暂不可用（超时、连接失败、5xx，或熔断器已打开），由路由返回503
+    """
+
+
+class CircuitBreaker:
+    """
+    熔断器
+    连续失败达到阈值后打开，打开期间直接失败不再发起请求；
+    冷却时间过后进入半开状态，只放行一个试探请求，成功则关闭，失败则重新打开
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, clock=time.monotonic):
+        """
+        Args:
+            failure_threshold: 连续失败多少次后打开
+            reset_timeout: 打开后的冷却时间（秒）
+            clock: 单调时钟函数（测试中可替换）
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self):
+        """
+        是否允许发起请求
+
+        Returns:
+            bool: 熔断器打开（或半开且已有试探请求在进行）时返回False
+        """
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if self._clock() - self._opened_at < self.reset_timeout:
+                    return False
+                self._state = self.HALF_OPEN
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning(f"钉钉接口熔断器打开 | 连续失败 {self._failures} 次")
+                self._state = self.OPEN
+                self._opened_at = self._clock()
+
+
+class DingtalkClient:
+    """
+    钉钉开放平台HTTP客户端
+    复用连接池（keep-alive），每个请求都有连接/读取超时；
+    连接失败可重试，读取超时和5xx只对幂等的GET重试（授权码只能使用一次），重试间隔带随机抖动；
+    连续失败时由熔断器快速失败，避免钉钉接口变慢时占满所有工作线程
+    """
+
+    RETRY_STATUS = (429, 500, 502, 503, 504)
+
+    def __init__(self, base_url, connect_timeout=3.0, read_timeout=5.0, max_retries=2,
+                 backoff=0.2, pool_size=20, breaker=None):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.breaker = breaker or CircuitBreaker()
+        # requests 导入较慢（约60ms），在首次创建客户端时才导入，不拖慢进程启动
+        import requests
+        from requests.adapters import HTTPAdapter
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers['Content-Type'] = 'application/json'
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        根据应用配置创建客户端
+        """
+        return cls(
+            base_url=config.get('DINGTALK_API_BASE', 'https://api.dingtalk.com'),
+            connect_timeout=config.get('DINGTALK_CONNECT_TIMEOUT', 3.0),
+            read_timeout=config.get('DINGTALK_READ_TIMEOUT', 5.0),
+            max_retries=config.get('DINGTALK_MAX_RETRIES', 2),
+            backoff=config.get('DINGTALK_RETRY_BACKOFF', 0.2),
+            pool_size=config.get('DINGTALK_POOL_SIZE', 20),
+            breaker=CircuitBreaker(
+                failure_threshold=config.get('DINGTALK_BREAKER_THRESHOLD', 5),
+                reset_timeout=config.get('DINGTALK_BREAKER_RESET', 30.0)
+            )
+        )
+
+    def request(self, method, path, **kwargs):
+        """
+        发起请求并解析JSON响应
+
+        Args:
+            method: HTTP方法
+            path: 接口路径，如 /v1.0/contact/users/me；也可以是完整URL（如旧版 oapi 接口）
+            kwargs: 传给 requests 的其他参数（json、headers等）
+
+        Returns:
+            dict: 响应JSON
+
+        Raises:
+            DingtalkUnavailable: 熔断器打开，或重试后仍超时/连接失败/5xx
+            DingtalkError: 响应不是JSON
+        """
+        started = time.perf_counter()
+        outcome = 'unavailable'
+        try:
+            result = self._request(method, path, **kwargs)
+            outcome = 'ok'
+            return result
+        except DingtalkUnavailable:
+            raise
+        except DingtalkError:
+            outcome = 'error'
+            raise
+        finally:
+            DINGTALK_LATENCY.observe((urlsplit(path).path, outcome), time.perf_counter() - started)
+
+    def _request(self, method, path, **kwargs):
+        import requests
+        if not self.breaker.allow():
+            raise DingtalkUnavailable('钉钉接口暂不可用，请稍后重试')
+
+        idempotent = method.upper() == 'GET'
+        url = path if path.startswith(('http://', 'https://')) else self.base_url + path
+        attempt = 0
+        while True:
+            try:
+                response = self.session.request(method, url, timeout=self.timeout, **kwargs)
+            except requests.ConnectionError as e:
+                # 连接失败（含连接超时）
+                retryable = True
+                error = e
+            except requests.Timeout as e:
+                # 读取超时说明请求可能已被处理，只有幂等请求可以重试
+                retryable = idempotent
+                error = e
+            except requests.RequestException as e:
+                # 其他请求错误（响应分块/解码错误、重定向过多、请求头非法等）计为失败，不重试
+                retryable = False
+                error = e
+            except Exception:
+                # 意外异常也要计为失败，否则半开状态的试探标记不会被清除，熔断器将一直拒绝请求
+                self.breaker.record_failure()
+                raise
+            else:
+                if response.status_code not in self.RETRY_STATUS:
+                    break
+                retryable = idempotent or response.status_code == 429
+                error = DingtalkUnavailable(f'钉钉接口返回 {response.status_code}')
+
+            if not retryable or attempt >= self.max_retries:
+                self.breaker.record_failure()
+                logger.warning(f"钉钉接口请求失败 | {method} {path} | 第{attempt + 1}次 | {error}")
+                raise DingtalkUnavailable('钉钉接口请求失败，请稍后重试') from error
+            # 指数退避 + 全抖动
+            time.sleep(random.uniform(0, self.backoff * (2 ** attempt)))
+            attempt += 1
+
+        self.breaker.record_success()
+        try:
+            return response.json()
+        except ValueError:
+            raise DingtalkError(f'钉钉接口返回了无法解析的响应（{response.status_code}）')
+
+    def get(self, path, **kwargs):
+        return self.request('GET', path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request('POST', path, **kwargs)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_dingtalk_client():
+    """
+    获取本进程共享的钉钉客户端（首次调用时按当前应用配置创建）
+
+    Returns:
+        DingtalkClient: 钉钉客户端
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = DingtalkClient.from_config(current_app.config)
+    return _client
@@ -0,0 +1,346 @@
+import hashlib
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from flask import current_app
+from loguru import logger
+from sqlalchemy import select, update, bindparam
+from app import db
+from app.models.user import User
+from app.models.sync_state import SyncState
+from app.services.catalog_version_service import CatalogVersionService
+from app.services.dingtalk_client import get_dingtalk_client, DingtalkError
+from app.services.principal_service import PrincipalService
+from app.services.token_service import TokenService
+from config import Config
+
+users_table = User.__table__
+
+# 同步状态键
+STATE_KEY = 'dingtalk_directory'
+# 根部门ID
+ROOT_DEPARTMENT_ID = 1
+# 每页用户数（钉钉接口上限为100）
+PAGE_SIZE = 100
+# IN查询每批的数量
+_CHUNK = 500
+# 不因离开通讯录而自动停用的角色（部门拉取不完整时避免把管理员锁在系统外）
+PROTECTED_ROLES = ('admin', 'editor')
+
+
+def _digest(member):
+    """
+    通讯录成员的内容摘要，用于判断成员自上次同步后是否变化
+    """
+    raw = '\x1f'.join([member['name'], member['email'] or '', '1' if member['active'] else '0'])
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:16]
+
+
+def _chunks(items, size=_CHUNK):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class DirectorySyncService:
+    """
+    钉钉通讯录同步服务类
+    并发分页拉取组织通讯录，与上次同步的成员摘要（高水位标记）比较，
+    只对新增、变化和离开的成员读写用户表：新成员批量预注册，已预注册的同名用户绑定钉钉ID，
+    信息变化的批量更新，可选地停用已离开或已停用的成员；
+    有部门拉取失败时通讯录不完整，本次不判断离开的成员，管理员和编辑者不会因离开通讯录被停用
+    """
+
+    _token_lock = threading.Lock()
+    # (企业内部应用access token, 过期时间)
+    _token = None
+
+    @staticmethod
+    def get_app_access_token(force_refresh=False):
+        """
+        获取企业内部应用的access token（进程内缓存，过期前5分钟刷新）
+
+        Returns:
+            str: access token
+
+        Raises:
+            DingtalkError: 获取失败
+        """
+        now = time.time()
+        token = DirectorySyncService._token
+        if not force_refresh and token and token[1] > now:
+            return token[0]
+        with DirectorySyncService._token_lock:
+            token = DirectorySyncService._token
+            if not force_refresh and token and token[1] > now:
+                return token[0]
+            result = get_dingtalk_client().post('/v1.0/oauth2/accessToken', json={
+                'appKey': Config.DINGTALK_APP_KEY,
+                'appSecret': Config.DINGTALK_APP_SECRET
+            })
+            if 'accessToken' not in result:
+                raise DingtalkError(f"获取应用access token失败: {result.get('message', result)}")
+            expires_in = int(result.get('expireIn', 7200))
+            DirectorySyncService._token = (result['accessToken'], now + max(expires_in - 300, 60))
+            return result['accessToken']
+
+    @staticmethod
+    def _call(base, path, token, payload):
+        """
+        调用旧版 oapi 接口并检查错误码
+        """
+        result = get_dingtalk_client().post(f'{base}{path}', params={'access_token': token}, json=payload)
+        if result.get('errcode', 0) != 0:
+            raise DingtalkError(f"钉钉接口错误 {path}: {result.get('errmsg')}")
+        return result.get('result') or {}
+
+    @staticmethod
+    def fetch_directory(token, workers):
+        """
+        并发拉取全部部门和成员
+
+        Args:
+            token: 应用access token
+            workers: 并发线程数
+
+        Returns:
+            tuple: (部门数量, {unionId: 成员信息}, 拉取失败的部门ID列表)
+        """
+        base = current_app.config.get('DINGTALK_OAPI_BASE', 'https://oapi.dingtalk.com').rstrip('/')
+        call = DirectorySyncService._call
+
+        failed = []
+
+        def sub_departments(dept_id):
+            try:
+                return call(base, '/topapi/v2/department/listsubid', token,
+                            {'dept_id': dept_id}).get('dept_id_list', [])
+            except DingtalkError as e:
+                logger.warning(f"拉取子部门失败 | 部门 {dept_id} | {e}")
+                failed.append(dept_id)
+                return []
+
+        def department_members(dept_id):
+            members = []
+            cursor = 0
+            try:
+                while True:
+                    page = call(base, '/topapi/v2/user/list', token,
+                                {'dept_id': dept_id, 'cursor': cursor, 'size': PAGE_SIZE})
+                    members.extend(page.get('list', []))
+                    if not page.get('has_more'):
+                        return members
+                    cursor = page.get('next_cursor')
+            except DingtalkError as e:
+                logger.warning(f"拉取部门成员失败 | 部门 {dept_id} | {e}")
+                failed.append(dept_id)
+                return members
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            # 按层并发遍历部门树
+            departments = [ROOT_DEPARTMENT_ID]
+            level = [ROOT_DEPARTMENT_ID]
+            while level:
+                level = [dept_id for children in pool.map(sub_departments, level) for dept_id in children]
+                departments.extend(level)
+
+            directory = {}
+            for members in pool.map(department_members, departments):
+                for member in members:
+                    union_id = member.get('unionid')
+                    if not union_id or union_id in directory:
+                        continue
+                    directory[union_id] = {
+                        'name': member.get('name') or '',
+                        'email': member.get('email') or member.get('org_email') or None,
+                        'active': member.get('active', True) is not False
+                    }
+        return len(departments), directory, sorted(set(failed))
+
+    @staticmethod
+    def _load_state():
+        state = db.session.get(SyncState, STATE_KEY)
+        if state is None or not state.value:
+            return {}
+        return json.loads(state.value)
+
+    @staticmethod
+    def sync(full=False, deactivate=False):
+        """
+        同步钉钉通讯录到用户表
+
+        Args:
+            full: 是否忽略上次同步的高水位标记，对全部成员与用户表做比较
+                （用户表中已绑定钉钉、仍为激活状态但不在通讯录中的用户视为已离开，管理员和编辑者除外）
+            deactivate: 是否停用已离开组织或在钉钉中已停用的成员；
+                未停用时这些成员保留在同步状态中，之后带 deactivate 的同步仍会处理。
+                有部门拉取失败时本次不判断离开的成员
+
+        Returns:
+            dict: 同步结果统计
+        """
+        started = time.monotonic()
+        token = DirectorySyncService.get_app_access_token()
+        workers = current_app.config.get('DINGTALK_SYNC_WORKERS', 8)
+        department_count, directory, failed = DirectorySyncService.fetch_directory(token, workers)
+
+        digests = {union_id: _digest(member) for union_id, member in directory.items()}
+        state = DirectorySyncService._load_state()
+        previous = state.get('members', {})
+        if full:
+            changed = list(digests)
+        else:
+            changed = [union_id for union_id, digest in digests.items() if previous.get(union_id) != digest]
+        if failed:
+            # 通讯录不完整：不在本次结果中的成员可能只是所在部门拉取失败，保留上次的状态留待下次判断
+            logger.warning(f"钉钉通讯录同步有 {len(failed)} 个部门拉取失败，本次不处理离开的成员")
+            departed = []
+        elif full:
+            departed = DirectorySyncService._bound_users_missing_from(directory)
+        else:
+            # 上次同步时已离开的成员和上次之后离开的成员（仍在通讯录中的说明已重新加入）
+            departed = sorted({union_id for union_id in previous if union_id not in directory}
+                              | {union_id for union_id in state.get('departed', []) if union_id not in directory})
+
+        summary = {
+            'departments': department_count,
+            'members': len(directory),
+            'changed': len(changed),
+            'created': 0,
+            'bound': 0,
+            'updated': 0,
+            'deactivated': 0,
+            'failed_departments': len(failed)
+        }
+        touched_ids, deactivated_ids, pending = DirectorySyncService._apply(
+            directory, changed, departed, deactivate, summary)
+        summary['pending_deactivation'] = len(pending)
+
+        # 保存高水位标记，与用户表修改在同一事务中提交；
+        # 待停用的成员不记录摘要（在钉钉中已停用的）或记入 departed（已离开的），下次同步仍会处理
+        members = {union_id: digest for union_id, digest in digests.items() if union_id not in pending}
+        departed_state = sorted(union_id for union_id in pending if union_id not in directory)
+        if failed:
+            # 未拉取到的成员沿用上次的摘要和离开记录
+            members = dict({union_id: digest for union_id, digest in previous.items() if union_id not in directory},
+                           **members)
+            departed_state = sorted(set(state.get('departed', [])) - set(directory))
+        sync_state = db.session.get(SyncState, STATE_KEY) or SyncState(key=STATE_KEY)
+        sync_state.value = json.dumps({
+            'synced_at': datetime.utcnow().isoformat(),
+            'members': members,
+            'departed': departed_state
+        }, separators=(',', ':'))
+        db.session.add(sync_state)
+        if summary['created'] or touched_ids:
+            CatalogVersionService.bump(CatalogVersionService.USERS)
+        db.session.commit()
+
+        PrincipalService.invalidate_users(touched_ids)
+        TokenService.revoke_users(deactivated_ids)
+        summary['elapsed'] = round(time.monotonic() - started, 3)
+        logger.info(f"钉钉通讯录同步完成 | {summary}")
+        return summary
+
+    @staticmethod
+    def _bound_users_missing_from(directory):
+        """
+        用户表中已绑定钉钉（钉钉ID不是占位值）、仍为激活状态但不在通讯录中的用户的钉钉ID（不含管理员和编辑者）
+        """
+        rows = db.session.execute(
+            select(users_table.c.dingtalk_id).where(
+                users_table.c.is_active.is_(True),
+                users_table.c.dingtalk_id.isnot(None),
+                users_table.c.dingtalk_id != users_table.c.name,
+                users_table.c.role.not_in(PROTECTED_ROLES)
+            )
+        ).scalars()
+        return sorted(union_id for union_id in rows if union_id not in directory)
+
+    @staticmethod
+    def _apply(directory, changed, departed, deactivate, summary):
+        """
+        按差异批量写入用户表（不提交）
+
+        Returns:
+            tuple: (被修改的用户ID列表, 被停用的用户ID列表, 应停用但本次未停用的钉钉ID集合)
+        """
+        from app.utils.upsert import upsert_insert  # app.utils 会导入服务层，延迟导入避免循环
+        # 已绑定钉钉的用户
+        existing = {}
+        for chunk in _chunks(changed + departed):
+            for row in db.session.execute(
+                    select(users_table.c.id, users_table.c.dingtalk_id, users_table.c.name,
+                           users_table.c.email, users_table.c.role, users_table.c.is_active)
+                    .where(users_table.c.dingtalk_id.in_(chunk))):
+                existing[row.dingtalk_id] = row
+
+        # 预注册用户：同名且钉钉ID为占位值（等于姓名）
+        unmatched_names = {directory[union_id]['name'] for union_id in changed if union_id not in existing}
+        pre_registered = {}
+        for chunk in _chunks(unmatched_names):
+            for row in db.session.execute(
+                    select(users_table.c.id, users_table.c.name, users_table.c.is_active)
+                    .where(users_table.c.name.in_(chunk), users_table.c.dingtalk_id == users_table.c.name)):
+                pre_registered.setdefault(row.name, row)
+
+        now = datetime.utcnow()
+        inserts, updates, deactivations = [], [], []
+        pending = set()
+        for union_id in changed:
+            member = directory[union_id]
+            row = existing.get(union_id)
+            if row is None:
+                row = pre_registered.pop(member['name'], None)
+                if row is None:
+                    # 新成员按钉钉中的状态创建
+                    inserts.append({'dingtalk_id': union_id, 'name': member['name'], 'email': member['email'],
+                                    'role': 'user', 'is_active': member['active'], 'created_at': now})
+                    continue
+                updates.append({'b_id': row.id, 'dingtalk_id': union_id,
+                                'name': member['name'], 'email': member['email']})
+                summary['bound'] += 1
+            elif row.name != member['name'] or row.email != member['email']:
+                updates.append({'b_id': row.id, 'dingtalk_id': union_id,
+                                'name': member['name'], 'email': member['email']})
+                summary['updated'] += 1
+            if not member['active'] and row.is_active:
+                if deactivate:
+                    deactivations.append(row.id)
+                else:
+                    pending.add(union_id)
+        for union_id in departed:
+            row = existing.get(union_id)
+            if row is None or not row.is_active or row.role in PROTECTED_ROLES:
+                continue
+            if deactivate:
+                deactivations.append(row.id)
+            else:
+                pending.add(union_id)
+
+        if inserts:
+            # 同步期间同一成员可能首次登录并已建好用户，按钉钉ID冲突时改为更新姓名和邮箱
+            stmt = upsert_insert(users_table)
+            db.session.execute(
+                stmt.on_conflict_do_update(index_elements=['dingtalk_id'],
+                                           set_={'name': stmt.excluded.name, 'email': stmt.excluded.email}),
+                inserts
+            )
+            summary['created'] = len(inserts)
+        if updates:
+            db.session.execute(
+                update(users_table).where(users_table.c.id == bindparam('b_id'))
+                .values(dingtalk_id=bindparam('dingtalk_id'), name=bindparam('name'), email=bindparam('email'))
+                .execution_options(synchronize_session=False),
+                updates
+            )
+        for chunk in _chunks(deactivations):
+            db.session.execute(
+                update(users_table).where(users_table.c.id.in_(chunk)).values(is_active=False)
+                .execution_options(synchronize_session=False)
+            )
+        summary['deactivated'] = len(deactivations)
+
+        return [item['b_id'] for item in updates] + deactivations, deactivations, pending
@@ -0,0 +1,100 @@
+import atexit
+import threading
+from sqlalchemy import update, bindparam, or_
+from loguru import logger
+from app import db
+from app.models.user import User
+from app.services.principal_service import PrincipalService
+
+users_table = User.__table__
+
+
+class LoginStampService:
+    """
+    最后登录时间延迟写入服务类
+    登录时只在内存中记录用户的最后登录时间，由后台线程每隔几秒批量写入用户表，
+    老用户登录不再需要单独的写事务；进程退出时写入剩余的记录
+
+    写入最后登录时间不递增 USERS 数据版本：否则登录高峰期间每次批量写入都会让所有进程的
+    用户快照、用户/角色组列表的响应缓存和ETag失效。列表中的最后登录时间随下一次用户数据变化刷新，
+    本进程中登录用户的快照单独失效
+    """
+
+    _lock = threading.Lock()
+    # 用户ID -> 最后登录时间
+    _pending = {}
+    _flusher = None
+
+    @staticmethod
+    def record(user_id, login_at):
+        """
+        记录一次登录（首次调用时启动后台写入线程）
+
+        Args:
+            user_id: 用户ID
+            login_at: 登录时间
+        """
+        with LoginStampService._lock:
+            if LoginStampService._pending.get(user_id, login_at) <= login_at:
+                LoginStampService._pending[user_id] = login_at
+        if LoginStampService._flusher is None:
+            LoginStampService._start()
+
+    @staticmethod
+    def _start():
+        from flask import current_app
+        app = current_app._get_current_object()
+        with LoginStampService._lock:
+            if LoginStampService._flusher is not None:
+                return
+            interval = app.config.get('LAST_LOGIN_FLUSH_INTERVAL', 5)
+            stop = threading.Event()
+
+            def run():
+                while not stop.wait(interval):
+                    LoginStampService._flush_in(app)
+
+            LoginStampService._flusher = threading.Thread(target=run, name='last-login-flusher', daemon=True)
+            LoginStampService._flusher.start()
+            atexit.register(lambda: (stop.set(), LoginStampService._flush_in(app)))
+
+    @staticmethod
+    def _flush_in(app):
+        try:
+            with app.app_context():
+                LoginStampService.flush()
+        except Exception as e:
+            logger.error(f"写入最后登录时间失败: {str(e)}")
+
+    @staticmethod
+    def flush():
+        """
+        将缓冲的最后登录时间批量写入用户表并提交（需要应用上下文）
+
+        Returns:
+            int: 写入的用户数
+        """
+        with LoginStampService._lock:
+            pending, LoginStampService._pending = LoginStampService._pending, {}
+        if not pending:
+            return 0
+        try:
+            db.session.execute(
+                update(users_table)
+                .where(users_table.c.id == bindparam('b_id'),
+                       or_(users_table.c.last_login.is_(None), users_table.c.last_login < bindparam('b_login')))
+                .values(last_login=bindparam('b_login'))
+                .execution_options(synchronize_session=False),
+                [{'b_id': user_id, 'b_login': login_at} for user_id, login_at in pending.items()]
+            )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            # 写入失败时放回缓冲区，下次重试（保留较新的时间）
+            with LoginStampService._lock:
+                for user_id, login_at in pending.items():
+                    if LoginStampService._pending.get(user_id, login_at) <= login_at:
+                        LoginStampService._pending[user_id] = login_at
+            raise
+        PrincipalService.invalidate_users(list(pending))
+        return len(pending)
@@ -0,0 +1,268 @@
+import atexit
+import glob
+import json
+import os
+import threading
+from bisect import bisect_left
+from loguru import logger
+
+# 延迟（秒）/ 字节数 / 每个请求的SQL条数 的直方图分桶
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+
+
+class Counter:
+    """
+    计数器（只增不减），标签值按 labelnames 的顺序以元组传入
+    """
+
+    type = 'counter'
+
+    def __init__(self, registry, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = registry.lock
+        self._values = {}
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def inc_locked(self, labels=(), amount=1):
+        """
+        调用方已持有 registry.lock 时使用（一次加锁更新多个指标）
+        """
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def snapshot(self):
+        with self._lock:
+            return [[list(labels), value] for labels, value in self._values.items()]
+
+
+class Histogram:
+    """
+    直方图：每个标签组合保存各分桶的（非累计）计数和观测值总和，输出时再累计
+    """
+
+    type = 'histogram'
+
+    def __init__(self, registry, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._lock = registry.lock
+        self._values = {}
+
+    def observe(self, labels, value):
+        with self._lock:
+            self.observe_locked(labels, value)
+
+    def observe_locked(self, labels, value):
+        """
+        调用方已持有 registry.lock 时使用（一次加锁更新多个指标）
+        """
+        entry = self._values.get(labels)
+        if entry is None:
+            entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        entry[0][bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+
+    def snapshot(self):
+        with self._lock:
+            return [[list(labels), list(counts), total] for labels, (counts, total) in self._values.items()]
+
+
+class MetricsRegistry:
+    """
+    进程内指标注册表
+    记录时只做一次加锁的字典更新；多进程部署时每个进程由后台线程定期把快照写入共享目录（fork 后在子进程中重新启动），
+    抓取时合并所有进程的快照（计数器、直方图求和），已退出进程的累计值保留
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self._metrics = []
+        # 抓取时调用的收集函数，返回 [(名称, 说明, 标签名, [[标签值, 计数]])] 形式的计数器
+        self._collectors = []
+        self.directory = None
+        self.flush_interval = 1.0
+        # 已启动写入线程的进程ID
+        self._flusher_pid = None
+
+    def counter(self, name, documentation, labelnames=()):
+        metric = Counter(self, name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        metric = Histogram(self, name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector):
+        self._collectors.append(collector)
+
+    def configure(self, directory=None, flush_interval=1.0):
+        """
+        设置多进程快照目录（为空时只输出本进程的指标），设置时启动后台写入线程
+        """
+        self.directory = directory
+        self.flush_interval = flush_interval
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._start_flusher()
+
+    def _start_flusher(self):
+        if not self.directory or self._flusher_pid == os.getpid():
+            return
+        self._flusher_pid = os.getpid()
+        stop = threading.Event()
+
+        def run():
+            while not stop.wait(self.flush_interval):
+                self._flush_logged()
+
+        threading.Thread(target=run, name='metrics-flusher', daemon=True).start()
+        atexit.register(lambda: (stop.set(), self._flush_logged()))
+
+    def _after_fork(self):
+        # 子进程中不存在父进程的线程，按需重新启动写入线程
+        self._start_flusher()
+
+    def _flush_logged(self):
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"写入指标快照失败: {str(e)}")
+
+    def snapshot(self):
+        """
+        本进程全部指标的快照（可JSON序列化）
+        """
+        result = {}
+        for metric in self._metrics:
+            entry = {'type': metric.type, 'help': metric.documentation,
+                     'labelnames': list(metric.labelnames), 'values': metric.snapshot()}
+            if metric.type == 'histogram':
+                entry['buckets'] = list(metric.buckets)
+            result[metric.name] = entry
+        for collector in self._collectors:
+            for name, documentation, labelnames, values in collector():
+                # 与已注册的同名计数器合并（如响应缓存的命中数并入 cache_requests_total）
+                entry = result.setdefault(name, {'type': 'counter', 'help': documentation,
+                                                 'labelnames': list(labelnames), 'values': []})
+                entry['values'].extend(values)
+        return result
+
+    def flush(self):
+        if not self.directory:
+            return
+        path = os.path.join(self.directory, f'metrics_{os.getpid()}.json')
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+    def collect(self):
+        """
+        合并后的指标快照：多进程模式下合并目录中所有进程的快照
+        """
+        if not self.directory:
+            return self.snapshot()
+        self.flush()
+        merged = {}
+        for path in sorted(glob.glob(os.path.join(self.directory, 'metrics_*.json'))):
+            try:
+                with open(path, encoding='utf-8') as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError):
+                continue
+            for name, entry in snapshot.items():
+                target = merged.setdefault(name, {**entry, 'values': {}})
+                for item in entry['values']:
+                    labels = tuple(item[0])
+                    if entry['type'] == 'histogram':
+                        current = target['values'].get(labels)
+                        if current is None:
+                            target['values'][labels] = [list(item[1]), item[2]]
+                        else:
+                            current[0] = [a + b for a, b in zip(current[0], item[1])]
+                            current[1] += item[2]
+                    else:
+                        target['values'][labels] = target['values'].get(labels, 0) + item[1]
+        for entry in merged.values():
+            if entry['type'] == 'histogram':
+                entry['values'] = [[list(labels), counts, total] for labels, (counts, total) in entry['values'].items()]
+            else:
+                entry['values'] = [[list(labels), value] for labels, value in entry['values'].items()]
+        return merged
+
+    def render(self):
+        """
+        Prometheus 文本格式输出
+
+        Returns:
+            str: 指标文本
+        """
+        lines = []
+        for name, entry in sorted(self.collect().items()):
+            lines.append(f"# HELP {name} {entry['help']}")
+            lines.append(f"# TYPE {name} {entry['type']}")
+            labelnames = entry['labelnames']
+            for item in entry['values']:
+                labels = list(zip(labelnames, item[0]))
+                if entry['type'] == 'histogram':
+                    cumulative = 0
+                    for bound, count in zip(entry['buckets'] + ['+Inf'], item[1]):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_format_labels(labels + [('le', bound)])} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(item[2])}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {cumulative}")
+                else:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(item[1])}")
+        return '\n'.join(lines) + '\n'
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    parts = []
+    for key, value in labels:
+        value = str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+        parts.append(f'{key}="{value}"')
+    return '{' + ','.join(parts) + '}'
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# 全局注册表和应用使用的指标
+registry = MetricsRegistry()
+
+REQUESTS = registry.counter(
+    'http_requests_total', '请求数', ('blueprint', 'endpoint', 'method', 'status'))
+REQUEST_LATENCY = registry.histogram(
+    'http_request_duration_seconds', '请求处理耗时（秒）', ('blueprint', 'endpoint'))
+RESPONSE_SIZE = registry.histogram(
+    'http_response_size_bytes', '响应体字节数（不含流式响应）', ('blueprint', 'endpoint'), SIZE_BUCKETS)
+REQUEST_SQL_STATEMENTS = registry.histogram(
+    'http_request_sql_statements', '每个请求执行的SQL语句数', ('blueprint', 'endpoint'), COUNT_BUCKETS)
+REQUEST_SQL_TIME = registry.histogram(
+    'http_request_sql_seconds', '每个请求执行SQL的总耗时（秒）', ('blueprint', 'endpoint'))
+SQL_STATEMENTS = registry.counter(
+    'db_statements_total', 'SQL语句数（含请求之外的后台任务）')
+POOL_CHECKOUT = registry.histogram(
+    'db_pool_checkout_seconds', '从连接池获取连接的等待时间（秒）')
+POOL_CONNECTIONS = registry.counter(
+    'db_pool_connections_total', '连接池新建的数据库连接数')
+DINGTALK_LATENCY = registry.histogram(
+    'dingtalk_request_duration_seconds', '钉钉接口调用耗时（秒，含重试）', ('path', 'outcome'))
+CACHE_REQUESTS = registry.counter(
+    'cache_requests_total', '进程内缓存查询次数', ('cache', 'result'))
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=registry._after_fork)
@@ -0,0 +1,144 @@
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app
+from app.models.user import role_has_permission
+from app.queries.user_query import UserQuery, users_table
+from app.services.catalog_version_service import CatalogVersionService
+from app.services.metrics import CACHE_REQUESTS
+
+
+class Principal:
+    """
+    已登录用户的只读快照，作为 Flask-Login 的 current_user
+    包含用户ID、角色、激活状态和所属角色组，鉴权和 /api/auth/user 不再需要查询用户表
+
+    Attributes:
+        record: UserRecord 用户只读记录（含所属角色组）
+        group_ids: 所属角色组ID元组（已排序）
+    """
+
+    __slots__ = ('record', 'group_ids')
+
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, record):
+        self.record = record
+        self.group_ids = tuple(sorted(group.id for group in record.role_groups))
+
+    @property
+    def id(self):
+        return self.record.id
+
+    @property
+    def role(self):
+        return self.record.role
+
+    @property
+    def name(self):
+        return self.record.name
+
+    @property
+    def is_active(self):
+        return bool(self.record.is_active)
+
+    def get_id(self):
+        return str(self.record.id)
+
+    def has_permission(self, permission):
+        """
+        检查用户是否具有特定权限，规则同 User.has_permission
+        """
+        return role_has_permission(self.role, permission)
+
+    def can_view_report(self, report):
+        """
+        检查用户是否可以查看指定报表，规则同 User.can_view_report
+        """
+        if self.role == 'admin':
+            return True
+        from app.services.visibility_service import VisibilityService
+        return report.id in VisibilityService.get_visible_report_ids(self.id)
+
+    def to_dict(self):
+        """
+        转换为字典，格式与 User.to_dict 保持一致
+        """
+        return self.record.to_dict()
+
+    def __repr__(self):
+        return f'<Principal {self.record.id} {self.record.role}>'
+
+
+class PrincipalService:
+    """
+    登录用户快照缓存服务类
+    user_loader 从进程内缓存读取 Principal，命中时不查询用户表；
+    每条快照记录生成时的用户和角色组数据版本（USERS、ROLE_GROUPS），版本变化即重新加载，
+    其他进程中的降级、停用、成员关系变更在下一个请求生效；本进程的修改由对应服务立即失效
+    """
+
+    # 快照依赖的数据范围
+    SCOPES = (CatalogVersionService.USERS, CatalogVersionService.ROLE_GROUPS)
+
+    _lock = threading.Lock()
+    # 用户ID -> (过期时间, 数据版本, Principal)
+    _entries = OrderedDict()
+
+    @staticmethod
+    def get(user_id):
+        """
+        获取用户快照
+
+        Args:
+            user_id: 用户ID
+
+        Returns:
+            Principal|None: 用户不存在时返回None
+        """
+        # 在读取用户之前读取版本号（同一请求内只查询一次），并发修改时快照只会被标记为旧版本
+        versions = CatalogVersionService.get_versions(*PrincipalService.SCOPES)
+        now = time.monotonic()
+        with PrincipalService._lock:
+            entry = PrincipalService._entries.get(user_id)
+            if entry and entry[0] > now and entry[1] == versions:
+                PrincipalService._entries.move_to_end(user_id)
+                CACHE_REQUESTS.inc(('principal', 'hit'))
+                return entry[2]
+        CACHE_REQUESTS.inc(('principal', 'miss'))
+
+        records = UserQuery.list_users(where=[users_table.c.id == user_id])
+        if not records:
+            PrincipalService.invalidate_users([user_id])
+            return None
+        principal = Principal(records[0])
+
+        ttl = current_app.config.get('PRINCIPAL_CACHE_TTL', 30)
+        max_entries = current_app.config.get('PRINCIPAL_CACHE_SIZE', 10000)
+        with PrincipalService._lock:
+            PrincipalService._entries[user_id] = (now + ttl, versions, principal)
+            PrincipalService._entries.move_to_end(user_id)
+            while len(PrincipalService._entries) > max_entries:
+                PrincipalService._entries.popitem(last=False)
+        return principal
+
+    @staticmethod
+    def invalidate_users(user_ids):
+        """
+        用户信息或所属角色组变更后，清除这些用户的快照
+
+        Args:
+            user_ids: 用户ID列表
+        """
+        with PrincipalService._lock:
+            for user_id in user_ids:
+                PrincipalService._entries.pop(user_id, None)
+
+    @staticmethod
+    def invalidate_all():
+        """
+        清空全部快照（角色组改名、删除等影响所有成员的情况）
+        """
+        with PrincipalService._lock:
+            PrincipalService._entries.clear()
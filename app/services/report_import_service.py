@@ -0,0 +1,260 @@
+import csv
+import io
+import json
+import re
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import select, delete, insert
+from app import db
+from app.models.report import Report
+from app.models.tag import Tag
+from app.models.report_tags import report_tags
+from app.services.catalog_version_service import CatalogVersionService
+from app.services.report_service import ReportService
+from app.utils.upsert import upsert_insert
+
+reports_table = Report.__table__
+tags_table = Tag.__table__
+
+# 支持的导入格式
+FORMATS = ('csv', 'jsonl')
+# 可导入的报表字段（powerbi_id 为唯一键）
+FIELDS = ('name', 'powerbi_id', 'description', 'is_active', 'is_hide_report', 'tags')
+
+_TRUE_VALUES = ('1', 'true', 't', 'yes', 'y')
+_FALSE_VALUES = ('0', 'false', 'f', 'no', 'n')
+
+
+class ReportImportError(ValueError):
+    """
+    导入文件整体无法解析（格式不支持、缺少表头等），由路由返回400
+    """
+
+
+class ReportImportService:
+    """
+    报表批量导入服务类
+    解析CSV/JSONL文件，按 powerbi_id 批量 upsert 报表，一次性解析全部标签并批量写入标签关联
+    """
+
+    @staticmethod
+    def detect_format(filename=None, content_type=None):
+        """
+        根据文件名或Content-Type推断导入格式
+
+        Returns:
+            str|None: 'csv' / 'jsonl'，无法推断时返回None
+        """
+        if filename:
+            extension = filename.rsplit('.', 1)[-1].lower()
+            if extension == 'csv':
+                return 'csv'
+            if extension in ('jsonl', 'ndjson'):
+                return 'jsonl'
+        if content_type:
+            content_type = content_type.split(';')[0].strip().lower()
+            if content_type == 'text/csv':
+                return 'csv'
+            if content_type in ('application/x-ndjson', 'application/jsonl', 'application/x-jsonlines'):
+                return 'jsonl'
+        return None
+
+    @staticmethod
+    def parse(text, fmt):
+        """
+        解析导入文件
+
+        Args:
+            text: 文件内容
+            fmt: 'csv' 或 'jsonl'
+
+        Returns:
+            list: [(行号, 原始字段字典或None, 错误信息或None)]
+
+        Raises:
+            ReportImportError: 格式不支持或CSV缺少必需的表头
+        """
+        if fmt == 'csv':
+            reader = csv.DictReader(io.StringIO(text))
+            missing = {'name', 'powerbi_id'} - set(reader.fieldnames or ())
+            if missing:
+                raise ReportImportError(f"CSV缺少表头: {', '.join(sorted(missing))}")
+            return [(reader.line_num, row, None) for row in reader]
+
+        if fmt == 'jsonl':
+            rows = []
+            for line_no, line in enumerate(text.splitlines(), start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as e:
+                    rows.append((line_no, None, f'JSON格式错误: {e}'))
+                    continue
+                if not isinstance(row, dict):
+                    rows.append((line_no, None, '每行必须是JSON对象'))
+                    continue
+                rows.append((line_no, row, None))
+            return rows
+
+        raise ReportImportError(f"不支持的导入格式: {fmt}，支持 {', '.join(FORMATS)}")
+
+    @staticmethod
+    def _to_bool(value, name):
+        if isinstance(value, bool):
+            return value
+        if isinstance(value, int):
+            return bool(value)
+        text = str(value).strip().lower()
+        if text in _TRUE_VALUES:
+            return True
+        if text in _FALSE_VALUES:
+            return False
+        raise ValueError(f'{name}必须为布尔值')
+
+    @staticmethod
+    def _normalize(raw):
+        """
+        校验并规范化一行数据
+        未出现（CSV中为空）的可选字段不写入，已存在的报表保留原值
+
+        Returns:
+            tuple: (报表字段字典, 标签名称列表或None)
+
+        Raises:
+            ValueError: 数据不合法
+        """
+        values = {}
+        for field in ('name', 'powerbi_id'):
+            value = raw.get(field)
+            value = str(value).strip() if value is not None else ''
+            if not value:
+                raise ValueError(f'{field}不能为空')
+            values[field] = value
+        if len(values['name']) > reports_table.c.name.type.length:
+            raise ValueError('name过长')
+        if len(values['powerbi_id']) > reports_table.c.powerbi_id.type.length:
+            raise ValueError('powerbi_id过长')
+
+        if raw.get('description') not in (None, ''):
+            values['description'] = str(raw['description'])
+        for field in ('is_active', 'is_hide_report'):
+            if raw.get(field) not in (None, ''):
+                values[field] = ReportImportService._to_bool(raw[field], field)
+
+        tags = raw.get('tags')
+        if tags is None or tags == '':
+            return values, None
+        if isinstance(tags, str):
+            tags = re.split(r'[|,]', tags)
+        elif not isinstance(tags, list):
+            raise ValueError('tags必须为字符串或数组')
+        names = []
+        for tag in tags:
+            tag = str(tag).strip()
+            if not tag:
+                continue
+            if len(tag) > tags_table.c.name.type.length:
+                raise ValueError(f'标签过长: {tag}')
+            if tag not in names:
+                names.append(tag)
+        return values, names
+
+    @staticmethod
+    def import_reports(rows, batch_size=None):
+        """
+        批量导入报表
+        按 powerbi_id 去重后分批执行多行 INSERT ... ON CONFLICT DO UPDATE；
+        全部标签一次解析（缺失的批量创建），标签关联按批先删后插；
+        整个导入在一个事务中提交，只递增一次报表数据版本
+
+        Args:
+            rows: parse 的返回值
+            batch_size: 每条upsert语句的行数，默认取配置 IMPORT_BATCH_SIZE
+
+        Returns:
+            dict: {created, updated, failed, skipped, results: [{line, powerbi_id, status, id, error}]}
+        """
+        batch_size = batch_size or current_app.config.get('IMPORT_BATCH_SIZE', 500)
+        results = []
+        pending = {}
+        for line_no, raw, error in rows:
+            result = {'line': line_no, 'powerbi_id': raw.get('powerbi_id') if raw else None,
+                      'status': 'failed', 'id': None, 'error': error}
+            results.append(result)
+            if error is not None:
+                continue
+            try:
+                values, tags = ReportImportService._normalize(raw)
+            except ValueError as e:
+                result['error'] = str(e)
+                continue
+            result['powerbi_id'] = values['powerbi_id']
+            previous = pending.pop(values['powerbi_id'], None)
+            if previous is not None:
+                previous[0].update(status='skipped', error=f"powerbi_id重复，以第{line_no}行为准")
+            pending[values['powerbi_id']] = (result, values, tags)
+
+        entries = list(pending.values())
+        if entries:
+            try:
+                tag_ids = ReportService.resolve_tag_ids({tag for _, _, tags in entries if tags for tag in tags})
+                for start in range(0, len(entries), batch_size):
+                    ReportImportService._upsert_batch(entries[start:start + batch_size], tag_ids)
+                CatalogVersionService.bump(CatalogVersionService.REPORTS)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+            # 全文索引在下次检索时发现报表数据版本变化后自动重建
+
+        summary = {status: 0 for status in ('created', 'updated', 'failed', 'skipped')}
+        for result in results:
+            summary[result['status']] += 1
+        summary['results'] = results
+        return summary
+
+    @staticmethod
+    def _upsert_batch(entries, tag_ids):
+        """
+        upsert一批报表并替换其标签关联
+        字段组合相同的行共用一条多行INSERT，更新时只覆盖本行提供的字段
+        """
+        powerbi_ids = [values['powerbi_id'] for _, values, _ in entries]
+        existing = set(db.session.execute(
+            select(reports_table.c.powerbi_id).where(reports_table.c.powerbi_id.in_(powerbi_ids))
+        ).scalars())
+
+        now = datetime.utcnow()
+        groups = {}
+        for entry in entries:
+            groups.setdefault(tuple(sorted(entry[1])), []).append(entry)
+
+        ids = {}
+        for columns, group in groups.items():
+            stmt = upsert_insert(reports_table).values([
+                dict(values, created_at=now, updated_at=now) for _, values, _ in group
+            ])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=['powerbi_id'],
+                set_={
+                    **{column: stmt.excluded[column] for column in columns if column != 'powerbi_id'},
+                    'updated_at': stmt.excluded.updated_at
+                }
+            ).returning(reports_table.c.id, reports_table.c.powerbi_id)
+            ids.update({powerbi_id: report_id for report_id, powerbi_id in db.session.execute(stmt)})
+
+        tagged_ids = []
+        links = []
+        for result, values, tags in entries:
+            report_id = ids[values['powerbi_id']]
+            result.update(id=report_id, error=None,
+                          status='updated' if values['powerbi_id'] in existing else 'created')
+            if tags is not None:
+                tagged_ids.append(report_id)
+                links.extend({'report_id': report_id, 'tag_id': tag_ids[tag]} for tag in tags)
+
+        if tagged_ids:
+            db.session.execute(delete(report_tags).where(report_tags.c.report_id.in_(tagged_ids)))
+        if links:
+            db.session.execute(insert(report_tags), links)
@@ -1,6 +1,14 @@
 from app.models.report import Report
 from app.models.tag import Tag  # 新增导入
+from app.services.visibility_service import VisibilityService
+from app.services.search_service import SearchService
 from app import db
+from app.services.catalog_version_service import CatalogVersionService
+from app.queries.report_query import ReportQuery
+from app.services.association_service import AssociationService, REPORT_TAGS
+from datetime import datetime
+from sqlalchemy import select, update
+from flask import current_app
 from flask_login import current_user
 from sqlalchemy.orm import joinedload  # 新增导入
 
@@ -12,33 +20,106 @@ class ReportService:
     """
     
     @staticmethod
-    def get_all_reports():
+    def get_all_reports(filters=None, page=None, with_description=True, stream=False):
         """
         获取当前用户有权限查看的所有报表
 
+        通过只读查询层一条SQL查出报表、标签与可见标记(is_view)，
+        管理员全部可见，普通用户只返回已激活且未隐藏的报表
+
+        Args:
+            filters: 过滤条件字典，见 ReportQuery.filters
+            page: 分页请求 PageRequest
+            with_description: 是否返回报表描述
+            stream: 是否流式读取（用于导出全部报表）
+
         Returns:
-            list: 用户有权限查看的报表对象列表
+            list|iterator: ReportRecord 列表；stream为True时返回按批从数据库读取的迭代器
         """
-        all_reports = Report.query.all()
-        # print(all_reports)
-        result = []
-        for report in all_reports:  # 遍历所有报表, 检查用户权限
-            # logger.info(f"当前处理的报表: {report}")
-            # logger.info(f"当前用户角色: {current_user.role if current_user.is_authenticated else '未认证'}")
+        role = current_user.role if current_user.is_authenticated else None
+        user_id = current_user.id if current_user.is_authenticated else None
+        where = ReportQuery.listing_filters(role) + ReportQuery.filters(**(filters or {}))
+        is_view = ReportQuery.is_view_clause(role, user_id)
+        if stream:
+            return ReportQuery.iter_reports(
+                where=where,
+                page=page,
+                with_description=with_description,
+                is_view=is_view,
+                yield_per=current_app.config.get('STREAM_BATCH_SIZE', 500)
+            )
+        return ReportQuery.list_reports(
+            where=where,
+            page=page,
+            with_description=with_description,
+            is_view=is_view
+        )
 
-            if current_user.is_authenticated and current_user.role == 'admin':
-                pass
+    @staticmethod
+    def get_report_facets(filters=None, page=None, with_description=True):
+        """
+        多标签分面查询
+        返回当前用户可在列表中看到、且满足标签条件的报表，以及这些报表中各标签的数量；
+        报表列表和标签统计各一条SQL，与标签数量无关
 
-            elif current_user.is_authenticated and current_user.role == 'editor':
-                pass
+        Args:
+            filters: 过滤条件字典，见 ReportQuery.filters（多标签使用 tags / tag_mode）
+            page: 分页请求 PageRequest（只作用于报表列表，标签统计基于全部结果）
+            with_description: 是否返回报表描述
 
-            else:
-                if not report.is_active or report.is_hide_report:
-                    continue
-            report_dict = report.to_dict()
-            report_dict['is_view'] = current_user.can_view_report(report)
-            result.append(report_dict)
+        Returns:
+            tuple: (ReportRecord 列表, [(标签名称, 报表数量)])
+        """
+        role = current_user.role if current_user.is_authenticated else None
+        user_id = current_user.id if current_user.is_authenticated else None
+        where = ReportQuery.listing_filters(role) + ReportQuery.filters(**(filters or {}))
+        records = ReportQuery.list_reports(
+            where=where,
+            page=page,
+            with_description=with_description,
+            is_view=ReportQuery.is_view_clause(role, user_id)
+        )
+        return records, ReportQuery.tag_counts(where)
 
+    @staticmethod
+    def search_reports(query, limit=20):
+        """
+        全文检索当前用户可在列表中看到的报表
+
+        结果范围与 get_all_reports 一致：管理员和编辑者检索全部报表，普通用户只检索已激活且未隐藏的报表
+
+        Args:
+            query: 查询文本
+            limit: 最多返回条数
+
+        Returns:
+            list: 报表字典列表（含is_view和score），按相关度排序
+        """
+        role = current_user.role if current_user.is_authenticated else None
+        user_id = current_user.id if current_user.is_authenticated else None
+
+        if role in ('admin', 'editor'):
+            accept = None
+        else:
+            def accept(report_id, is_active, is_hide_report):
+                return bool(is_active) and not is_hide_report
+
+        hits = SearchService.search(query, accept=accept, limit=limit)
+        if not hits:
+            return []
+
+        records = ReportQuery.list_reports(
+            where=[Report.__table__.c.id.in_([report_id for report_id, _ in hits])],
+            with_description=True,
+            is_view=ReportQuery.is_view_clause(role, user_id)
+        )
+        records_by_id = {record.id: record for record in records}
+        result = []
+        for report_id, score in hits:
+            if report_id in records_by_id:
+                report_dict = records_by_id[report_id].to_dict()
+                report_dict['score'] = round(score, 4)
+                result.append(report_dict)
         return result
 
     @staticmethod
@@ -55,7 +136,8 @@ class ReportService:
         Raises:
             404: 如果报表不存在
         """
-        return Report.query.filter_by(id=report_id).first_or_404()
+        # 标签随报表一起加载，详情接口只需一条查询
+        return Report.query.options(joinedload(Report.tags)).filter_by(id=report_id).first_or_404()
     
     @staticmethod
     def create_report(data):
@@ -73,15 +155,17 @@ class ReportService:
         # 处理标签数据
         tags = data.pop('tags', [])
         report = Report(**data)
+        db.session.add(report)
 
-        # 添加标签关联（新增部分）
+        # 添加标签关联：写入报表取得ID后批量插入
         if tags:
-            existing_tags = Tag.query.filter(Tag.name.in_(tags)).all()
-            new_tags = [Tag(name=name) for name in tags if name not in {t.name for t in existing_tags}]
-            report.tags.extend(existing_tags + new_tags)
+            db.session.flush()
+            tag_ids = ReportService.resolve_tag_ids(set(tags)).values()
+            AssociationService.sync(REPORT_TAGS, 'report_id', report.id, tag_ids, mode='add')
 
-        db.session.add(report)
+        CatalogVersionService.bump(CatalogVersionService.REPORTS)
         db.session.commit()
+        SearchService.index_report(report.id)
         return report
     
     @staticmethod
@@ -102,24 +186,11 @@ class ReportService:
         report = Report.query.get_or_404(report_id)
         tags = data.pop('tags', None)
 
-        # 处理标签更新（新增代码）
+        # 处理标签更新：按差异批量增删标签关联
         if tags is not None:
-            # 获取当前标签集合
-            current_tags = {tag.name for tag in report.tags}
-            new_tags = set(tags)
-
-            # 添加新增标签
-            for tag_name in new_tags - current_tags:
-                tag = Tag.query.filter_by(name=tag_name).first()
-                if not tag:
-                    tag = Tag(name=tag_name)
-                    db.session.add(tag)
-                report.tags.append(tag)
-
-            # 移除不再存在的标签
-            for tag in list(report.tags):
-                if tag.name in current_tags - new_tags:
-                    report.tags.remove(tag)
+            tag_ids = ReportService.resolve_tag_ids(set(tags)).values()
+            AssociationService.sync(REPORT_TAGS, 'report_id', report_id, tag_ids, mode='set')
+            ReportService._touch(report_id)
 
         # 原有字段更新逻辑保持不变
         for key, value in data.items():
@@ -128,7 +199,9 @@ class ReportService:
             if hasattr(report, key):
                 setattr(report, key, value)
 
+        CatalogVersionService.bump(CatalogVersionService.REPORTS)
         db.session.commit()
+        SearchService.index_report(report_id)
         return report
     
     @staticmethod
@@ -145,7 +218,9 @@ class ReportService:
         report = Report.query.get_or_404(report_id)
         # 软删除，只将is_active设为False
         report.is_active = False
+        CatalogVersionService.bump(CatalogVersionService.REPORTS)
         db.session.commit()
+        SearchService.index_report(report_id)
         
     @staticmethod
     def hard_delete_report(report_id):
@@ -160,7 +235,43 @@ class ReportService:
         """
         report = Report.query.get_or_404(report_id)
         db.session.delete(report)
+        CatalogVersionService.bump(CatalogVersionService.REPORTS, CatalogVersionService.ROLE_GROUPS)
         db.session.commit()
+        VisibilityService.invalidate_all()
+        SearchService.remove_report(report_id)
+
+    @staticmethod
+    def resolve_tag_ids(names):
+        """
+        一次性解析标签名称，缺失的标签批量创建（不提交）
+
+        Args:
+            names: 标签名称集合
+
+        Returns:
+            dict: 标签名称 -> 标签ID
+        """
+        from app.utils.upsert import upsert_insert  # app.utils 导入了本模块，延迟导入避免循环
+        if not names:
+            return {}
+        names = sorted(names)
+        db.session.execute(
+            upsert_insert(Tag.__table__).values([{'name': name} for name in names])
+            .on_conflict_do_nothing(index_elements=['name'])
+        )
+        return dict(db.session.execute(select(Tag.name, Tag.id).where(Tag.name.in_(names))).all())
+
+    @staticmethod
+    def _touch(report_id):
+        """
+        只修改标签关联时更新报表的修改时间（不提交）
+        其他进程的检索索引按修改时间增量读取报表，标签变更也需要体现在修改时间上
+
+        Args:
+            report_id: 报表ID
+        """
+        db.session.execute(update(Report.__table__).where(Report.__table__.c.id == report_id)
+                           .values(updated_at=datetime.utcnow()))
 
     @staticmethod
     def get_all_tags():
@@ -179,16 +290,14 @@ class ReportService:
             report_id: 报表ID
             tag_names: 标签名称列表
         """
-        report = Report.query.get_or_404(report_id)
-        existing_tags = Tag.query.filter(Tag.name.in_(tag_names)).all()
-
-        # 创建不存在的标签
-        existing_tag_names = {t.name for t in existing_tags}
-        new_tags = [Tag(name=name) for name in tag_names if name not in existing_tag_names]
-
-        # 批量添加关联
-        report.tags.extend(existing_tags + new_tags)
+        Report.query.get_or_404(report_id)
+        # 缺失的标签批量创建，再按差异批量添加关联
+        tag_ids = ReportService.resolve_tag_ids(set(tag_names)).values()
+        AssociationService.sync(REPORT_TAGS, 'report_id', report_id, tag_ids, mode='add')
+        ReportService._touch(report_id)
+        CatalogVersionService.bump(CatalogVersionService.REPORTS)
         db.session.commit()
+        SearchService.index_report(report_id)
 
     @staticmethod
     def remove_tags_from_report(report_id, tag_names):
@@ -198,13 +307,15 @@ class ReportService:
             report_id: 报表ID
             tag_names: 要移除的标签名称列表
         """
-        report = Report.query.options(joinedload(Report.tags)).get_or_404(report_id)
-        tags_to_remove = [t for t in report.tags if t.name in tag_names]
+        Report.query.get_or_404(report_id)
+        tag_ids = db.session.execute(select(Tag.id).where(Tag.name.in_(set(tag_names)))).scalars().all()
 
-        # 移除关联关系
-        for tag in tags_to_remove:
-            report.tags.remove(tag)
+        # 一条DELETE移除关联关系
+        AssociationService.sync(REPORT_TAGS, 'report_id', report_id, tag_ids, mode='remove')
+        ReportService._touch(report_id)
+        CatalogVersionService.bump(CatalogVersionService.REPORTS)
         db.session.commit()
+        SearchService.index_report(report_id)
 
     @staticmethod
     def get_reports_by_tag(tag_name):
@@ -0,0 +1,104 @@
+import threading
+from collections import OrderedDict
+from flask import current_app
+
+
+class ResponseCache:
+    """
+    响应缓存
+    缓存已编码的JSON响应体，键为 (接口, 请求路径, 权限指纹)，不包含用户ID，
+    因此角色和所属角色组相同的用户共享同一份缓存
+
+    每条缓存记录生成时的数据版本，读取时版本不一致即视为过期，保证多进程下的正确性；
+    同时写操作递增版本时会立即清除本进程中依赖这些数据范围的缓存，及时释放内存
+    """
+
+    _lock = threading.Lock()
+    # 缓存键 -> (依赖的数据范围, 数据版本, 响应体, 响应头)
+    _entries = OrderedDict()
+    _stats = {'hits': 0, 'misses': 0, 'stale': 0, 'evictions': 0, 'invalidations': 0}
+
+    @staticmethod
+    def get(key, versions):
+        """
+        读取缓存
+
+        Args:
+            key: 缓存键
+            versions: 当前数据版本
+
+        Returns:
+            tuple|None: (响应体, 响应头)，未命中或已过期时返回None
+        """
+        with ResponseCache._lock:
+            entry = ResponseCache._entries.get(key)
+            if entry is None:
+                ResponseCache._stats['misses'] += 1
+                return None
+            if entry[1] != versions:
+                del ResponseCache._entries[key]
+                ResponseCache._stats['stale'] += 1
+                ResponseCache._stats['misses'] += 1
+                return None
+            ResponseCache._entries.move_to_end(key)
+            ResponseCache._stats['hits'] += 1
+            return entry[2], entry[3]
+
+    @staticmethod
+    def set(key, scopes, versions, body, headers):
+        """
+        写入缓存
+
+        Args:
+            key: 缓存键
+            scopes: 响应依赖的数据范围
+            versions: 生成响应时的数据版本
+            body: 已编码的响应体
+            headers: 需要随缓存返回的响应头
+        """
+        max_entries = current_app.config.get('RESPONSE_CACHE_SIZE', 256)
+        with ResponseCache._lock:
+            ResponseCache._entries[key] = (frozenset(scopes), versions, body, headers)
+            ResponseCache._entries.move_to_end(key)
+            while len(ResponseCache._entries) > max_entries:
+                ResponseCache._entries.popitem(last=False)
+                ResponseCache._stats['evictions'] += 1
+
+    @staticmethod
+    def invalidate_scopes(scopes):
+        """
+        清除依赖指定数据范围的缓存
+
+        Args:
+            scopes: 数据范围列表
+        """
+        changed = set(scopes)
+        with ResponseCache._lock:
+            keys = [key for key, entry in ResponseCache._entries.items() if changed & entry[0]]
+            for key in keys:
+                del ResponseCache._entries[key]
+            ResponseCache._stats['invalidations'] += len(keys)
+
+    @staticmethod
+    def clear():
+        """
+        清空缓存
+        """
+        with ResponseCache._lock:
+            ResponseCache._entries.clear()
+
+    @staticmethod
+    def stats():
+        """
+        缓存命中统计
+
+        Returns:
+            dict: 命中/未命中/过期/淘汰/失效次数、命中率和当前条目数
+        """
+        with ResponseCache._lock:
+            stats = dict(ResponseCache._stats)
+            stats['size'] = len(ResponseCache._entries)
+            stats['bytes'] = sum(len(entry[2]) for entry in ResponseCache._entries.values())
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_ratio'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        return stats
@@ -1,7 +1,16 @@
 from app.models.role_group import RoleGroup
 from app.models.user import User
 from app.models.report import Report
+from app.services.visibility_service import VisibilityService
+from app.services.principal_service import PrincipalService
+from app.services.token_service import TokenService
+from app.queries.role_group_query import RoleGroupQuery
+from app.queries.user_query import UserQuery
+from app.queries.report_query import ReportQuery
 from app import db
+from flask import current_app, abort
+from app.services.catalog_version_service import CatalogVersionService
+from app.services.association_service import AssociationService, USER_ROLE_GROUPS, GROUP_VISIBLE_REPORTS
 
 class RoleGroupService:
     """
@@ -10,14 +19,29 @@ class RoleGroupService:
     """
     
     @staticmethod
-    def get_all_role_groups():
+    def get_all_role_groups(filters=None, page=None, stream=False, summary=False):
         """
-        获取所有角色组
+        获取所有角色组（只读记录，含成员和可见报表）
         
+        Args:
+            filters: 过滤条件字典，见 RoleGroupQuery.filters
+            page: 分页请求 PageRequest
+            stream: 是否流式读取（用于导出全部角色组）
+            summary: 是否只返回摘要（成员数、可见报表数），一条SQL完成
+
         Returns:
-            list: 角色组对象列表
+            list|iterator: RoleGroupRecord 列表；stream为True时返回按批从数据库读取的迭代器
         """
-        return RoleGroup.query.all()
+        where = RoleGroupQuery.filters(**(filters or {}))
+        batch_size = current_app.config.get('STREAM_BATCH_SIZE', 500)
+        if summary:
+            if stream:
+                return RoleGroupQuery.iter_summaries(where=where, page=page, yield_per=batch_size)
+            return RoleGroupQuery.list_summaries(where=where, page=page)
+        if stream:
+            return RoleGroupQuery.iter_role_groups(
+                where=where, page=page, batch_size=batch_size)
+        return RoleGroupQuery.list_role_groups(where=where, page=page)
     
     @staticmethod
     def get_role_group_by_id(group_id):
@@ -34,6 +58,26 @@ class RoleGroupService:
             404: 如果角色组不存在
         """
         return RoleGroup.query.get_or_404(group_id)
+
+    @staticmethod
+    def get_role_group_detail(group_id):
+        """
+        获取角色组详情（只读记录，含成员和可见报表）
+        与角色组列表共用批量查询，查询次数与成员数量无关
+
+        Args:
+            group_id: 角色组ID
+
+        Returns:
+            RoleGroupRecord: 角色组记录
+
+        Raises:
+            404: 如果角色组不存在
+        """
+        records = RoleGroupQuery.list_role_groups(where=[RoleGroup.__table__.c.id == group_id])
+        if not records:
+            abort(404)
+        return records[0]
     
     @staticmethod
     def create_role_group(data):
@@ -57,6 +101,7 @@ class RoleGroupService:
             description=data.get('description', '')
         )
         db.session.add(role_group)
+        CatalogVersionService.bump(CatalogVersionService.ROLE_GROUPS)
         db.session.commit()
         return role_group
     
@@ -86,7 +131,10 @@ class RoleGroupService:
         if 'description' in data:
             role_group.description = data['description']
             
+        CatalogVersionService.bump(CatalogVersionService.ROLE_GROUPS)
         db.session.commit()
+        # 用户快照中包含所属角色组的名称和描述
+        PrincipalService.invalidate_all()
         return role_group
     
     @staticmethod
@@ -102,24 +150,30 @@ class RoleGroupService:
         """
         role_group = RoleGroup.query.get_or_404(group_id)
         db.session.delete(role_group)
+        CatalogVersionService.bump(CatalogVersionService.ROLE_GROUPS, CatalogVersionService.USERS)
         db.session.commit()
+        VisibilityService.invalidate_all()
+        PrincipalService.invalidate_all()
     
     @staticmethod
-    def get_group_users(group_id):
+    def get_group_users(group_id, filters=None, page=None):
         """
         获取角色组下的所有用户
         
         Args:
             group_id: 角色组ID
+            filters: 过滤条件字典，见 UserQuery.filters
+            page: 分页请求 PageRequest
             
         Returns:
-            list: 用户对象列表
+            list: UserRecord 列表
             
         Raises:
             404: 如果角色组不存在
         """
-        role_group = RoleGroup.query.get_or_404(group_id)
-        return role_group.users
+        RoleGroup.query.get_or_404(group_id)
+        filters = dict(filters or {}, group_id=group_id)
+        return UserQuery.list_users(where=UserQuery.filters(**filters), page=page)
     
     @staticmethod
     def add_users_to_group(group_id, user_ids):
@@ -133,14 +187,34 @@ class RoleGroupService:
         Raises:
             404: 如果角色组不存在
         """
-        role_group = RoleGroup.query.get_or_404(group_id)
-        users = User.query.filter(User.id.in_(user_ids)).all()
-        
-        for user in users:
-            if user not in role_group.users:
-                role_group.users.append(user)
-                
+        RoleGroupService.sync_group_users(group_id, user_ids, mode='add')
+
+    @staticmethod
+    def sync_group_users(group_id, user_ids, mode='add'):
+        """
+        批量修改角色组成员，查询次数与用户数量无关
+
+        Args:
+            group_id: 角色组ID
+            user_ids: 用户ID列表，不存在的用户会被忽略
+            mode: add-添加，remove-移除，set-替换为user_ids
+
+        Returns:
+            tuple: (新增的用户ID列表, 移除的用户ID列表)
+
+        Raises:
+            404: 如果角色组不存在
+            ValueError: mode不支持
+        """
+        RoleGroup.query.get_or_404(group_id)
+        added, removed = AssociationService.sync(USER_ROLE_GROUPS, 'role_group_id', group_id, user_ids, mode)
+        if added or removed:
+            CatalogVersionService.bump(CatalogVersionService.ROLE_GROUPS, CatalogVersionService.USERS)
         db.session.commit()
+        VisibilityService.invalidate_users(added + removed)
+        PrincipalService.invalidate_users(added + removed)
+        TokenService.revoke_users(added + removed)
+        return added, removed
     
     @staticmethod
     def remove_user_from_group(group_id, user_id):
@@ -154,29 +228,28 @@ class RoleGroupService:
         Raises:
             404: 如果角色组或用户不存在
         """
-        role_group = RoleGroup.query.get_or_404(group_id)
-        user = User.query.get_or_404(user_id)
-        
-        if user in role_group.users:
-            role_group.users.remove(user)
-            db.session.commit()
+        User.query.get_or_404(user_id)
+        RoleGroupService.sync_group_users(group_id, [user_id], mode='remove')
     
     @staticmethod
-    def get_group_visible_reports(group_id):
+    def get_group_visible_reports(group_id, filters=None, page=None):
         """
         获取角色组可见的所有报表
         
         Args:
             group_id: 角色组ID
+            filters: 过滤条件字典，见 ReportQuery.filters
+            page: 分页请求 PageRequest
             
         Returns:
-            list: 报表对象列表
+            list: ReportRecord 列表
             
         Raises:
             404: 如果角色组不存在
         """
-        role_group = RoleGroup.query.get_or_404(group_id)
-        return role_group.visible_reports
+        RoleGroup.query.get_or_404(group_id)
+        filters = dict(filters or {}, group_id=group_id)
+        return ReportQuery.list_reports(where=ReportQuery.filters(**filters), page=page, with_description=True)
     
     @staticmethod
     def add_reports_to_group(group_id, report_ids):
@@ -190,14 +263,32 @@ class RoleGroupService:
         Raises:
             404: 如果角色组不存在
         """
-        role_group = RoleGroup.query.get_or_404(group_id)
-        reports = Report.query.filter(Report.id.in_(report_ids)).all()
-        
-        for report in reports:
-            if report not in role_group.visible_reports:
-                role_group.visible_reports.append(report)
-                
+        RoleGroupService.sync_group_reports(group_id, report_ids, mode='add')
+
+    @staticmethod
+    def sync_group_reports(group_id, report_ids, mode='add'):
+        """
+        批量修改角色组可见报表，查询次数与报表数量无关
+
+        Args:
+            group_id: 角色组ID
+            report_ids: 报表ID列表，不存在的报表会被忽略
+            mode: add-添加，remove-移除，set-替换为report_ids
+
+        Returns:
+            tuple: (新增的报表ID列表, 移除的报表ID列表)
+
+        Raises:
+            404: 如果角色组不存在
+            ValueError: mode不支持
+        """
+        RoleGroup.query.get_or_404(group_id)
+        added, removed = AssociationService.sync(GROUP_VISIBLE_REPORTS, 'group_id', group_id, report_ids, mode)
+        if added or removed:
+            CatalogVersionService.bump(CatalogVersionService.ROLE_GROUPS)
         db.session.commit()
+        VisibilityService.invalidate_groups([group_id])
+        return added, removed
     
     @staticmethod
     def remove_report_from_group(group_id, report_id):
@@ -211,34 +302,28 @@ class RoleGroupService:
         Raises:
             404: 如果角色组或报表不存在
         """
-        role_group = RoleGroup.query.get_or_404(group_id)
-        report = Report.query.get_or_404(report_id)
-        
-        if report in role_group.visible_reports:
-            role_group.visible_reports.remove(report)
-            db.session.commit()
+        Report.query.get_or_404(report_id)
+        RoleGroupService.sync_group_reports(group_id, [report_id], mode='remove')
     
     @staticmethod
-    def get_reports_not_in_group(group_id):
+    def get_reports_not_in_group(group_id, filters=None, page=None):
         """
         获取不在角色组可见列表中的所有报表
         
         Args:
             group_id: 角色组ID
+            filters: 过滤条件字典，见 ReportQuery.filters
+            page: 分页请求 PageRequest
             
         Returns:
-            list: 报表对象列表
+            list: ReportRecord 列表
             
         Raises:
             404: 如果角色组不存在
         """
-        role_group = RoleGroup.query.get_or_404(group_id)
-        visible_report_ids = [report.id for report in role_group.visible_reports]
-        
-        if visible_report_ids:
-            return Report.query.filter(Report.id.notin_(visible_report_ids)).all()
-        else:
-            return Report.query.all()
+        RoleGroup.query.get_or_404(group_id)
+        filters = dict(filters or {}, not_in_group_id=group_id)
+        return ReportQuery.list_reports(where=ReportQuery.filters(**filters), page=page, with_description=True)
     
     @staticmethod
     def set_group_visible_reports(group_id, report_ids):
@@ -252,16 +337,5 @@ class RoleGroupService:
         Raises:
             404: 如果角色组不存在
         """
-        role_group = RoleGroup.query.get_or_404(group_id)
-        reports = Report.query.filter(Report.id.in_(report_ids)).all()
-        
-        # 清空当前可见报表列表
-        role_group.visible_reports = []
-        
-        # 添加新的可见报表
-        for report in reports:
-            role_group.visible_reports.append(report)
-            
-        db.session.commit()
-        
-        return role_group.visible_reports 
\ No newline at end of file
+        RoleGroupService.sync_group_reports(group_id, report_ids, mode='set')
+        return RoleGroupService.get_role_group_by_id(group_id).visible_reports 
@@ -0,0 +1,324 @@
+import heapq
+import math
+import re
+import threading
+from collections import defaultdict
+from datetime import timedelta
+from flask import current_app
+from sqlalchemy import select
+from app import db
+from app.models.report import Report
+from app.queries.report_query import ReportQuery
+from app.services.catalog_version_service import CatalogVersionService
+
+# 拉丁字母/数字按单词切分，中日韩文字按连续片段切分
+_TOKEN_RE = re.compile(r'[0-9a-z]+|[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+')
+_CJK_RE = re.compile(r'[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]')
+
+# 字段权重：名称 > 标签 > 描述
+FIELD_WEIGHTS = (('name', 3.0), ('tags', 2.0), ('description', 1.0))
+
+
+def tokenize(text, for_query=False):
+    """
+    分词
+    拉丁文本按单词（小写）切分；中文按字符二元组(bigram)切分，同时索引单字以支持单字查询
+
+    Args:
+        text: 待分词文本
+        for_query: 是否为查询分词（查询时多字中文只使用二元组，单字才使用单字）
+
+    Returns:
+        list: 词项列表
+    """
+    tokens = []
+    for match in _TOKEN_RE.finditer((text or '').lower()):
+        run = match.group()
+        if not _CJK_RE.match(run):
+            tokens.append(run)
+            continue
+        if len(run) == 1 or not for_query:
+            tokens.extend(run)
+        tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+class ReportSearchIndex:
+    """
+    报表倒排索引
+    词项 -> {报表ID: 字段加权词频}，另外记录每个报表的词项和状态，用于增量更新与过滤；
+    按权重降序排列的倒排表在首次检索该词项时生成，用于Top-K检索提前结束；
+    watermark 为已索引报表的最大修改时间，用于增量读取其他进程修改过的报表
+    """
+
+    __slots__ = ('postings', 'documents', 'ranked', 'version', 'watermark')
+
+    def __init__(self, version=None):
+        self.postings = defaultdict(dict)
+        # 报表ID -> (词项元组, 是否激活, 是否隐藏)
+        self.documents = {}
+        # 词项 -> 按 (权重降序, 报表ID升序) 排列的报表ID列表
+        self.ranked = {}
+        self.version = version
+        self.watermark = None
+
+    def add(self, report_id, name, description, tags, is_active, is_hide_report):
+        """
+        添加或替换一个报表的索引
+        """
+        self.remove(report_id)
+        weights = defaultdict(float)
+        fields = {'name': name, 'tags': ' '.join(tags), 'description': description}
+        for field, field_weight in FIELD_WEIGHTS:
+            for token in tokenize(fields[field]):
+                weights[token] += field_weight
+        for token, weight in weights.items():
+            self.postings[token][report_id] = weight
+            self.ranked.pop(token, None)
+        self.documents[report_id] = (tuple(weights), is_active, is_hide_report)
+
+    def remove(self, report_id):
+        """
+        移除一个报表的索引
+        """
+        document = self.documents.pop(report_id, None)
+        if document is None:
+            return
+        for token in document[0]:
+            posting = self.postings.get(token)
+            self.ranked.pop(token, None)
+            if posting is not None:
+                posting.pop(report_id, None)
+                if not posting:
+                    del self.postings[token]
+
+    def search(self, query, accept=None, limit=None):
+        """
+        检索报表
+        所有查询词项都必须命中（AND），按 字段加权词频 x IDF 求和排序
+
+        Args:
+            query: 查询文本
+            accept: 过滤函数，参数为 (报表ID, 是否激活, 是否隐藏)，返回False的报表被排除
+            limit: 只返回得分最高的前N条，None表示全部
+
+        Returns:
+            list: [(报表ID, 得分)]，按得分从高到低排序
+        """
+        tokens = set(tokenize(query, for_query=True))
+        if not tokens:
+            return []
+        postings = [(token, self.postings.get(token)) for token in tokens]
+        if not all(posting for _, posting in postings):
+            return []
+        postings.sort(key=lambda item: len(item[1]))
+
+        if limit is not None:
+            return self._top_k(postings, accept, limit)
+        postings = [posting for _, posting in postings]
+
+        candidates = postings[0].keys()
+        for posting in postings[1:]:
+            candidates = candidates & posting.keys()
+            if not candidates:
+                return []
+
+        total = len(self.documents)
+        idfs = [(posting, math.log(1 + total / len(posting))) for posting in postings]
+        if accept is not None:
+            documents = self.documents
+            candidates = [report_id for report_id in candidates if accept(report_id, *documents[report_id][1:])]
+
+        if len(idfs) == 1:
+            posting, idf = idfs[0]
+            results = [(report_id, posting[report_id] * idf) for report_id in candidates]
+        else:
+            results = [(report_id, sum(posting[report_id] * idf for posting, idf in idfs)) for report_id in candidates]
+
+        return sorted(results, key=lambda item: (-item[1], item[0]))
+
+    def _ranked(self, token):
+        """
+        获取按权重降序排列的倒排表（懒生成，词项变更时失效）
+        """
+        ranked = self.ranked.get(token)
+        if ranked is None:
+            posting = self.postings[token]
+            ranked = sorted(posting, key=lambda report_id: (-posting[report_id], report_id))
+            self.ranked[token] = ranked
+        return ranked
+
+    def _top_k(self, postings, accept, limit):
+        """
+        Top-K检索
+        按权重降序遍历最短的倒排表，其余词项取最大权重作为得分上界，
+        当前文档的得分上界已低于第K名时提前结束，避免为宽泛查询计算全部候选的得分
+        """
+        total = len(self.documents)
+        weighted = []
+        for token, posting in postings:
+            ranked = self._ranked(token)
+            weighted.append((posting, math.log(1 + total / len(posting)), posting[ranked[0]]))
+        (lead, lead_idf, _), others = weighted[0], weighted[1:]
+        rest_bound = sum(max_weight * idf for _, idf, max_weight in others)
+
+        # 小顶堆，堆顶为当前第K名：(得分, -报表ID)
+        heap = []
+        documents = self.documents
+        for report_id in self._ranked(postings[0][0]):
+            score = lead[report_id] * lead_idf
+            if len(heap) == limit and score + rest_bound < heap[0][0]:
+                break
+            for posting, idf, _ in others:
+                weight = posting.get(report_id)
+                if weight is None:
+                    break
+                score += weight * idf
+            else:
+                if accept is not None and not accept(report_id, *documents[report_id][1:]):
+                    continue
+                item = (score, -report_id)
+                if len(heap) < limit:
+                    heapq.heappush(heap, item)
+                elif item > heap[0]:
+                    heapq.heapreplace(heap, item)
+        return [(-neg_id, score) for score, neg_id in sorted(heap, reverse=True)]
+
+
+class SearchService:
+    """
+    报表全文检索服务类
+    进程内维护报表倒排索引（名称、描述、标签），报表写操作后增量更新；
+    索引记录报表数据版本和已索引的最大修改时间，发现其他进程修改过报表时，
+    只读取修改时间晚于该时间的报表并移除已删除的报表，不重建整个索引
+    """
+
+    _lock = threading.RLock()
+    _index = None
+
+    @staticmethod
+    def _current_version():
+        return CatalogVersionService.get_versions(CatalogVersionService.REPORTS)[0]
+
+    @staticmethod
+    def get_index():
+        """
+        获取与当前报表数据版本一致的索引，不一致时增量刷新，尚未构建时全量构建
+
+        Returns:
+            ReportSearchIndex: 报表倒排索引
+        """
+        version = SearchService._current_version()
+        index = SearchService._index
+        if index is not None and index.version == version:
+            return index
+        with SearchService._lock:
+            index = SearchService._index
+            if index is None:
+                index = SearchService._build(version)
+                SearchService._index = index
+            elif index.version != version:
+                SearchService._refresh(index, version)
+        return index
+
+    @staticmethod
+    def _build(version):
+        """
+        从数据库全量构建索引
+        """
+        index = ReportSearchIndex(version)
+        SearchService._add_records(index, ReportQuery.list_reports(with_description=True))
+        return index
+
+    @staticmethod
+    def _refresh(index, version):
+        """
+        增量刷新索引（调用方持有锁）
+        重新索引修改时间不早于 水位 - SEARCH_DELTA_OVERLAP 的报表，移除数据库中已不存在的报表；
+        version 须在读取报表之前取得，期间若有新的写入，下次检索时会再次刷新
+        """
+        reports_table = Report.__table__
+        where = []
+        if index.watermark is not None:
+            overlap = timedelta(seconds=current_app.config.get('SEARCH_DELTA_OVERLAP', 300))
+            where.append(reports_table.c.updated_at >= index.watermark - overlap)
+        records = ReportQuery.list_reports(where=where, with_description=True)
+        existing = set(db.session.execute(select(reports_table.c.id)).scalars())
+        for report_id in [report_id for report_id in index.documents if report_id not in existing]:
+            index.remove(report_id)
+        SearchService._add_records(index, records)
+        index.version = version
+
+    @staticmethod
+    def _add_records(index, records):
+        """
+        将报表记录写入索引并推进水位
+        """
+        for record in records:
+            index.add(record.id, record.name, record.description, record.tags,
+                      record.is_active, record.is_hide_report)
+            if record.updated_at is not None and (index.watermark is None or record.updated_at > index.watermark):
+                index.watermark = record.updated_at
+
+    @staticmethod
+    def index_report(report_id):
+        """
+        报表新增/修改后（已提交）增量更新索引
+
+        Args:
+            report_id: 报表ID
+        """
+        records = ReportQuery.list_reports(where=[Report.__table__.c.id == report_id], with_description=True)
+
+        def change(index):
+            if not records:
+                index.remove(report_id)
+            SearchService._add_records(index, records)
+
+        SearchService._apply(change)
+
+    @staticmethod
+    def remove_report(report_id):
+        """
+        报表删除后（已提交）从索引中移除
+
+        Args:
+            report_id: 报表ID
+        """
+        SearchService._apply(lambda index: index.remove(report_id))
+
+    @staticmethod
+    def _apply(change):
+        """
+        对已构建的索引执行增量修改
+        本次写操作恰好使版本号加一时直接修改索引；更大时说明期间有其他写入，按修改时间增量刷新（包含本次修改）；
+        不大于索引版本时索引已由其他请求刷新到包含本次修改
+        """
+        with SearchService._lock:
+            index = SearchService._index
+            if index is None:
+                return
+            version = SearchService._current_version()
+            if version == index.version + 1:
+                change(index)
+                index.version = version
+            elif version > index.version:
+                SearchService._refresh(index, version)
+
+    @staticmethod
+    def search(query, accept=None, limit=20):
+        """
+        检索报表
+
+        Args:
+            query: 查询文本
+            accept: 过滤函数，见 ReportSearchIndex.search
+            limit: 最多返回条数
+
+        Returns:
+            list: [(报表ID, 得分)]
+        """
+        index = SearchService.get_index()
+        # 增量更新会修改索引内容，检索时持有同一把锁
+        with SearchService._lock:
+            return index.search(query, accept, limit)
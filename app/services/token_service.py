@@ -0,0 +1,297 @@
+import threading
+import time
+import uuid
+from flask import current_app
+from sqlalchemy import select, delete
+from app import db
+from app.models.token_revocation import TokenRevocation
+from app.models.user import role_has_permission
+
+ACCESS = 'access'
+REFRESH = 'refresh'
+
+
+class TokenError(Exception):
+    """
+    令牌无效、过期或已被吊销
+    """
+
+
+class TokenPrincipal:
+    """
+    由访问令牌声明构造的当前用户，作为 Flask-Login 的 current_user
+    用户ID、角色、角色组均来自令牌，权限检查不需要查询用户表；是否停用按用户快照判断
+
+    Attributes:
+        id: 用户ID
+        role: 用户角色
+        group_ids: 所属角色组ID元组（已排序）
+        claims: 令牌声明
+    """
+
+    __slots__ = ('id', 'role', 'group_ids', 'claims')
+
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, claims):
+        self.id = int(claims['sub'])
+        self.role = claims.get('role')
+        self.group_ids = tuple(sorted(claims.get('groups', ())))
+        self.claims = claims
+
+    def get_id(self):
+        return str(self.id)
+
+    @property
+    def is_active(self):
+        """
+        用户是否仍为激活状态（读取用户快照，用户停用后未过期的访问令牌随即失效）
+        """
+        from app.services.principal_service import PrincipalService
+        principal = PrincipalService.get(self.id)
+        return principal is not None and principal.is_active
+
+    def has_permission(self, permission):
+        """
+        检查用户是否具有特定权限，规则同 User.has_permission
+        """
+        return role_has_permission(self.role, permission)
+
+    def can_view_report(self, report):
+        """
+        按令牌中的角色组检查报表可见性（可见报表集合按角色组组合缓存）
+        """
+        if self.role == 'admin':
+            return True
+        from app.services.visibility_service import VisibilityService
+        return report.id in VisibilityService.get_group_report_ids(self.group_ids)
+
+    def to_dict(self):
+        """
+        完整用户信息（姓名、邮箱等不在令牌中，从用户快照读取）
+        """
+        from app.services.principal_service import PrincipalService
+        principal = PrincipalService.get(self.id)
+        return principal.to_dict() if principal else {'id': self.id, 'role': self.role}
+
+    def __repr__(self):
+        return f'<TokenPrincipal {self.id} {self.role}>'
+
+
+class TokenService:
+    """
+    访问令牌服务类
+    签发携带用户ID、角色、角色组的短期访问令牌（HS256签名）和长期刷新令牌；
+    吊销记录保存在数据库，每个进程在内存中保留一份并定期刷新，校验令牌时不访问数据库
+    """
+
+    _lock = threading.Lock()
+    # 吊销键 -> 吊销时间
+    _revoked = {}
+    _loaded_at = None
+
+    @staticmethod
+    def _secret():
+        return current_app.config.get('JWT_SECRET_KEY') or current_app.config['SECRET_KEY']
+
+    @staticmethod
+    def _algorithm():
+        return current_app.config.get('JWT_ALGORITHM', 'HS256')
+
+    @staticmethod
+    def issue(principal):
+        """
+        签发一对访问令牌和刷新令牌
+
+        Args:
+            principal: 拥有 id / role / group_ids 的用户对象（Principal）
+
+        Returns:
+            dict: {access_token, refresh_token, token_type, expires_in}
+        """
+        import jwt
+        now = time.time()
+        access_ttl = current_app.config.get('ACCESS_TOKEN_TTL', 900)
+        refresh_ttl = current_app.config.get('REFRESH_TOKEN_TTL', 7 * 24 * 3600)
+        access_token = jwt.encode({
+            'sub': str(principal.id),
+            'role': principal.role,
+            'groups': list(principal.group_ids),
+            'type': ACCESS,
+            'jti': uuid.uuid4().hex,
+            'iat': now,
+            'exp': int(now + access_ttl)
+        }, TokenService._secret(), algorithm=TokenService._algorithm())
+        refresh_token = jwt.encode({
+            'sub': str(principal.id),
+            'type': REFRESH,
+            'jti': uuid.uuid4().hex,
+            'iat': now,
+            'exp': int(now + refresh_ttl)
+        }, TokenService._secret(), algorithm=TokenService._algorithm())
+        return {
+            'access_token': access_token,
+            'refresh_token': refresh_token,
+            'token_type': 'Bearer',
+            'expires_in': access_ttl
+        }
+
+    @staticmethod
+    def decode(token, token_type=ACCESS):
+        """
+        校验并解析令牌
+
+        Args:
+            token: 令牌字符串
+            token_type: 期望的令牌类型（access / refresh）
+
+        Returns:
+            dict: 令牌声明
+
+        Raises:
+            TokenError: 签名错误、已过期、类型不符或已被吊销
+        """
+        # 只在启用令牌认证并实际收到令牌时才导入 PyJWT
+        import jwt
+        try:
+            claims = jwt.decode(token, TokenService._secret(), algorithms=[TokenService._algorithm()],
+                                options={'require': ['sub', 'exp', 'iat', 'jti']})
+        except jwt.ExpiredSignatureError:
+            raise TokenError('令牌已过期')
+        except jwt.InvalidTokenError:
+            raise TokenError('无效的令牌')
+        if claims.get('type') != token_type:
+            raise TokenError('令牌类型错误')
+        if TokenService.is_revoked(claims):
+            raise TokenError('令牌已被吊销')
+        return claims
+
+    @staticmethod
+    def load_request_principal(request):
+        """
+        从 Authorization: Bearer 请求头解析当前用户（供 login_manager.request_loader 使用）
+
+        Returns:
+            TokenPrincipal|None: 未携带令牌、令牌无效、用户已停用或未启用令牌认证时返回None
+        """
+        if not current_app.config.get('TOKEN_AUTH_ENABLED'):
+            return None
+        header = request.headers.get('Authorization', '')
+        scheme, _, token = header.partition(' ')
+        if scheme.lower() != 'bearer' or not token:
+            return None
+        try:
+            principal = TokenPrincipal(TokenService.decode(token.strip(), ACCESS))
+        except TokenError:
+            return None
+        return principal if principal.is_active else None
+
+    @staticmethod
+    def is_revoked(claims):
+        """
+        在内存吊销列表中检查令牌（到刷新间隔时先从数据库重新加载）
+        按用户吊销只作用于访问令牌：刷新令牌不携带角色声明，刷新时会按最新的用户信息重新签发
+        """
+        TokenService._refresh()
+        revoked = TokenService._revoked
+        if f"jti:{claims['jti']}" in revoked:
+            return True
+        if claims.get('type') != ACCESS:
+            return False
+        revoked_at = revoked.get(f"user:{claims['sub']}")
+        return revoked_at is not None and claims['iat'] <= revoked_at
+
+    @staticmethod
+    def _refresh(force=False):
+        """
+        从数据库重新加载未过期的吊销记录
+        """
+        now = time.time()
+        interval = current_app.config.get('TOKEN_REVOCATION_REFRESH', 10)
+        loaded_at = TokenService._loaded_at
+        if not force and loaded_at is not None and now - loaded_at < interval:
+            return
+        with TokenService._lock:
+            if not force and TokenService._loaded_at is not None and now - TokenService._loaded_at < interval:
+                return
+            rows = db.session.execute(
+                select(TokenRevocation.key, TokenRevocation.revoked_at).where(TokenRevocation.expires_at > now)
+            ).all()
+            TokenService._revoked = dict(rows)
+            TokenService._loaded_at = now
+
+    @staticmethod
+    def _store(entries):
+        """
+        写入吊销记录并提交，同时更新本进程的内存列表
+
+        Args:
+            entries: [(吊销键, 记录过期时间)]
+        """
+        from app.utils.upsert import upsert_insert  # app.utils 会导入服务层，延迟导入避免循环
+        now = time.time()
+        stmt = upsert_insert(TokenRevocation.__table__).values([
+            {'key': key, 'revoked_at': now, 'expires_at': expires_at} for key, expires_at in entries
+        ])
+        db.session.execute(stmt.on_conflict_do_update(
+            index_elements=['key'],
+            set_={'revoked_at': stmt.excluded.revoked_at, 'expires_at': stmt.excluded.expires_at}
+        ))
+        # 顺带清理已过期的记录，吊销表只保留仍可能有效的令牌
+        db.session.execute(delete(TokenRevocation).where(TokenRevocation.expires_at <= now))
+        db.session.commit()
+        with TokenService._lock:
+            revoked = dict(TokenService._revoked)
+            revoked.update((key, now) for key, _ in entries)
+            TokenService._revoked = revoked
+
+    @staticmethod
+    def revoke(*claims_list):
+        """
+        吊销指定令牌（登出、刷新时作废旧的刷新令牌）
+
+        Args:
+            claims_list: 令牌声明
+        """
+        entries = [(f"jti:{claims['jti']}", claims['exp']) for claims in claims_list if claims]
+        if entries:
+            TokenService._store(entries)
+
+    @staticmethod
+    def consume(claims):
+        """
+        作废刷新令牌（刷新时调用）：吊销记录以条件插入写入（ON CONFLICT DO NOTHING），
+        同一刷新令牌的并发刷新只有一次能写入成功
+
+        Args:
+            claims: 刷新令牌声明
+
+        Returns:
+            bool: 本次是否作废成功；令牌此前已被作废时返回False
+        """
+        from app.utils.upsert import upsert_insert  # app.utils 会导入服务层，延迟导入避免循环
+        now = time.time()
+        key = f"jti:{claims['jti']}"
+        stmt = upsert_insert(TokenRevocation.__table__).values(key=key, revoked_at=now, expires_at=claims['exp'])
+        inserted = db.session.execute(stmt.on_conflict_do_nothing(index_elements=['key'])).rowcount == 1
+        db.session.commit()
+        with TokenService._lock:
+            revoked = dict(TokenService._revoked)
+            revoked.setdefault(key, now)
+            TokenService._revoked = revoked
+        return inserted
+
+    @staticmethod
+    def revoke_users(user_ids):
+        """
+        吊销用户此前签发的全部访问令牌（角色、角色组变更或用户删除后调用，令牌中的声明已过时）
+        未启用令牌认证时不做任何事
+
+        Args:
+            user_ids: 用户ID列表
+        """
+        if not user_ids or not current_app.config.get('TOKEN_AUTH_ENABLED'):
+            return
+        expires_at = time.time() + current_app.config.get('REFRESH_TOKEN_TTL', 7 * 24 * 3600)
+        TokenService._store([(f'user:{user_id}', expires_at) for user_id in set(user_ids)])
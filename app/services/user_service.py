@@ -1,5 +1,12 @@
 from app.models import User, RoleGroup, UserRoleGroup
+from app.services.visibility_service import VisibilityService
+from app.services.principal_service import PrincipalService
+from app.services.token_service import TokenService
+from app.queries.user_query import UserQuery
 from app import db
+from flask import current_app
+from app.services.catalog_version_service import CatalogVersionService
+from app.services.association_service import AssociationService, USER_ROLE_GROUPS
 
 class UserService:
     """
@@ -8,14 +15,22 @@ class UserService:
     """
     
     @staticmethod
-    def get_all_users():
+    def get_all_users(filters=None, page=None, stream=False):
         """
-        获取所有用户
+        获取所有用户（只读记录，含所属角色组）
         
+        Args:
+            filters: 过滤条件字典，见 UserQuery.filters
+            page: 分页请求 PageRequest
+            stream: 是否流式读取（用于导出全部用户）
+
         Returns:
-            list: 用户对象列表
+            list|iterator: UserRecord 列表；stream为True时返回按批从数据库读取的迭代器
         """
-        return User.query.all()
+        where = UserQuery.filters(**(filters or {}))
+        if stream:
+            return UserQuery.iter_users(where=where, page=page, yield_per=current_app.config.get('STREAM_BATCH_SIZE', 500))
+        return UserQuery.list_users(where=where, page=page)
     
     @staticmethod
     def get_user_by_id(user_id):
@@ -88,6 +103,7 @@ class UserService:
             if field in data:
                 setattr(user, field, data[field])
 
+        CatalogVersionService.bump(CatalogVersionService.USERS)
         db.session.commit()
         UserService.add_user_to_role_groups(user_id, data.get('role_group_ids', []))
 
@@ -106,7 +122,11 @@ class UserService:
         """
         user = User.query.get_or_404(user_id)
         db.session.delete(user)
+        CatalogVersionService.bump(CatalogVersionService.USERS, CatalogVersionService.ROLE_GROUPS)
         db.session.commit()
+        VisibilityService.invalidate_users([user_id])
+        PrincipalService.invalidate_users([user_id])
+        TokenService.revoke_users([user_id])
     
     @staticmethod
     def get_user_role_groups(user_id):
@@ -128,7 +148,7 @@ class UserService:
     @staticmethod
     def add_user_to_role_groups(user_id, role_group_ids):
         """
-        将用户添加到多个角色组
+        将用户添加到多个角色组（不在列表中的角色组会被移除）
         
         Args:
             user_id: 用户ID
@@ -137,18 +157,14 @@ class UserService:
         Raises:
             404: 如果用户或角色组不存在
         """
-        user = User.query.get_or_404(user_id)
-        role_groups = RoleGroup.query.filter(RoleGroup.id.in_(role_group_ids)).all()
-        
-        for role_group in role_groups:
-            if role_group not in user.role_groups:
-                user.role_groups.append(role_group)
-
-        for role_group in user.role_groups:
-            if role_group not in role_groups:
-                user.role_groups.remove(role_group)
-                
+        User.query.get_or_404(user_id)
+        added, removed = AssociationService.sync(USER_ROLE_GROUPS, 'user_id', user_id, role_group_ids, mode='set')
+        if added or removed:
+            CatalogVersionService.bump(CatalogVersionService.USERS, CatalogVersionService.ROLE_GROUPS)
         db.session.commit()
+        VisibilityService.invalidate_users([user_id])
+        PrincipalService.invalidate_users([user_id])
+        TokenService.revoke_users([user_id])
     
     @staticmethod
     def remove_user_from_role_group(user_id, role_group_id):
@@ -162,9 +178,12 @@ class UserService:
         Raises:
             404: 如果用户或角色组不存在
         """
-        user = User.query.get_or_404(user_id)
-        role_group = RoleGroup.query.get_or_404(role_group_id)
-        
-        if role_group in user.role_group:
-            user.role_groups.remove(role_group)
-            db.session.commit() 
\ No newline at end of file
+        User.query.get_or_404(user_id)
+        RoleGroup.query.get_or_404(role_group_id)
+        _, removed = AssociationService.sync(USER_ROLE_GROUPS, 'user_id', user_id, [role_group_id], mode='remove')
+        if removed:
+            CatalogVersionService.bump(CatalogVersionService.USERS, CatalogVersionService.ROLE_GROUPS)
+            db.session.commit()
+            VisibilityService.invalidate_users([user_id])
+            PrincipalService.invalidate_users([user_id])
+            TokenService.revoke_users([user_id])
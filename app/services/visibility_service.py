@@ -0,0 +1,193 @@
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app
+from app import db
+from app.models.user_role_group import UserRoleGroup
+from app.models.role_group import group_visible_reports
+from app.services.catalog_version_service import CatalogVersionService
+from app.services.metrics import CACHE_REQUESTS
+
+
+class VisibilityService:
+    """
+    报表可见性服务类
+    为每个用户预先计算可见报表ID集合并缓存在进程内，
+    使报表可见性检查变为一次O(1)的集合成员判断
+
+    缓存分两层：
+        用户ID -> 角色组ID元组（按ID排序，作为角色组组合的键）
+        角色组组合 -> 可见报表ID集合（同一组合的用户共享同一个集合）
+
+    每条缓存记录生成时的角色组数据版本（ROLE_GROUPS），读取时版本不一致即重新加载，
+    其他工作进程修改成员关系或可见报表后，本进程的下一个请求即可生效
+    """
+
+    _lock = threading.Lock()
+    # 用户ID -> (过期时间, 角色组数据版本, 角色组ID元组)
+    _user_groups = OrderedDict()
+    # 角色组ID元组 -> (过期时间, 角色组数据版本, 可见报表ID集合)
+    _group_reports = OrderedDict()
+
+    @staticmethod
+    def _ttl():
+        return current_app.config.get('VISIBILITY_CACHE_TTL', 60)
+
+    @staticmethod
+    def _max_users():
+        return current_app.config.get('VISIBILITY_CACHE_SIZE', 10000)
+
+    @staticmethod
+    def _max_groups():
+        return current_app.config.get('VISIBILITY_GROUP_CACHE_SIZE', 2000)
+
+    @staticmethod
+    def _version():
+        # 在读取成员关系/可见报表之前读取版本号，并发修改时缓存只会被标记为旧版本而重新加载
+        return CatalogVersionService.get_versions(CatalogVersionService.ROLE_GROUPS)[0]
+
+    @staticmethod
+    def _store_group_reports(group_ids, expires_at, version, report_ids):
+        """
+        写入角色组组合的报表集合（调用方已持有锁），超出容量时淘汰最久未使用的组合
+        """
+        cache = VisibilityService._group_reports
+        cache[group_ids] = (expires_at, version, report_ids)
+        cache.move_to_end(group_ids)
+        while len(cache) > VisibilityService._max_groups():
+            cache.popitem(last=False)
+
+    @staticmethod
+    def get_user_group_ids(user_id):
+        """
+        获取用户所属角色组ID（已排序）
+
+        Args:
+            user_id: 用户ID
+
+        Returns:
+            tuple: 角色组ID元组
+        """
+        version = VisibilityService._version()
+        now = time.monotonic()
+        with VisibilityService._lock:
+            entry = VisibilityService._user_groups.get(user_id)
+            if entry and entry[0] > now and entry[1] == version:
+                VisibilityService._user_groups.move_to_end(user_id)
+                CACHE_REQUESTS.inc(('visibility_user', 'hit'))
+                return entry[2]
+        CACHE_REQUESTS.inc(('visibility_user', 'miss'))
+        return VisibilityService._load_user(user_id, version)[0]
+
+    @staticmethod
+    def get_visible_report_ids(user_id):
+        """
+        获取用户可见的报表ID集合
+
+        Args:
+            user_id: 用户ID
+
+        Returns:
+            frozenset: 可见报表ID集合
+        """
+        group_ids = VisibilityService.get_user_group_ids(user_id)
+        return VisibilityService.get_group_report_ids(group_ids)
+
+    @staticmethod
+    def get_group_report_ids(group_ids):
+        """
+        获取一组角色组合计可见的报表ID集合
+
+        Args:
+            group_ids: 已排序的角色组ID元组
+
+        Returns:
+            frozenset: 可见报表ID集合
+        """
+        if not group_ids:
+            return frozenset()
+        version = VisibilityService._version()
+        now = time.monotonic()
+        with VisibilityService._lock:
+            entry = VisibilityService._group_reports.get(group_ids)
+            if entry and entry[0] > now and entry[1] == version:
+                VisibilityService._group_reports.move_to_end(group_ids)
+                CACHE_REQUESTS.inc(('visibility_group', 'hit'))
+                return entry[2]
+        CACHE_REQUESTS.inc(('visibility_group', 'miss'))
+
+        rows = db.session.query(group_visible_reports.c.report_id).filter(
+            group_visible_reports.c.group_id.in_(group_ids)
+        ).distinct().all()
+        report_ids = frozenset(row[0] for row in rows)
+        with VisibilityService._lock:
+            VisibilityService._store_group_reports(group_ids, now + VisibilityService._ttl(), version, report_ids)
+        return report_ids
+
+    @staticmethod
+    def _load_user(user_id, version):
+        """
+        一次查询同时加载用户的角色组及其可见报表，并写入两层缓存
+
+        Args:
+            user_id: 用户ID
+            version: 加载前读取的角色组数据版本
+
+        Returns:
+            tuple: (角色组ID元组, 可见报表ID集合)
+        """
+        rows = db.session.query(UserRoleGroup.role_group_id, group_visible_reports.c.report_id).outerjoin(
+            group_visible_reports, group_visible_reports.c.group_id == UserRoleGroup.role_group_id
+        ).filter(UserRoleGroup.user_id == user_id).all()
+
+        group_ids = tuple(sorted({row[0] for row in rows}))
+        report_ids = frozenset(row[1] for row in rows if row[1] is not None)
+
+        expires_at = time.monotonic() + VisibilityService._ttl()
+        with VisibilityService._lock:
+            cache = VisibilityService._user_groups
+            cache[user_id] = (expires_at, version, group_ids)
+            cache.move_to_end(user_id)
+            while len(cache) > VisibilityService._max_users():
+                cache.popitem(last=False)
+            if group_ids:
+                # 已有的同组合集合直接复用，避免重复占用内存
+                current = VisibilityService._group_reports.get(group_ids)
+                if current and current[2] == report_ids:
+                    report_ids = current[2]
+                VisibilityService._store_group_reports(group_ids, expires_at, version, report_ids)
+        return group_ids, report_ids
+
+    @staticmethod
+    def invalidate_users(user_ids):
+        """
+        用户的角色组成员关系变更后，清除这些用户的缓存
+
+        Args:
+            user_ids: 用户ID列表
+        """
+        with VisibilityService._lock:
+            for user_id in user_ids:
+                VisibilityService._user_groups.pop(user_id, None)
+
+    @staticmethod
+    def invalidate_groups(group_ids):
+        """
+        角色组的可见报表变更后，清除包含这些角色组的报表集合缓存
+
+        Args:
+            group_ids: 角色组ID列表
+        """
+        changed = set(group_ids)
+        with VisibilityService._lock:
+            for key in [key for key in VisibilityService._group_reports if changed.intersection(key)]:
+                del VisibilityService._group_reports[key]
+
+    @staticmethod
+    def invalidate_all():
+        """
+        清空全部可见性缓存（角色组删除、报表硬删除等情况）
+        """
+        with VisibilityService._lock:
+            VisibilityService._user_groups.clear()
+            VisibilityService._group_reports.clear()
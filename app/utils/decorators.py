@@ -1,9 +1,31 @@
 from functools import wraps
 from flask import jsonify
 from flask_login import current_user
-from flask import request
+from flask import request, g
 from app.services.report_service import ReportService  # 添加服务类导入
 
+
+def check_report_access(report_id):
+    """
+    加载报表并判断当前用户是否可见，结果在本次请求内缓存到 flask.g
+    同一请求中多次调用只查询一次报表，可见性判断基于缓存的可见报表ID集合
+
+    Args:
+        report_id: 报表ID
+
+    Returns:
+        tuple: (报表对象, 是否可见)
+
+    Raises:
+        404: 如果报表不存在
+    """
+    report = g.get('report')
+    if report is None or report.id != report_id:
+        report = ReportService.get_report_by_id(report_id)
+        g.report = report
+        g.report_visible = current_user.can_view_report(report)
+    return report, g.report_visible
+
 def permission_required(resource_type):
     """
     权限检查装饰器
@@ -30,7 +52,8 @@ def permission_required(resource_type):
             # 报表查看单独做一个权限检查
             if resource_type == 'report':
                 report_id = kwargs.get('report_id') or request.json.get('report_id')
-                if not current_user.can_view_report(ReportService.get_report_by_id(report_id)):
+                _, visible = check_report_access(report_id)
+                if not visible:
                     return jsonify({'error': '无该报表访问权限'}), 403
             # 传统权限检查
             elif not current_user.has_permission(resource_type):
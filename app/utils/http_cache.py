@@ -0,0 +1,106 @@
+import hashlib
+from functools import wraps
+from flask import request, make_response, current_app
+from flask_login import current_user
+from app.services.catalog_version_service import CatalogVersionService
+from app.services.response_cache import ResponseCache
+from app.services.visibility_service import VisibilityService
+
+# 命中响应缓存时需要一并返回的响应头
+CACHED_HEADERS = ('X-Next-Cursor',)
+
+
+def permission_fingerprint(vary='groups'):
+    """
+    当前用户的权限指纹
+
+    Args:
+        vary: 响应内容随什么变化
+            'role'   - 只与角色有关（如角色组、用户管理列表）
+            'groups' - 与角色及所属角色组有关（如报表列表），同角色同角色组的用户指纹相同
+            'user'   - 与具体用户有关（如当前用户信息），指纹包含用户ID
+
+    Returns:
+        str: 权限指纹
+
+    角色组ID来自进程内缓存，缓存按本次请求读取的 ROLE_GROUPS 版本校验（见 VisibilityService），
+    与响应缓存键使用的版本号一致：其他进程修改成员关系后，版本变化会让指纹和缓存同时重新计算
+    """
+    if not current_user.is_authenticated:
+        return 'anonymous'
+    if vary == 'role':
+        return current_user.role
+    group_ids = VisibilityService.get_user_group_ids(current_user.id)
+    fingerprint = f"{current_user.role}:{','.join(map(str, group_ids))}"
+    if vary == 'user':
+        fingerprint = f'{current_user.id}:{fingerprint}'
+    return fingerprint
+
+
+def make_etag(key, versions):
+    """
+    根据缓存键和数据版本生成强ETag
+
+    Args:
+        key: (接口, 请求路径, 权限指纹)
+        versions: 数据版本
+
+    Returns:
+        str: ETag值（不含引号）
+    """
+    raw = '|'.join([*key, ','.join(map(str, versions))])
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def conditional_get(*scopes, vary='groups', cache=False):
+    """
+    条件GET装饰器
+    请求携带的 If-None-Match 与当前ETag一致时直接返回304，不执行任何业务查询；
+    开启cache时，同一权限指纹下已编码的响应体会被缓存，命中时既不查库也不重新序列化；
+    否则执行视图并为200响应附加ETag
+
+    Args:
+        scopes: 响应依赖的数据范围（见 CatalogVersionService）
+        vary: 响应内容随什么变化，见 permission_fingerprint
+        cache: 是否缓存响应体（vary为'user'时不建议开启）
+
+    Example:
+        @permission_required('view_reports')
+        @conditional_get(CatalogVersionService.REPORTS, CatalogVersionService.ROLE_GROUPS, cache=True)
+        def get_reports():
+            pass
+    """
+    if vary != 'role' and CatalogVersionService.ROLE_GROUPS not in scopes:
+        # 指纹包含所属角色组，成员关系变化必须体现在版本号中
+        raise ValueError('vary为groups/user时数据范围必须包含 ROLE_GROUPS')
+
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            versions = CatalogVersionService.get_versions(*scopes)
+            key = (request.endpoint or '', request.full_path, permission_fingerprint(vary))
+            etag = make_etag(key, versions)
+            use_cache = cache and current_app.config.get('RESPONSE_CACHE_ENABLED', True)
+
+            if etag in request.if_none_match:
+                response = make_response('', 304)
+            elif use_cache and (cached := ResponseCache.get(key, versions)) is not None:
+                body, headers = cached
+                response = current_app.response_class(body, status=200, mimetype='application/json')
+                response.headers.extend(headers)
+            else:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                # 响应体读取的是最新数据：生成期间版本已变化（如其他进程修改了成员关系）时，
+                # 响应体可能与本次的指纹/版本不一致，不写入缓存
+                if (use_cache and not response.is_streamed
+                        and CatalogVersionService.get_versions(*scopes, reload=True) == versions):
+                    headers = [(name, response.headers[name]) for name in CACHED_HEADERS if name in response.headers]
+                    ResponseCache.set(key, scopes, versions, response.get_data(), headers)
+            response.set_etag(etag)
+            # 允许浏览器缓存，但每次使用前都需要用ETag向服务端确认
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        return decorated_function
+    return decorator
@@ -0,0 +1,99 @@
+import threading
+import time
+from flask import request
+from sqlalchemy import event
+from app import db
+from app.services import metrics
+from app.services.response_cache import ResponseCache
+
+# 当前请求（线程/协程）的计时与SQL统计
+_state = threading.local()
+
+
+def _response_cache_collector():
+    stats = ResponseCache.stats()
+    return [('cache_requests_total', '进程内缓存查询次数', ('cache', 'result'),
+             [[['response', 'hit'], stats['hits']], [['response', 'miss'], stats['misses']]])]
+
+
+def _instrument_engine(engine, session):
+    """
+    统计SQL语句数和耗时（按当前请求累计），并记录连接池获取连接的等待时间和新建连接数
+    """
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        _state.checkout_requested = None
+        _state.sql_started = time.perf_counter()
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(_state, 'sql_started', None)
+        if started is None:
+            return
+        _state.sql_time = getattr(_state, 'sql_time', 0.0) + time.perf_counter() - started
+        _state.sql_count = getattr(_state, 'sql_count', 0) + 1
+        metrics.SQL_STATEMENTS.inc()
+
+    # 连接池没有"开始获取连接"事件：会话执行语句时记下时间，会话随后从连接池取得连接时（checkout）计算等待时间；
+    # 会话已持有连接时不会触发 checkout，执行语句前清除该时间
+    @event.listens_for(session, 'do_orm_execute')
+    def do_orm_execute(orm_execute_state):
+        _state.checkout_requested = time.perf_counter()
+
+    @event.listens_for(engine, 'checkout')
+    def checkout(dbapi_connection, connection_record, connection_proxy):
+        requested = getattr(_state, 'checkout_requested', None)
+        if requested is not None:
+            _state.checkout_requested = None
+            metrics.POOL_CHECKOUT.observe((), time.perf_counter() - requested)
+
+    @event.listens_for(engine, 'connect')
+    def connect(dbapi_connection, connection_record):
+        metrics.POOL_CONNECTIONS.inc()
+
+
+def init_metrics(app):
+    """
+    注册指标采集钩子：按蓝图和端点记录请求数、耗时、响应大小、每个请求的SQL条数与耗时
+    设置 METRICS_MULTIPROC_DIR 时多个工作进程通过该目录合并指标（快照由后台线程定期写入，不占用请求）
+
+    Args:
+        app: Flask应用实例
+    """
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+    metrics.registry.configure(app.config.get('METRICS_MULTIPROC_DIR'),
+                               app.config.get('METRICS_FLUSH_INTERVAL', 1.0))
+    metrics.registry.register_collector(_response_cache_collector)
+    with app.app_context():
+        _instrument_engine(db.engine, db.session)
+
+    @app.before_request
+    def start_metrics():
+        _state.started = time.perf_counter()
+        _state.sql_count = 0
+        _state.sql_time = 0.0
+
+    # 端点名 -> (蓝图, 端点) 标签元组
+    endpoint_labels = {}
+
+    @app.after_request
+    def record_metrics(response):
+        started = getattr(_state, 'started', None)
+        if started is None:
+            return response
+        elapsed = time.perf_counter() - started
+        _state.started = None
+        req = request._get_current_object()
+        labels = endpoint_labels.get(req.endpoint)
+        if labels is None:
+            labels = endpoint_labels[req.endpoint] = (req.blueprint or '', req.endpoint or 'none')
+        size = None if response.is_streamed else response.headers.get('Content-Length')
+        with metrics.registry.lock:
+            metrics.REQUESTS.inc_locked(labels + (req.method, str(response.status_code)))
+            metrics.REQUEST_LATENCY.observe_locked(labels, elapsed)
+            if size is not None:
+                metrics.RESPONSE_SIZE.observe_locked(labels, int(size))
+            metrics.REQUEST_SQL_STATEMENTS.observe_locked(labels, _state.sql_count)
+            metrics.REQUEST_SQL_TIME.observe_locked(labels, _state.sql_time)
+        return response
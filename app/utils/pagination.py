@@ -0,0 +1,343 @@
+import base64
+import json
+from datetime import datetime
+from flask import current_app, jsonify, stream_with_context
+from sqlalchemy import and_, or_
+
+
+class PaginationError(ValueError):
+    """
+    分页/过滤参数错误，由路由统一返回400
+    """
+
+
+class PageRequest:
+    """
+    游标分页请求
+    使用 (排序字段, id) 作为键集，下一页从上一页最后一条记录之后开始；
+    可为空的排序字段按 NULL 最大处理（正序排在最后、倒序排在最前，与 PostgreSQL 默认一致，可以使用 (字段, id) 索引）
+
+    Attributes:
+        limit: 每页条数，None表示不分页（返回全部）
+        sort: 排序字段名
+        descending: 是否倒序
+        after: 游标解析出的 (排序字段值, id)，首页为None
+    """
+
+    __slots__ = ('limit', 'sort', 'descending', 'after')
+
+    def __init__(self, limit=None, sort='id', descending=False, after=None):
+        self.limit = limit
+        self.sort = sort
+        self.descending = descending
+        self.after = after
+
+    def apply(self, stmt, sort_columns, id_column):
+        """
+        为查询加上键集过滤、排序和 limit+1（多取一条用于判断是否有下一页）
+
+        Args:
+            stmt: select语句
+            sort_columns: 可排序字段名 -> 列
+            id_column: 主键列
+
+        Returns:
+            Select: 处理后的查询
+        """
+        column = sort_columns[self.sort]
+        if self.after is not None:
+            value, last_id = self.after
+            if self.sort == 'id':
+                stmt = stmt.where(id_column < last_id if self.descending else id_column > last_id)
+            else:
+                stmt = stmt.where(self._after_clause(column, id_column, value, last_id))
+        stmt = stmt.order_by(*self.order_by(sort_columns, id_column))
+        if self.limit is not None:
+            stmt = stmt.limit(self.limit + 1)
+        return stmt
+
+    def _after_clause(self, column, id_column, value, last_id):
+        """
+        排在游标 (value, last_id) 之后的记录条件
+        """
+        nullable = getattr(column, 'nullable', True)
+        if self.descending:
+            if value is None:
+                # NULL 排在最前：先取完其余 NULL 记录，再取全部非 NULL 记录
+                return or_(and_(column.is_(None), id_column < last_id), column.isnot(None))
+            return or_(column < value, and_(column == value, id_column < last_id))
+        if value is None:
+            return and_(column.is_(None), id_column > last_id)
+        clause = or_(column > value, and_(column == value, id_column > last_id))
+        return or_(clause, column.is_(None)) if nullable else clause
+
+    def order_by(self, sort_columns, id_column):
+        """
+        当前排序对应的ORDER BY列
+        """
+        if self.sort == 'id':
+            return [id_column.desc() if self.descending else id_column.asc()]
+        column = sort_columns[self.sort]
+        if self.descending:
+            column = column.desc().nulls_first() if getattr(column, 'nullable', True) else column.desc()
+            return [column, id_column.desc()]
+        column = column.asc().nulls_last() if getattr(column, 'nullable', True) else column.asc()
+        return [column, id_column.asc()]
+
+    def split(self, records):
+        """
+        截取当前页记录并生成下一页游标
+
+        Args:
+            records: 查询结果（最多 limit+1 条）
+
+        Returns:
+            tuple: (当前页记录列表, 下一页游标或None)
+        """
+        if self.limit is None or len(records) <= self.limit:
+            return records, None
+        records = records[:self.limit]
+        last = records[-1]
+        return records, encode_cursor(self.sort, getattr(last, self.sort), last.id)
+
+
+def encode_cursor(sort, value, last_id):
+    """
+    编码游标（URL安全的base64 JSON）
+    """
+    if isinstance(value, datetime):
+        value = {'dt': value.isoformat()}
+    raw = json.dumps([sort, value, last_id], separators=(',', ':'), ensure_ascii=False)
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    解码游标
+
+    Returns:
+        tuple: (排序字段名, 排序字段值, id)
+
+    Raises:
+        PaginationError: 游标格式错误
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        sort, value, last_id = json.loads(raw.decode('utf-8'))
+        if isinstance(value, dict):
+            value = datetime.fromisoformat(value['dt'])
+        return sort, value, int(last_id)
+    except (ValueError, TypeError, KeyError):
+        raise PaginationError('无效的分页游标')
+
+
+def _cursor_value_valid(column, value):
+    """
+    游标中的排序字段值与列类型一致（NULL只能出现在可为空的列），避免把错误类型的值带入SQL比较
+    """
+    if value is None:
+        return getattr(column, 'nullable', True)
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return True
+    if python_type is int:
+        return isinstance(value, int) and not isinstance(value, bool)
+    return isinstance(value, python_type)
+
+
+def parse_page_request(args, sort_columns, default_sort='id'):
+    """
+    从请求参数解析分页请求
+    支持 limit、cursor、sort（字段名，前缀"-"表示倒序）；
+    未传limit和cursor时不分页，保持原有返回全部数据的行为
+
+    Args:
+        args: request.args
+        sort_columns: 可排序字段名 -> 列
+        default_sort: 默认排序字段
+
+    Returns:
+        PageRequest: 分页请求
+
+    Raises:
+        PaginationError: 参数错误
+    """
+    sort = args.get('sort', default_sort)
+    descending = sort.startswith('-')
+    sort = sort.lstrip('-')
+    if sort not in sort_columns:
+        raise PaginationError(f'不支持的排序字段: {sort}')
+
+    limit = args.get('limit')
+    cursor = args.get('cursor')
+    if limit is None and not cursor:
+        return PageRequest(sort=sort, descending=descending)
+
+    if limit is None:
+        limit = current_app.config.get('PAGE_DEFAULT_LIMIT', 50)
+    try:
+        limit = int(limit)
+    except ValueError:
+        raise PaginationError('limit必须为整数')
+    if limit <= 0:
+        raise PaginationError('limit必须大于0')
+    limit = min(limit, current_app.config.get('PAGE_MAX_LIMIT', 500))
+
+    after = None
+    if cursor:
+        cursor_sort, value, last_id = decode_cursor(cursor)
+        if cursor_sort != sort:
+            raise PaginationError('游标与排序字段不一致')
+        if not _cursor_value_valid(sort_columns[sort], value):
+            raise PaginationError('无效的分页游标')
+        after = (value, last_id)
+    return PageRequest(limit=limit, sort=sort, descending=descending, after=after)
+
+
+def get_bool_arg(args, name):
+    """
+    读取布尔类型的查询参数
+
+    Returns:
+        bool|None: 未传时返回None
+
+    Raises:
+        PaginationError: 参数值无法识别
+    """
+    value = args.get(name)
+    if value is None or value == '':
+        return None
+    value = value.lower()
+    if value in ('1', 'true', 't', 'yes'):
+        return True
+    if value in ('0', 'false', 'f', 'no'):
+        return False
+    raise PaginationError(f'{name}必须为布尔值')
+
+
+def get_int_arg(args, name):
+    """
+    读取整数类型的查询参数
+
+    Returns:
+        int|None: 未传时返回None
+
+    Raises:
+        PaginationError: 参数值不是整数
+    """
+    value = args.get(name)
+    if value is None or value == '':
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise PaginationError(f'{name}必须为整数')
+
+
+def paginated_response(records, page):
+    """
+    构造列表响应
+    响应体仍为JSON数组，存在下一页时通过 X-Next-Cursor 响应头返回游标
+
+    Args:
+        records: 查询得到的记录（需实现 to_dict）
+        page: 分页请求
+
+    Returns:
+        Response: JSON响应
+    """
+    records, next_cursor = page.split(records)
+    response = jsonify([record.to_dict() for record in records])
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
+
+
+def parse_stream_arg(args, page):
+    """
+    读取流式输出参数 stream
+    流式输出用于导出全部数据，不能与 limit / cursor 同时使用
+
+    Args:
+        args: request.args
+        page: 已解析的分页请求
+
+    Returns:
+        bool: 是否流式输出
+
+    Raises:
+        PaginationError: 同时传入了分页参数
+    """
+    stream = bool(get_bool_arg(args, 'stream'))
+    if stream and page.limit is not None:
+        raise PaginationError('stream不能与limit/cursor同时使用')
+    return stream
+
+
+def streamed_response(records):
+    """
+    构造流式列表响应
+    边从数据库游标读取边编码输出JSON数组，不在内存中保留完整列表和完整响应体；
+    响应体与 paginated_response 不分页时的结果一致
+
+    Args:
+        records: 记录迭代器（需实现 to_dict）
+
+    Returns:
+        Response: 流式JSON响应
+    """
+    app = current_app._get_current_object()
+    chunk_size = app.config.get('STREAM_CHUNK_SIZE', 65536)
+
+    def generate():
+        buffer = ['[']
+        size = 1
+        separator = ''
+        for record in records:
+            encoded = app.json.dumps(record.to_dict())
+            buffer.append(separator)
+            buffer.append(encoded)
+            size += len(encoded) + 1
+            separator = ','
+            if size >= chunk_size:
+                yield ''.join(buffer)
+                buffer = []
+                size = 0
+        buffer.append(']\n')
+        yield ''.join(buffer)
+
+    return app.response_class(stream_with_context(generate()), mimetype='application/json')
+
+
+def report_filter_args(args):
+    """
+    解析报表列表的过滤参数：is_active、tag、group_id、name（名称前缀）
+    """
+    return {
+        'is_active': get_bool_arg(args, 'is_active'),
+        'tag': args.get('tag') or None,
+        'group_id': get_int_arg(args, 'group_id'),
+        'name': args.get('name') or None
+    }
+
+
+def user_filter_args(args):
+    """
+    解析用户列表的过滤参数：role、is_active、group_id、name（姓名前缀）
+    """
+    return {
+        'role': args.get('role') or None,
+        'is_active': get_bool_arg(args, 'is_active'),
+        'group_id': get_int_arg(args, 'group_id'),
+        'name': args.get('name') or None
+    }
+
+
+def role_group_filter_args(args):
+    """
+    解析角色组列表的过滤参数：name（名称前缀）
+    """
+    return {
+        'name': args.get('name') or None
+    }
@@ -0,0 +1,127 @@
+import os
+import threading
+import traceback
+from collections import Counter
+from flask import request, current_app
+from loguru import logger
+from sqlalchemy import event
+from app import db
+
+# 当前请求（线程/协程）的SQL统计
+_state = threading.local()
+
+# 项目根目录，调用栈中只保留项目代码的帧
+_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 未指定时使用配置中的默认值
+_DEFAULT = object()
+
+
+class QueryBudgetExceeded(Exception):
+    """
+    请求执行的SQL语句超出预算，或同一语句重复执行次数过多（疑似N+1）
+    测试模式下抛出，生产环境只记录日志
+    """
+
+
+def query_budget(max_statements=_DEFAULT, max_repeats=_DEFAULT):
+    """
+    为路由设置SQL预算的装饰器
+
+    Args:
+        max_statements: 单个请求最多执行的SQL语句数，None表示不限制
+        max_repeats: 同一条SQL在单个请求中最多执行的次数，超过视为N+1；None表示不检查
+            （分批写入等按相同语句重复执行的接口应设为None）
+
+    Returns:
+        function: 原视图函数（预算保存在函数属性上）
+    """
+    def decorator(f):
+        f.query_budget = (max_statements, max_repeats)
+        return f
+    return decorator
+
+
+def _resolve_budget(app):
+    """
+    当前请求的预算：路由装饰器 > 按蓝图配置 > 默认配置
+    """
+    view = app.view_functions.get(request.endpoint)
+    max_statements, max_repeats = getattr(view, 'query_budget', (_DEFAULT, _DEFAULT))
+    if max_statements is _DEFAULT:
+        max_statements = app.config.get('QUERY_BUDGETS', {}).get(request.blueprint,
+                                                                  app.config.get('QUERY_BUDGET_DEFAULT'))
+    if max_repeats is _DEFAULT:
+        max_repeats = app.config.get('QUERY_REPEAT_LIMIT', 5)
+    return max_statements, max_repeats
+
+
+def _stack_summary():
+    """
+    发出SQL的项目代码调用栈（最内层的6帧，不含本模块）
+    """
+    frames = [frame for frame in traceback.extract_stack()[:-2]
+              if frame.filename.startswith(_ROOT) and frame.filename != __file__]
+    return [f'{os.path.relpath(frame.filename, _ROOT)}:{frame.lineno} {frame.name}' for frame in frames[-6:]]
+
+
+def init_query_budget(app):
+    """
+    注册SQL预算检查：按请求统计语句数和相同语句的重复次数，
+    超出预算时记录端点、语句数、重复最多的语句和发出位置；QUERY_BUDGET_RAISE 为真时（测试模式）抛出 QueryBudgetExceeded
+
+    Args:
+        app: Flask应用实例
+    """
+    if not app.config.get('QUERY_BUDGET_ENABLED', True):
+        return
+
+    with app.app_context():
+        engine = db.engine
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        shapes = getattr(_state, 'shapes', None)
+        if shapes is None:
+            return
+        shapes[statement] += 1
+        # 第一次超出重复次数时记录调用位置
+        if shapes[statement] == _state.repeat_trigger and statement not in _state.stacks:
+            _state.stacks[statement] = _stack_summary()
+
+    @app.before_request
+    def start_query_budget():
+        max_statements, max_repeats = _resolve_budget(app)
+        if max_statements is None and max_repeats is None:
+            _state.shapes = None
+            return
+        _state.shapes = Counter()
+        _state.stacks = {}
+        _state.budget = (max_statements, max_repeats)
+        _state.repeat_trigger = max_repeats + 1 if max_repeats is not None else 0
+
+    @app.after_request
+    def check_query_budget(response):
+        shapes = getattr(_state, 'shapes', None)
+        if shapes is None:
+            return response
+        _state.shapes = None
+        max_statements, max_repeats = _state.budget
+        total = sum(shapes.values())
+        repeated = [(statement, count) for statement, count in shapes.most_common(3)
+                    if max_repeats is not None and count > max_repeats]
+        if not repeated and (max_statements is None or total <= max_statements):
+            return response
+
+        problems = []
+        if max_statements is not None and total > max_statements:
+            problems.append(f'执行了{total}条SQL，超出预算{max_statements}')
+        for statement, count in repeated:
+            sql = ' '.join(statement.split())[:200]
+            location = ' <- '.join(reversed(_state.stacks.get(statement, [])))
+            problems.append(f'疑似N+1：同一语句执行了{count}次 | {sql} | {location}')
+        message = f"SQL预算超限 | {request.method} {request.path} ({request.endpoint}) | " + '；'.join(problems)
+        if current_app.config.get('QUERY_BUDGET_RAISE'):
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+        return response
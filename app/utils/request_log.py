@@ -0,0 +1,127 @@
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from flask import request, g
+from loguru import logger
+
+
+class RequestLogWriter:
+    """
+    请求日志写入器
+    请求线程只把已编码的JSON行放入有界队列，由后台线程写入按大小轮转的文件；
+    队列满时丢弃并计数，日志写入不会阻塞请求
+    """
+
+    def __init__(self, path, max_bytes=50 * 1024 * 1024, backups=5, queue_size=10000):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def write(self, line):
+        """
+        提交一行日志（不阻塞）
+        """
+        if self._pid != os.getpid():
+            # 首次写入或 fork 之后，在当前进程中启动写入线程
+            self._start()
+        try:
+            self.queue.put_nowait(line)
+        except queue.Full:
+            self.dropped += 1
+
+    def _start(self):
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            handler = RotatingFileHandler(self.path, maxBytes=self.max_bytes, backupCount=self.backups,
+                                          encoding='utf-8', delay=True)
+            threading.Thread(target=self._run, args=(handler,), name='request-log-writer', daemon=True).start()
+            self._pid = os.getpid()
+
+    def _run(self, handler):
+        while True:
+            line = self.queue.get()
+            try:
+                handler.emit(logging.makeLogRecord({'msg': line}))
+            except Exception as e:
+                logger.error(f"写入请求日志失败: {str(e)}")
+
+
+def _truncate(data, limit):
+    if data is None:
+        return None
+    text = data[:limit].decode('utf-8', errors='replace')
+    return text + '...' if len(data) > limit else text
+
+
+def init_request_logging(app):
+    """
+    注册请求日志钩子：每个请求（按端点采样）记录一行JSON，
+    包含方法、路径、端点、状态码、耗时和请求/响应字节数，可选记录截断后的请求体和响应体；
+    5xx 响应总是记录
+
+    Args:
+        app: Flask应用实例
+    """
+    if not app.config.get('REQUEST_LOG_ENABLED', True):
+        return
+    writer = RequestLogWriter(
+        app.config.get('REQUEST_LOG_PATH', 'app/request.log'),
+        max_bytes=app.config.get('REQUEST_LOG_MAX_BYTES', 50 * 1024 * 1024),
+        backups=app.config.get('REQUEST_LOG_BACKUPS', 5),
+        queue_size=app.config.get('REQUEST_LOG_QUEUE_SIZE', 10000)
+    )
+    app.extensions['request_log'] = writer
+    default_rate = app.config.get('REQUEST_LOG_SAMPLE_RATE', 1.0)
+    rates = app.config.get('REQUEST_LOG_SAMPLE_RATES') or {}
+    capture_body = app.config.get('REQUEST_LOG_BODY', False)
+    body_limit = app.config.get('REQUEST_LOG_BODY_LIMIT', 1024)
+
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def log_request(response):
+        started = g.get('request_started')
+        if started is None:
+            return response
+        rate = rates.get(request.endpoint, default_rate)
+        if response.status_code < 500 and (rate <= 0 or (rate < 1 and random.random() >= rate)):
+            return response
+
+        entry = {
+            'ts': datetime.utcnow().isoformat(timespec='milliseconds') + 'Z',
+            'method': request.method,
+            'path': request.path,
+            'endpoint': request.endpoint,
+            'status': response.status_code,
+            'latency_ms': round((time.perf_counter() - started) * 1000, 2),
+            'request_bytes': request.content_length or 0,
+            # 流式响应在此时长度未知
+            'response_bytes': None if response.is_streamed else response.calculate_content_length(),
+            # 只读取本次请求已加载的用户（Flask-Login 保存在 g._login_user），不额外触发加载
+            'user_id': getattr(g.get('_login_user'), 'id', None),
+            'remote_addr': request.remote_addr
+        }
+        if request.query_string:
+            entry['query'] = _truncate(request.query_string, body_limit)
+        if capture_body:
+            entry['request_body'] = _truncate(request.get_data(cache=True), body_limit) or None
+            if not response.is_streamed and not response.direct_passthrough:
+                entry['response_body'] = _truncate(response.get_data(), body_limit)
+        writer.write(json.dumps(entry, ensure_ascii=False, separators=(',', ':')))
+        return response
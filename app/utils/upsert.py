@@ -0,0 +1,28 @@
+from importlib import import_module
+from app import db
+
+# 支持 INSERT ... ON CONFLICT 的数据库方言（方言模块在首次使用时导入）
+_DIALECTS = {
+    'postgresql': 'sqlalchemy.dialects.postgresql',
+    'sqlite': 'sqlalchemy.dialects.sqlite',
+}
+
+
+def upsert_insert(table):
+    """
+    构造当前数据库方言的INSERT语句，可使用 on_conflict_do_update / on_conflict_do_nothing
+
+    Args:
+        table: 表对象或ORM模型
+
+    Returns:
+        Insert: 方言INSERT语句
+
+    Raises:
+        NotImplementedError: 当前数据库不支持 ON CONFLICT
+    """
+    dialect = db.session.get_bind().dialect.name
+    module = _DIALECTS.get(dialect)
+    if module is None:
+        raise NotImplementedError(f'数据库 {dialect} 不支持 INSERT ... ON CONFLICT')
+    return import_module(module).insert(table)
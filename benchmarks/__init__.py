@@ -0,0 +1 @@
+# 基准测试包：数据生成器（seed.py）和 pytest-benchmark 基准（bench_*.py）
@@ -0,0 +1,51 @@
+"""
+认证与鉴权基准：permission_required、用户快照加载、login_or_create_user
+"""
+import itertools
+import pytest
+from app import db
+from app.models.user import User
+from app.services.auth_service import DingtalkAuthService
+from app.services.principal_service import PrincipalService
+from app.utils.decorators import permission_required
+
+pytestmark = pytest.mark.benchmark(group='auth')
+
+
+@permission_required('view_reports')
+def _view():
+    return 'ok'
+
+
+def bench_permission_required(benchmark, login_as, member_id):
+    with login_as(member_id):
+        assert benchmark(_view) == 'ok'
+
+
+def bench_principal_load_uncached(benchmark, app, member_id):
+    def load():
+        PrincipalService.invalidate_users([member_id])
+        return PrincipalService.get(member_id)
+    with app.app_context():
+        assert benchmark(load) is not None
+
+
+def bench_login_returning_user(benchmark, app, member_id):
+    with app.test_request_context():
+        user = PrincipalService.get(member_id)
+        info = {'nick': user.name, 'unionId': user.record.dingtalk_id}
+        result = benchmark(DingtalkAuthService.login_or_create_user, info)
+    assert result.id == member_id
+
+
+def bench_login_new_user(benchmark, app):
+    counter = itertools.count()
+
+    def login():
+        n = next(counter)
+        return DingtalkAuthService.login_or_create_user({'nick': f'新用户{n}', 'unionId': f'bench-new-{n}'})
+    with app.test_request_context():
+        benchmark(login)
+        # 删除本轮创建的用户，下次运行时数据规模不变
+        User.query.filter(User.dingtalk_id.like('bench-new-%')).delete(synchronize_session=False)
+        db.session.commit()
@@ -0,0 +1,70 @@
+"""
+批量修改基准：角色组成员/可见报表同步、用户加入角色组、报表批量导入
+每轮在两组目标之间切换，保证每次调用的工作量相同；结束后由 restore_rows 把修改过的行恢复原状
+"""
+import itertools
+import pytest
+from app import db
+from app.models.report import Report
+from app.models.report_tags import report_tags
+from app.models.role_group import group_visible_reports
+from app.models.tag import Tag
+from app.models.user import User
+from app.models.user_role_group import UserRoleGroup
+from app.services.report_import_service import ReportImportService
+from app.services.role_group_service import RoleGroupService
+from app.services.user_service import UserService
+
+pytestmark = pytest.mark.benchmark(group='mutations')
+
+# 使用成员较少的角色组，避免与列表基准中的大组互相影响
+GROUP_ID = 50
+# 报表导入基准使用的 powerbi_id 前缀
+IMPORT_PREFIX = 'bench-import-'
+
+user_role_groups = UserRoleGroup.__table__
+tags = Tag.__table__
+reports = Report.__table__
+
+
+def _alternating(app, column, size):
+    with app.app_context():
+        ids = [row[0] for row in db.session.query(column).order_by(column).limit(size * 2)]
+    return itertools.cycle([ids[:size], ids[size:]])
+
+
+def bench_sync_group_users_set_1000(benchmark, app, login_as, admin_id, restore_rows):
+    restore_rows(user_role_groups, user_role_groups.c.role_group_id == GROUP_ID)
+    targets = _alternating(app, User.id, 1000)
+    with login_as(admin_id):
+        benchmark(lambda: RoleGroupService.sync_group_users(GROUP_ID, next(targets), mode='set'))
+
+
+def bench_sync_group_reports_set_500(benchmark, app, login_as, admin_id, restore_rows):
+    restore_rows(group_visible_reports, group_visible_reports.c.group_id == GROUP_ID)
+    targets = _alternating(app, Report.id, 500)
+    with login_as(admin_id):
+        benchmark(lambda: RoleGroupService.sync_group_reports(GROUP_ID, next(targets), mode='set'))
+
+
+def bench_add_user_to_role_groups(benchmark, login_as, admin_id, member_id, restore_rows):
+    restore_rows(user_role_groups, user_role_groups.c.user_id == member_id)
+    targets = itertools.cycle([[1, 2, 3, 4, 5], [6, 7, 8, 9, 10]])
+    with login_as(admin_id):
+        benchmark(lambda: UserService.add_user_to_role_groups(member_id, next(targets)))
+
+
+def bench_import_reports_1000(benchmark, app, login_as, admin_id, restore_rows):
+    # 导入的报表、报表标签和新建的标签在结束后删除（按恢复的相反顺序：先删关联再删报表和标签）
+    with app.app_context():
+        tag_ids = [row[0] for row in db.session.execute(db.select(tags.c.id))]
+    imported = reports.c.powerbi_id.startswith(IMPORT_PREFIX)
+    restore_rows(tags, tags.c.id.not_in(tag_ids))
+    restore_rows(reports, imported)
+    restore_rows(report_tags, report_tags.c.report_id.in_(db.select(reports.c.id).where(imported)))
+    # 同一批 powerbi_id 反复导入，首轮之后全部走更新分支
+    rows = [(i + 2, {'powerbi_id': f'{IMPORT_PREFIX}{i}', 'name': f'导入报表{i}', 'tags': '销售,财务'}, None)
+            for i in range(1000)]
+    with login_as(admin_id):
+        summary = benchmark(ReportImportService.import_reports, rows)
+    assert summary['failed'] == 0
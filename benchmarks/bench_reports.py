@@ -0,0 +1,44 @@
+"""
+报表列表基准：ReportService.get_all_reports 与 /api/reports
+"""
+import pytest
+from app.queries.report_query import ReportQuery
+from app.services.report_service import ReportService
+
+pytestmark = pytest.mark.benchmark(group='reports')
+
+
+def bench_get_all_reports_admin(benchmark, login_as, admin_id):
+    with login_as(admin_id):
+        result = benchmark(ReportService.get_all_reports)
+    assert result
+
+
+def bench_get_all_reports_admin_without_description(benchmark, login_as, admin_id):
+    with login_as(admin_id):
+        benchmark(ReportService.get_all_reports, with_description=False)
+
+
+def bench_get_all_reports_member(benchmark, login_as, member_id):
+    with login_as(member_id):
+        result = benchmark(ReportService.get_all_reports)
+    assert result
+
+
+def bench_get_all_reports_page(benchmark, login_as, admin_id, make_page):
+    page = make_page({'limit': '50', 'sort': '-created_at'}, ReportQuery.SORT_COLUMNS)
+    with login_as(admin_id):
+        result = benchmark(ReportService.get_all_reports, page=page)
+    # 多取一条用于判断是否有下一页
+    assert len(result) == 51
+
+
+def bench_get_all_reports_filtered(benchmark, login_as, member_id):
+    with login_as(member_id):
+        benchmark(ReportService.get_all_reports, filters={'name': '报表0001', 'is_active': True})
+
+
+def bench_api_reports_member(benchmark, client_as, member_id):
+    client = client_as(member_id)
+    response = benchmark(client.get, '/api/reports')
+    assert response.status_code == 200
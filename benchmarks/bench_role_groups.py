@@ -0,0 +1,39 @@
+"""
+角色组列表基准：RoleGroupService.get_all_role_groups 与 /api/role_groups
+"""
+import pytest
+from app.queries.role_group_query import RoleGroupQuery
+from app.services.role_group_service import RoleGroupService
+
+pytestmark = pytest.mark.benchmark(group='role_groups')
+
+
+def bench_get_role_groups_full(benchmark, login_as, admin_id):
+    with login_as(admin_id):
+        result = benchmark(RoleGroupService.get_all_role_groups)
+    assert result
+
+
+def bench_get_role_groups_summary(benchmark, login_as, admin_id):
+    with login_as(admin_id):
+        benchmark(RoleGroupService.get_all_role_groups, summary=True)
+
+
+def bench_get_role_groups_page(benchmark, login_as, admin_id, make_page):
+    page = make_page({'limit': '50'}, RoleGroupQuery.SORT_COLUMNS)
+    with login_as(admin_id):
+        result = benchmark(RoleGroupService.get_all_role_groups, page=page)
+    # 多取一条用于判断是否有下一页
+    assert len(result) == 51
+
+
+def bench_get_group_users(benchmark, login_as, admin_id):
+    # 角色组按Zipf分布被选中，1号组成员最多
+    with login_as(admin_id):
+        benchmark(RoleGroupService.get_group_users, 1)
+
+
+def bench_api_role_groups_summary(benchmark, client_as, admin_id):
+    client = client_as(admin_id)
+    response = benchmark(client.get, '/api/role_groups?view=summary')
+    assert response.status_code == 200
@@ -0,0 +1,33 @@
+"""
+用户列表基准：UserService.get_all_users 与 /api/users
+"""
+import pytest
+from app.queries.user_query import UserQuery
+from app.services.user_service import UserService
+
+pytestmark = pytest.mark.benchmark(group='users')
+
+
+def bench_get_users_full(benchmark, login_as, admin_id):
+    with login_as(admin_id):
+        result = benchmark(UserService.get_all_users)
+    assert result
+
+
+def bench_get_users_page(benchmark, login_as, admin_id, make_page):
+    page = make_page({'limit': '50', 'sort': 'name'}, UserQuery.SORT_COLUMNS)
+    with login_as(admin_id):
+        result = benchmark(UserService.get_all_users, page=page)
+    # 多取一条用于判断是否有下一页
+    assert len(result) == 51
+
+
+def bench_get_users_name_prefix(benchmark, login_as, admin_id):
+    with login_as(admin_id):
+        benchmark(UserService.get_all_users, filters={'name': '用户0001'})
+
+
+def bench_api_users_page(benchmark, client_as, admin_id):
+    client = client_as(admin_id)
+    response = benchmark(client.get, '/api/users?limit=200')
+    assert response.status_code == 200
@@ -0,0 +1,123 @@
+"""
+基准测试夹具
+
+环境变量:
+    BENCH_SCALE         数据规模 small / medium / large（默认 small，见 benchmarks/seed.py）
+    BENCH_DATABASE_URL  基准测试数据库（默认 benchmarks/.data/bench_<规模>.db 的SQLite文件），
+                        为空库时自动按规模生成数据；使用 PostgreSQL 时请指向专用的空库
+"""
+import os
+from contextlib import contextmanager
+
+BENCH_SCALE = os.getenv('BENCH_SCALE', 'small')
+_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.data')
+os.makedirs(_DATA_DIR, exist_ok=True)
+os.environ['DATABASE_URL'] = os.getenv('BENCH_DATABASE_URL') or f'sqlite:///{_DATA_DIR}/bench_{BENCH_SCALE}.db'
+os.environ.setdefault('FLASK_ENV', 'development')
+# 请求日志会写文件，基准测试中关闭
+os.environ['REQUEST_LOG_ENABLED'] = 'False'
+
+import pytest
+from flask_login import login_user
+from sqlalchemy import select, delete, insert
+from werkzeug.datastructures import MultiDict
+from app import create_app, db
+from app.models.user import User
+from app.models.user_role_group import UserRoleGroup
+from app.services.principal_service import PrincipalService
+from app.services.catalog_version_service import CatalogVersionService
+from app.utils.pagination import parse_page_request
+from benchmarks.seed import SCALES, seed_database
+
+
+@pytest.fixture(scope='session')
+def app():
+    app = create_app()
+    with app.app_context():
+        if db.session.query(User.id).first() is None:
+            seed_database(**SCALES[BENCH_SCALE], echo=lambda message: None)
+    return app
+
+
+@pytest.fixture(scope='session')
+def admin_id(app):
+    with app.app_context():
+        return db.session.query(User.id).filter(User.role == 'admin').order_by(User.id).first()[0]
+
+
+@pytest.fixture(scope='session')
+def member_id(app):
+    """
+    所属角色组最多的普通用户（可见报表最多，是报表列表的最坏情况）
+    """
+    with app.app_context():
+        return db.session.query(UserRoleGroup.user_id).join(User, User.id == UserRoleGroup.user_id).filter(
+            User.role == 'user', User.is_active.is_(True)
+        ).group_by(UserRoleGroup.user_id).order_by(db.func.count().desc(), UserRoleGroup.user_id).first()[0]
+
+
+@pytest.fixture
+def login_as(app):
+    """
+    在请求上下文中以指定用户登录：with login_as(user_id): ...
+    """
+    @contextmanager
+    def login(user_id, path='/'):
+        with app.test_request_context(path):
+            login_user(PrincipalService.get(user_id))
+            yield
+    return login
+
+
+@pytest.fixture
+def make_page(app):
+    """
+    按查询参数构造分页请求：make_page({'limit': '50'}, ReportQuery.SORT_COLUMNS)
+    """
+    def make(args, sort_columns):
+        with app.app_context():
+            return parse_page_request(MultiDict(args), sort_columns)
+    return make
+
+
+@pytest.fixture
+def client_as(app):
+    """
+    以指定用户登录的测试客户端（关闭响应缓存，测量完整的查询和序列化）
+    """
+    app.config['RESPONSE_CACHE_ENABLED'] = False
+
+    def make(user_id):
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session['_user_id'] = str(user_id)
+            session['_fresh'] = True
+        return client
+    yield make
+    app.config['RESPONSE_CACHE_ENABLED'] = True
+
+
+@pytest.fixture
+def restore_rows(app):
+    """
+    修改类基准结束后把基准库恢复原状，保证每次运行的数据相同、基线可比较：
+    restore_rows(表, WHERE条件...) 记录当前满足条件的行，结束时删除满足条件的行并按原样（含主键）写回；
+    多次调用时按相反顺序恢复
+    """
+    snapshots = []
+
+    def snapshot(table, *where):
+        with app.app_context():
+            rows = [dict(row._mapping) for row in db.session.execute(select(table).where(*where))]
+        snapshots.append((table, where, rows))
+
+    yield snapshot
+    with app.app_context():
+        for table, where, rows in reversed(snapshots):
+            db.session.execute(delete(table).where(*where))
+            if rows:
+                db.session.execute(insert(table), rows)
+        # 恢复绕过了各服务的写接口，递增版本号使本进程的缓存失效
+        CatalogVersionService.bump(CatalogVersionService.REPORTS, CatalogVersionService.ROLE_GROUPS,
+                                   CatalogVersionService.USERS)
+        db.session.commit()
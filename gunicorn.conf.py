@@ -0,0 +1,55 @@
+"""
+gunicorn 配置
+
+默认使用 gevent 协作式工作进程：钉钉登录回调中换取token、获取用户信息这两次外部请求
+在等待网络时会让出，同一个进程可以同时处理大量登录，登录并发受连接数（worker_connections）限制
+而不是工作进程数，早高峰集中登录时不会占满工作进程、拖慢报表请求。
+
+用法:
+    gunicorn -c gunicorn.conf.py run:app
+    GUNICORN_WORKER_CLASS=sync gunicorn -c gunicorn.conf.py run:app   # 回退到同步工作进程
+
+注意：gevent 工作进程在加载应用前打补丁，因此不能开启 preload_app；
+psycopg2 需要 psycogreen 补丁才会在等待数据库时让出。
+每个工作进程都会执行 create_app：生产配置下启动时不建表（先执行 flask db upgrade），
+设置 STARTUP_TIMING=True 可在日志中查看各工作进程的启动阶段耗时。
+"""
+import glob
+import multiprocessing
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:4888')
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gevent')
+workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+# 每个 gevent 工作进程同时处理的请求数上限
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', 1000))
+# 同步工作进程的线程数（worker_class 为 sync/gthread 时生效）
+threads = int(os.getenv('GUNICORN_THREADS', 1))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+preload_app = False
+accesslog = None
+
+
+def on_starting(server):
+    """
+    启动时清空多进程指标目录，丢弃上一次运行留下的快照
+    """
+    directory = os.getenv('METRICS_MULTIPROC_DIR')
+    if directory:
+        for path in glob.glob(os.path.join(directory, 'metrics_*.json')):
+            os.remove(path)
+
+
+def post_fork(server, worker):
+    """
+    gevent 工作进程中让 psycopg2 在等待数据库时让出（未安装 psycogreen 时跳过）
+    """
+    if worker_class != 'gevent':
+        return
+    try:
+        from psycogreen.gevent import patch_psycopg
+    except ImportError:
+        server.log.warning('未安装 psycogreen，数据库查询会阻塞 gevent 工作进程')
+        return
+    patch_psycopg()
@@ -0,0 +1,96 @@
+"""角色组与标签表
+
+Revision ID: 2b8d6f3a1c57
+Revises: 64b5a2fa198d
+Create Date: 2026-10-18 08:00:00.000000
+
+初始化迁移只建了 users 和 reports，角色组、标签及其关联表此前由 db.create_all 创建。
+本迁移补齐这些表和 reports.is_hide_report 列，使空库执行 flask db upgrade 即可得到完整表结构；
+已由 db.create_all 建好的表和列会跳过。列表查询索引由下一个迁移（f3a666c6f901）创建。
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2b8d6f3a1c57'
+down_revision = '64b5a2fa198d'
+branch_labels = None
+depends_on = None
+
+
+def _existing_tables():
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def upgrade():
+    tables = _existing_tables()
+    if 'role_groups' not in tables:
+        op.create_table('role_groups',
+        sa.Column('id', sa.Integer(), nullable=False, comment='主键ID'),
+        sa.Column('name', sa.String(length=100), nullable=False, comment='角色组名称'),
+        sa.Column('description', sa.String(length=500), nullable=True, comment='角色组描述'),
+        sa.Column('created_at', sa.DateTime(), nullable=True, comment='创建时间'),
+        sa.Column('updated_at', sa.DateTime(), nullable=True, comment='更新时间'),
+        sa.PrimaryKeyConstraint('id')
+        )
+    if 'user_role_groups' not in tables:
+        op.create_table('user_role_groups',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False, comment='用户ID'),
+        sa.Column('role_group_id', sa.Integer(), nullable=False, comment='角色组ID'),
+        sa.Column('created_at', sa.DateTime(), nullable=True, comment='创建时间'),
+        sa.ForeignKeyConstraint(['role_group_id'], ['role_groups.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+        )
+    if 'group_visible_reports' not in tables:
+        op.create_table('group_visible_reports',
+        sa.Column('group_id', sa.Integer(), nullable=False),
+        sa.Column('report_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['group_id'], ['role_groups.id'], ),
+        sa.ForeignKeyConstraint(['report_id'], ['reports.id'], ),
+        sa.PrimaryKeyConstraint('group_id', 'report_id')
+        )
+    if 'tags' not in tables:
+        op.create_table('tags',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=30), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('name')
+        )
+    if 'report_tags' not in tables:
+        op.create_table('report_tags',
+        sa.Column('report_id', sa.Integer(), nullable=False),
+        sa.Column('tag_id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['report_id'], ['reports.id'], ),
+        sa.ForeignKeyConstraint(['tag_id'], ['tags.id'], ),
+        sa.PrimaryKeyConstraint('report_id', 'tag_id')
+        )
+
+    report_columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('reports')}
+    with op.batch_alter_table('reports') as batch_op:
+        if 'is_hide_report' not in report_columns:
+            batch_op.add_column(sa.Column('is_hide_report', sa.Boolean(), nullable=True))
+        batch_op.alter_column('powerbi_id', existing_type=sa.String(length=100),
+                              type_=sa.String(length=256), existing_nullable=False)
+    # 预注册用户在绑定钉钉前没有 dingtalk_id
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.alter_column('dingtalk_id', existing_type=sa.String(length=100), nullable=True)
+
+
+def downgrade():
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.alter_column('dingtalk_id', existing_type=sa.String(length=100), nullable=False)
+    with op.batch_alter_table('reports') as batch_op:
+        batch_op.alter_column('powerbi_id', existing_type=sa.String(length=256),
+                              type_=sa.String(length=100), existing_nullable=False)
+        batch_op.drop_column('is_hide_report')
+    op.drop_table('report_tags')
+    op.drop_table('tags')
+    op.drop_table('group_visible_reports')
+    op.drop_table('user_role_groups')
+    op.drop_table('role_groups')
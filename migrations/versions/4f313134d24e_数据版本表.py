@@ -0,0 +1,34 @@
+"""数据版本表
+
+Revision ID: 4f313134d24e
+Revises: f3a666c6f901
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4f313134d24e'
+down_revision = 'f3a666c6f901'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    catalog_versions = op.create_table('catalog_versions',
+    sa.Column('scope', sa.String(length=30), nullable=False, comment='数据范围'),
+    sa.Column('version', sa.BigInteger(), nullable=False, comment='版本号'),
+    sa.Column('updated_at', sa.DateTime(), nullable=True, comment='更新时间'),
+    sa.PrimaryKeyConstraint('scope')
+    )
+    op.bulk_insert(catalog_versions, [
+        {'scope': 'reports', 'version': 0},
+        {'scope': 'role_groups', 'version': 0},
+        {'scope': 'users', 'version': 0},
+    ])
+
+
+def downgrade():
+    op.drop_table('catalog_versions')
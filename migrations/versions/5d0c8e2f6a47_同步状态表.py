@@ -0,0 +1,29 @@
+"""同步状态表
+
+Revision ID: 5d0c8e2f6a47
+Revises: c7e5a9d3b812
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d0c8e2f6a47'
+down_revision = 'c7e5a9d3b812'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('sync_states',
+    sa.Column('key', sa.String(length=64), nullable=False, comment='状态键'),
+    sa.Column('value', sa.Text(), nullable=True, comment='状态值（JSON）'),
+    sa.Column('updated_at', sa.DateTime(), nullable=True, comment='更新时间'),
+    sa.PrimaryKeyConstraint('key')
+    )
+
+
+def downgrade():
+    op.drop_table('sync_states')
@@ -0,0 +1,25 @@
+"""报表powerbi_id唯一
+
+Revision ID: 9b1d2e7c4a10
+Revises: 4f313134d24e
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9b1d2e7c4a10'
+down_revision = '4f313134d24e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 升级前需先清理重复的 powerbi_id，否则唯一索引创建失败
+    op.create_index('uq_reports_powerbi_id', 'reports', ['powerbi_id'], unique=True)
+
+
+def downgrade():
+    op.drop_index('uq_reports_powerbi_id', table_name='reports')
@@ -0,0 +1,31 @@
+"""令牌吊销表
+
+Revision ID: c7e5a9d3b812
+Revises: 9b1d2e7c4a10
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7e5a9d3b812'
+down_revision = '9b1d2e7c4a10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('token_revocations',
+    sa.Column('key', sa.String(length=64), nullable=False, comment='吊销键'),
+    sa.Column('revoked_at', sa.Float(), nullable=False, comment='吊销时间（Unix时间戳）'),
+    sa.Column('expires_at', sa.Float(), nullable=False, comment='记录过期时间（Unix时间戳）'),
+    sa.PrimaryKeyConstraint('key')
+    )
+    op.create_index('ix_token_revocations_expires_at', 'token_revocations', ['expires_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_token_revocations_expires_at', table_name='token_revocations')
+    op.drop_table('token_revocations')
@@ -0,0 +1,46 @@
+"""列表查询索引
+
+Revision ID: f3a666c6f901
+Revises: 2b8d6f3a1c57
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3a666c6f901'
+down_revision = '2b8d6f3a1c57'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 列表过滤与游标分页
+    op.create_index('ix_users_role', 'users', ['role'], unique=False)
+    op.create_index('ix_users_name_id', 'users', ['name', 'id'], unique=False)
+    op.create_index('ix_users_created_at_id', 'users', ['created_at', 'id'], unique=False)
+    op.create_index('ix_reports_name_id', 'reports', ['name', 'id'], unique=False)
+    op.create_index('ix_reports_created_at_id', 'reports', ['created_at', 'id'], unique=False)
+    op.create_index('ix_role_groups_name_id', 'role_groups', ['name', 'id'], unique=False)
+    op.create_index('ix_role_groups_created_at_id', 'role_groups', ['created_at', 'id'], unique=False)
+    # 关联表反查
+    op.create_index('ix_user_role_groups_user_id', 'user_role_groups', ['user_id'], unique=False)
+    op.create_index('ix_user_role_groups_role_group_id', 'user_role_groups', ['role_group_id'], unique=False)
+    op.create_index('ix_group_visible_reports_report_id', 'group_visible_reports', ['report_id'], unique=False)
+    op.create_index('ix_report_tags_tag_id', 'report_tags', ['tag_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_report_tags_tag_id', table_name='report_tags')
+    op.drop_index('ix_group_visible_reports_report_id', table_name='group_visible_reports')
+    op.drop_index('ix_user_role_groups_role_group_id', table_name='user_role_groups')
+    op.drop_index('ix_user_role_groups_user_id', table_name='user_role_groups')
+    op.drop_index('ix_role_groups_created_at_id', table_name='role_groups')
+    op.drop_index('ix_role_groups_name_id', table_name='role_groups')
+    op.drop_index('ix_reports_created_at_id', table_name='reports')
+    op.drop_index('ix_reports_name_id', table_name='reports')
+    op.drop_index('ix_users_created_at_id', table_name='users')
+    op.drop_index('ix_users_name_id', table_name='users')
+    op.drop_index('ix_users_role', table_name='users')
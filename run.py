@@ -3,25 +3,12 @@ from flask_migrate import Migrate
 from sqlalchemy.exc import SQLAlchemyError
 from loguru import logger
 logger.add("app/log.log", rotation="10 MB")
-from flask import request
 import traceback
 app = create_app()
 
 # 初始化数据库迁移
 migrate = Migrate(app, db)
 
-# 请求钩子
-@app.before_request
-def log_request():
-    logger.info(f"请求开始 | {request.method} {request.path} | 数据: {request.get_json(silent=True)}")
-
-
-@app.after_request
-def log_response(response):
-    logger.info(f"请求完成 | 状态码: {response.status_code}, 响应数据: {response.get_json(silent=True)}")
-    return response
-
-
 @app.route('/')
 def index():
     """
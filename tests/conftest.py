@@ -0,0 +1,100 @@
+"""
+接口测试夹具
+
+使用 TestingConfig（QUERY_BUDGET_RAISE=True，超出SQL预算或疑似N+1时请求直接抛出 QueryBudgetExceeded），
+默认在内存SQLite中按 benchmarks/seed.py 生成一份小规模数据。
+
+环境变量:
+    TEST_DATABASE_URL  测试数据库（默认 sqlite:// 内存库）；使用 PostgreSQL 时请指向专用的空库
+"""
+import os
+
+os.environ['FLASK_ENV'] = 'testing'
+os.environ.setdefault('TEST_DATABASE_URL', 'sqlite://')
+# 请求日志会写文件，测试中关闭
+os.environ['REQUEST_LOG_ENABLED'] = 'False'
+
+import pytest
+from app import create_app, db
+from app.models.user import User
+from app.models.user_role_group import UserRoleGroup
+from benchmarks.seed import seed_database
+
+# 测试数据规模（覆盖大组、多组成员和长尾的可见报表）
+TEST_SCALE = {'users': 300, 'role_groups': 30, 'reports': 300, 'tags': 20}
+
+
+@pytest.fixture(scope='session')
+def app():
+    app = create_app()
+    with app.app_context():
+        if db.session.query(User.id).first() is None:
+            seed_database(**TEST_SCALE, echo=lambda message: None)
+            # 小规模数据中不一定抽到管理员，单独添加一个
+            db.session.add(User(dingtalk_id='test-admin', name='测试管理员', role='admin'))
+            db.session.commit()
+    return app
+
+
+@pytest.fixture(scope='session')
+def admin_id(app):
+    with app.app_context():
+        return db.session.query(User.id).filter(User.role == 'admin').order_by(User.id).first()[0]
+
+
+@pytest.fixture(scope='session')
+def member_id(app):
+    """
+    所属角色组最多的普通用户
+    """
+    with app.app_context():
+        return db.session.query(UserRoleGroup.user_id).join(User, User.id == UserRoleGroup.user_id).filter(
+            User.role == 'user', User.is_active.is_(True)
+        ).group_by(UserRoleGroup.user_id).order_by(db.func.count().desc(), UserRoleGroup.user_id).first()[0]
+
+
+@pytest.fixture(scope='session')
+def largest_group_id(app):
+    """
+    成员最多的角色组
+    """
+    with app.app_context():
+        return db.session.query(UserRoleGroup.role_group_id).group_by(UserRoleGroup.role_group_id).order_by(
+            db.func.count().desc(), UserRoleGroup.role_group_id).first()[0]
+
+
+@pytest.fixture
+def client_as(app):
+    """
+    以指定用户登录的测试客户端：client_as(user_id).get(...)
+    """
+    def make(user_id):
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session['_user_id'] = str(user_id)
+        return client
+    return make
+
+
+@pytest.fixture
+def count_statements(app):
+    """
+    统计请求执行的SQL语句数：count_statements(client.get, url) -> (response, 语句数)
+    """
+    from sqlalchemy import event
+    with app.app_context():
+        engine = db.engine
+    counter = []
+
+    def listener(*args):
+        counter.append(1)
+
+    event.listen(engine, 'before_cursor_execute', listener)
+
+    def run(call, *args, **kwargs):
+        counter.clear()
+        response = call(*args, **kwargs)
+        return response, len(counter)
+
+    yield run
+    event.remove(engine, 'before_cursor_execute', listener)
@@ -0,0 +1,173 @@
+"""
+钉钉客户端测试：熔断器状态转换和重试规则（替换 requests 会话和时钟，不发起网络请求）
+"""
+import pytest
+import requests
+from app.services.dingtalk_client import CircuitBreaker, DingtalkClient, DingtalkUnavailable
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class StubResponse:
+    def __init__(self, status_code, body=None):
+        self.status_code = status_code
+        self._body = body if body is not None else {}
+
+    def json(self):
+        return self._body
+
+
+class StubSession:
+    """
+    按顺序返回预设结果的会话：结果为异常时抛出，否则作为响应返回
+    """
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = []
+
+    def request(self, method, url, **kwargs):
+        self.calls.append((method, url))
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker(failure_threshold=3, reset_timeout=30.0, clock=clock)
+
+
+def make_client(breaker, *outcomes, max_retries=2):
+    client = DingtalkClient('http://dingtalk.test', max_retries=max_retries, backoff=0, breaker=breaker)
+    client.session = StubSession(*outcomes)
+    return client
+
+
+def test_breaker_opens_after_consecutive_failures(breaker):
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.allow()
+    # 成功后重新计数
+    breaker.record_success()
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+
+def test_breaker_half_open_probe_success_closes(breaker, clock):
+    for _ in range(3):
+        breaker.record_failure()
+    clock.advance(29.9)
+    assert not breaker.allow()
+    clock.advance(0.1)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # 半开状态只放行一个试探请求
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow() and breaker.allow()
+
+
+def test_breaker_failed_probe_reopens(breaker, clock):
+    for _ in range(3):
+        breaker.record_failure()
+    clock.advance(30)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+    # 冷却时间从试探失败时重新计算
+    clock.advance(29)
+    assert not breaker.allow()
+    clock.advance(1)
+    assert breaker.allow()
+
+
+def test_get_retried_on_read_timeout(breaker):
+    client = make_client(breaker, requests.ReadTimeout(), StubResponse(200, {'ok': True}))
+    assert client.get('/v1.0/contact/users/me') == {'ok': True}
+    assert len(client.session.calls) == 2
+
+
+def test_post_not_retried_on_read_timeout(breaker):
+    client = make_client(breaker, requests.ReadTimeout(), StubResponse(200))
+    with pytest.raises(DingtalkUnavailable):
+        client.post('/v1.0/oauth2/userAccessToken', json={'code': 'x'})
+    assert len(client.session.calls) == 1
+
+
+def test_connection_error_retried_for_post(breaker):
+    client = make_client(breaker, requests.ConnectionError(), StubResponse(200, {'accessToken': 't'}))
+    assert client.post('/v1.0/oauth2/userAccessToken', json={'code': 'x'}) == {'accessToken': 't'}
+    assert len(client.session.calls) == 2
+
+
+def test_get_retried_on_5xx(breaker):
+    client = make_client(breaker, StubResponse(503), StubResponse(502), StubResponse(200, {'ok': True}))
+    assert client.get('/v1.0/contact/users/me') == {'ok': True}
+    assert len(client.session.calls) == 3
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_5xx_retries_exhausted(breaker):
+    client = make_client(breaker, *[StubResponse(500)] * 3)
+    with pytest.raises(DingtalkUnavailable):
+        client.get('/v1.0/contact/users/me')
+    assert len(client.session.calls) == 3
+
+
+def test_post_5xx_not_retried_but_429_is(breaker):
+    client = make_client(breaker, StubResponse(503))
+    with pytest.raises(DingtalkUnavailable):
+        client.post('/v1.0/oauth2/userAccessToken', json={'code': 'x'})
+    assert len(client.session.calls) == 1
+
+    client = make_client(breaker, StubResponse(429), StubResponse(200, {'ok': True}))
+    assert client.post('/v1.0/oauth2/userAccessToken', json={'code': 'x'}) == {'ok': True}
+    assert len(client.session.calls) == 2
+
+
+def test_open_breaker_fails_fast(breaker):
+    client = make_client(breaker, *[requests.ConnectionError()] * 3, max_retries=0)
+    for _ in range(3):
+        with pytest.raises(DingtalkUnavailable):
+            client.get('/v1.0/contact/users/me')
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(DingtalkUnavailable):
+        client.get('/v1.0/contact/users/me')
+    assert len(client.session.calls) == 3
+
+
+@pytest.mark.parametrize('error', [requests.exceptions.ChunkedEncodingError(), RuntimeError('boom')])
+def test_probe_failure_with_other_errors_reopens(breaker, clock, error):
+    for _ in range(3):
+        breaker.record_failure()
+    clock.advance(30)
+    client = make_client(breaker, error, StubResponse(200, {'ok': True}))
+    with pytest.raises((DingtalkUnavailable, RuntimeError)):
+        client.get('/v1.0/contact/users/me')
+    assert breaker.state == CircuitBreaker.OPEN
+    # 试探标记已清除，冷却后可以再次试探并恢复
+    clock.advance(30)
+    assert client.get('/v1.0/contact/users/me') == {'ok': True}
+    assert breaker.state == CircuitBreaker.CLOSED
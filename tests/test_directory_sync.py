@@ -0,0 +1,130 @@
+"""
+钉钉通讯录同步测试：同步对象为本地模拟钉钉接口（tools/fake_dingtalk.py）
+"""
+import threading
+import pytest
+from sqlalchemy import select, update, delete, insert
+from werkzeug.serving import make_server
+from app import db
+from app.models.sync_state import SyncState
+from app.models.user import User
+from app.services import dingtalk_client
+from app.services.catalog_version_service import CatalogVersionService
+from app.services.directory_sync_service import DirectorySyncService
+from tools.fake_dingtalk import create_fake_app, build_directory
+
+users_table = User.__table__
+
+
+@pytest.fixture
+def fake_dingtalk(app):
+    """
+    启动模拟钉钉接口（3个部门，每部门10人）并让钉钉客户端指向它；
+    结束后删除同步创建的用户、恢复被停用的用户，测试库保持原样
+    """
+    fake = create_fake_app(directory=build_directory(3, 10))
+    server = make_server('127.0.0.1', 0, fake, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f'http://127.0.0.1:{server.server_port}'
+    saved = {key: app.config.get(key) for key in ('DINGTALK_API_BASE', 'DINGTALK_OAPI_BASE')}
+    app.config.update(DINGTALK_API_BASE=base, DINGTALK_OAPI_BASE=base)
+    dingtalk_client._client = None
+    DirectorySyncService._token = None
+    with app.app_context():
+        active_ids = list(db.session.execute(
+            select(users_table.c.id).where(users_table.c.is_active.is_(True))).scalars())
+
+    yield fake
+
+    server.shutdown()
+    app.config.update(saved)
+    dingtalk_client._client = None
+    DirectorySyncService._token = None
+    with app.app_context():
+        db.session.execute(delete(users_table).where(users_table.c.dingtalk_id.startswith('union-dir-')))
+        db.session.execute(update(users_table).where(users_table.c.id.in_(active_ids)).values(is_active=True))
+        db.session.execute(delete(SyncState.__table__))
+        CatalogVersionService.bump(CatalogVersionService.USERS)
+        db.session.commit()
+
+
+def _user(union_id):
+    return db.session.execute(select(users_table).where(users_table.c.dingtalk_id == union_id)).one_or_none()
+
+
+def test_incremental_sync(app, fake_dingtalk):
+    members = fake_dingtalk.config['DIRECTORY']['members']
+    with app.app_context():
+        summary = DirectorySyncService.sync()
+        assert (summary['members'], summary['created'], summary['failed_departments']) == (30, 30, 0)
+        assert _user('union-dir-5').is_active
+
+        # 没有变化时不读写用户表
+        assert DirectorySyncService.sync()['changed'] == 0
+
+        members[2][1]['name'] = '员工1改名'
+        assert DirectorySyncService.sync()['updated'] == 1
+        assert _user('union-dir-1').name == '员工1改名'
+
+        # 离开和在钉钉中停用的成员：不带 deactivate 时保留待停用，之后带 deactivate 的同步停用
+        departed = members[3].pop(1)['unionid']
+        members[4][1]['active'] = False
+        inactive = members[4][1]['unionid']
+        assert DirectorySyncService.sync()['pending_deactivation'] == 2
+        assert DirectorySyncService.sync()['pending_deactivation'] == 2
+        assert _user(departed).is_active and _user(inactive).is_active
+        summary = DirectorySyncService.sync(deactivate=True)
+        assert (summary['deactivated'], summary['pending_deactivation']) == (2, 0)
+        assert not _user(departed).is_active and not _user(inactive).is_active
+
+
+def test_full_sync_compares_users_table_and_keeps_admins(app, fake_dingtalk, admin_id, member_id):
+    with app.app_context():
+        DirectorySyncService.sync()
+        # 丢失同步状态后，增量同步无法得知已离开的成员，--full 与用户表比较
+        db.session.execute(delete(SyncState.__table__))
+        db.session.commit()
+        summary = DirectorySyncService.sync(full=True, deactivate=True)
+        assert summary['changed'] == 30
+        assert summary['deactivated'] > 0
+        assert not db.session.get(User, member_id).is_active
+        assert db.session.get(User, admin_id).is_active
+        assert _user('union-dir-5').is_active
+
+
+def test_failed_department_skips_deactivation(app, fake_dingtalk, member_id):
+    members = fake_dingtalk.config['DIRECTORY']['members']
+    with app.app_context():
+        DirectorySyncService.sync()
+        departed = members[2].pop(1)['unionid']
+        fake_dingtalk.config['FAILING_DEPARTMENTS'].add(3)
+
+        for full in (False, True):
+            summary = DirectorySyncService.sync(full=full, deactivate=True)
+            assert (summary['failed_departments'], summary['deactivated']) == (1, 0)
+        assert _user('union-dir-11').is_active and _user(departed).is_active
+        assert db.session.get(User, member_id).is_active
+
+        # 部门恢复后增量同步照常处理离开的成员，未拉取到的部门成员不受影响
+        fake_dingtalk.config['FAILING_DEPARTMENTS'].clear()
+        summary = DirectorySyncService.sync(deactivate=True)
+        assert (summary['failed_departments'], summary['deactivated']) == (0, 1)
+        assert not _user(departed).is_active and _user('union-dir-11').is_active
+
+
+def test_new_member_created_concurrently_by_login(app, fake_dingtalk, monkeypatch):
+    from app.utils import upsert
+    real_upsert_insert = upsert.upsert_insert
+
+    def login_during_sync(table):
+        # 在查询已有用户之后、写入新成员之前，同一成员首次登录创建了用户
+        db.session.execute(insert(users_table).values(dingtalk_id='union-dir-7', name='登录昵称', role='user',
+                                                      is_active=True))
+        return real_upsert_insert(table)
+
+    monkeypatch.setattr(upsert, 'upsert_insert', login_during_sync)
+    with app.app_context():
+        summary = DirectorySyncService.sync()
+        assert summary['members'] == 30
+        rows = db.session.execute(select(users_table).where(users_table.c.dingtalk_id == 'union-dir-7')).all()
+        assert len(rows) == 1 and rows[0].name == '员工7'
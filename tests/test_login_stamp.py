@@ -0,0 +1,21 @@
+"""
+最后登录时间延迟写入测试
+"""
+from datetime import datetime
+from app import db
+from app.models.user import User
+from app.services.catalog_version_service import CatalogVersionService
+from app.services.login_stamp_service import LoginStampService
+
+SCOPES = (CatalogVersionService.REPORTS, CatalogVersionService.ROLE_GROUPS, CatalogVersionService.USERS)
+
+
+def test_flush_writes_last_login_without_bumping_versions(app, member_id):
+    login_at = datetime(2030, 1, 1, 8, 30)
+    with app.app_context():
+        before = CatalogVersionService.get_versions(*SCOPES, reload=True)
+        with LoginStampService._lock:
+            LoginStampService._pending[member_id] = login_at
+        assert LoginStampService.flush() == 1
+        assert db.session.get(User, member_id).last_login == login_at
+        assert CatalogVersionService.get_versions(*SCOPES, reload=True) == before
@@ -0,0 +1,55 @@
+"""
+运行指标测试：/metrics 访问控制、连接池事件计时、后台写入多进程快照
+"""
+import json
+import time
+from app import db
+from app.services import metrics
+from app.services.metrics import MetricsRegistry
+
+
+def test_metrics_denied_without_token(app):
+    assert not app.config.get('METRICS_TOKEN')
+    assert app.test_client().get('/metrics').status_code == 403
+
+
+def test_metrics_requires_bearer_token(app, monkeypatch):
+    monkeypatch.setitem(app.config, 'METRICS_TOKEN', 'secret')
+    client = app.test_client()
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer 密钥'}).status_code == 401
+    response = client.get('/metrics', headers={'Authorization': 'Bearer secret'})
+    assert response.status_code == 200
+    assert 'http_requests_total{' in response.get_data(as_text=True)
+
+
+def _checkouts():
+    return sum(sum(counts) for _, counts, _ in metrics.POOL_CHECKOUT.snapshot())
+
+
+def test_pool_checkout_timed_through_events(app, client_as, admin_id):
+    with app.app_context():
+        # 通过事件计时，不替换连接池的方法
+        assert 'connect' not in vars(db.engine.pool)
+    before = _checkouts()
+    assert client_as(admin_id).get('/api/reports').status_code == 200
+    assert _checkouts() > before
+
+
+def test_snapshot_written_in_background(tmp_path):
+    registry = MetricsRegistry()
+    counter = registry.counter('jobs_total', '任务数')
+    registry.configure(str(tmp_path), flush_interval=0.01)
+    try:
+        counter.inc(amount=3)
+        path = tmp_path / f'metrics_{registry._flusher_pid}.json'
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            if path.exists() and json.loads(path.read_text(encoding='utf-8'))['jobs_total']['values']:
+                break
+            time.sleep(0.01)
+        assert json.loads(path.read_text(encoding='utf-8'))['jobs_total']['values'] == [[[], 3]]
+    finally:
+        # 停止写入临时目录（线程随进程退出）
+        registry.directory = None
@@ -0,0 +1,119 @@
+"""
+游标分页测试：逐页读取的结果与一次读取全部的顺序一致（无重复、无遗漏），包括排序字段为NULL的行
+"""
+import base64
+from datetime import datetime
+import pytest
+from sqlalchemy import select, update
+from app import db
+from app.models.report import Report
+from app.models.user import User
+from app.services.catalog_version_service import CatalogVersionService
+from app.utils.pagination import encode_cursor
+
+users_table = User.__table__
+reports_table = Report.__table__
+
+
+@pytest.fixture
+def nullable_sort_values(app):
+    """
+    把部分用户姓名、报表创建时间改为NULL，并让一批报表的创建时间相同；结束后恢复
+    """
+    with app.app_context():
+        user_ids = list(db.session.execute(select(users_table.c.id).order_by(users_table.c.id)
+                                           .where(users_table.c.id % 13 == 0)).scalars())
+        report_ids = list(db.session.execute(select(reports_table.c.id).order_by(reports_table.c.id)).scalars())
+        null_reports, tied_reports = report_ids[::17], report_ids[5::11]
+        names = dict(db.session.execute(select(users_table.c.id, users_table.c.name)
+                                        .where(users_table.c.id.in_(user_ids))).all())
+        created = dict(db.session.execute(select(reports_table.c.id, reports_table.c.created_at)
+                                          .where(reports_table.c.id.in_(null_reports + tied_reports))).all())
+        db.session.execute(update(users_table).where(users_table.c.id.in_(user_ids)).values(name=None))
+        db.session.execute(update(reports_table).where(reports_table.c.id.in_(null_reports)).values(created_at=None))
+        db.session.execute(update(reports_table).where(reports_table.c.id.in_(tied_reports))
+                           .values(created_at=datetime(2025, 6, 1)))
+        CatalogVersionService.bump(CatalogVersionService.USERS, CatalogVersionService.REPORTS)
+        db.session.commit()
+
+    yield
+
+    with app.app_context():
+        for user_id, name in names.items():
+            db.session.execute(update(users_table).where(users_table.c.id == user_id).values(name=name))
+        for report_id, created_at in created.items():
+            db.session.execute(update(reports_table).where(reports_table.c.id == report_id)
+                               .values(created_at=created_at))
+        CatalogVersionService.bump(CatalogVersionService.USERS, CatalogVersionService.REPORTS)
+        db.session.commit()
+
+
+def _walk(client, path, sort, limit):
+    """
+    按游标逐页读取，返回全部记录ID和页数
+    """
+    ids, pages, cursor = [], 0, None
+    while True:
+        query = {'sort': sort, 'limit': limit}
+        if cursor:
+            query['cursor'] = cursor
+        response = client.get(path, query_string=query)
+        assert response.status_code == 200
+        page = response.get_json()
+        assert len(page) <= limit
+        ids.extend(item['id'] for item in page)
+        pages += 1
+        cursor = response.headers.get('X-Next-Cursor')
+        if not cursor:
+            return ids, pages
+
+
+@pytest.mark.parametrize('sort', ['name', '-name', 'created_at', '-created_at'])
+def test_user_pages_cover_all_users(client_as, admin_id, nullable_sort_values, sort):
+    client = client_as(admin_id)
+    expected = [user['id'] for user in client.get('/api/users', query_string={'sort': sort}).get_json()]
+    ids, pages = _walk(client, '/api/users', sort, 7)
+    assert ids == expected
+    assert len(set(ids)) == len(ids) and pages > 1
+
+
+def test_user_null_names_sort_last(client_as, admin_id, nullable_sort_values):
+    users = client_as(admin_id).get('/api/users?sort=name').get_json()
+    names = [user['name'] for user in users]
+    first_null = names.index(None)
+    assert first_null > 0 and all(name is None for name in names[first_null:])
+
+
+@pytest.mark.parametrize('sort', ['-created_at', 'created_at', 'name'])
+def test_report_pages_cover_all_reports(client_as, admin_id, nullable_sort_values, sort):
+    client = client_as(admin_id)
+    expected = [report['id'] for report in client.get('/api/reports', query_string={'sort': sort}).get_json()]
+    ids, pages = _walk(client, '/api/reports', sort, 9)
+    assert ids == expected
+    assert len(set(ids)) == len(ids) and pages > 1
+
+
+def _raw_cursor(text):
+    return base64.urlsafe_b64encode(text.encode('utf-8')).decode('ascii')
+
+
+@pytest.mark.parametrize('cursor', [
+    'not-a-cursor',
+    '!!!',
+    _raw_cursor('{"sort":"name"}'),
+    _raw_cursor('["created_at",{"dt":"yesterday"},1]'),
+    _raw_cursor('["created_at",null,"x"]'),
+    _raw_cursor('["created_at","2025-01-01",1]'),
+    encode_cursor('name', 'abc', 1)
+])
+def test_malformed_cursor_rejected(client_as, admin_id, cursor):
+    client = client_as(admin_id)
+    for path in ('/api/users', '/api/reports'):
+        response = client.get(path, query_string={'sort': '-created_at', 'limit': 5, 'cursor': cursor})
+        assert response.status_code == 400
+
+
+def test_null_cursor_rejected_for_non_nullable_column(client_as, admin_id):
+    response = client_as(admin_id).get('/api/reports', query_string={
+        'limit': 5, 'sort': 'name', 'cursor': encode_cursor('name', None, 1)})
+    assert response.status_code == 400
@@ -0,0 +1,46 @@
+"""
+列表和详情接口的SQL预算测试：TestingConfig 下超出预算或疑似N+1时请求直接抛出 QueryBudgetExceeded
+"""
+import pytest
+from app import db
+from app.models.role_group import RoleGroup
+
+# 路由上 @query_budget(max_statements=8) 的预算
+MAX_STATEMENTS = 8
+
+
+@pytest.mark.parametrize('query', ['', '?limit=50', '?limit=50&sort=-created_at'])
+def test_report_list_within_budget(client_as, count_statements, admin_id, member_id, query):
+    for user_id in (admin_id, member_id):
+        response, statements = count_statements(client_as(user_id).get, f'/api/reports{query}')
+        assert response.status_code == 200
+        assert statements <= MAX_STATEMENTS
+
+
+@pytest.mark.parametrize('query', ['', '?view=summary', '?limit=10'])
+def test_role_group_list_within_budget(client_as, count_statements, admin_id, query):
+    response, statements = count_statements(client_as(admin_id).get, f'/api/role_groups{query}')
+    assert response.status_code == 200
+    assert statements <= MAX_STATEMENTS
+
+
+def test_role_group_detail_within_budget(app, client_as, count_statements, admin_id, largest_group_id):
+    response, statements = count_statements(client_as(admin_id).get, f'/api/role_groups/{largest_group_id}')
+    assert response.status_code == 200
+    assert statements <= MAX_STATEMENTS
+
+    data = response.get_json()
+    with app.app_context():
+        group = db.session.get(RoleGroup, largest_group_id)
+        user_ids = {user.id for user in group.users}
+        report_ids = {report.id for report in group.visible_reports}
+        user_groups = {user.id: {g.id for g in user.role_groups} for user in group.users}
+    assert data['user_count'] == len(user_ids) > 1
+    assert {user['id'] for user in data['users']} == user_ids
+    assert set(data['visible_reports']) == report_ids
+    for user in data['users']:
+        assert {g['id'] for g in user['role_groups']} == user_groups[user['id']]
+
+
+def test_role_group_detail_not_found(client_as, admin_id):
+    assert client_as(admin_id).get('/api/role_groups/999999').status_code == 404
@@ -0,0 +1,155 @@
+"""
+报表全文检索测试：分词、排序、可见性过滤，以及其他进程修改报表后的增量刷新
+"""
+from datetime import datetime
+import pytest
+from sqlalchemy import select, update, delete, insert
+from app import db
+from app.models.report import Report
+from app.models.tag import Tag
+from app.services.catalog_version_service import CatalogVersionService
+from app.services.report_service import ReportService
+from app.services.search_service import SearchService, ReportSearchIndex, tokenize
+
+reports_table = Report.__table__
+
+
+def test_tokenize_latin_words_lowercased():
+    assert tokenize('Sales-Q3 report_2024') == ['sales', 'q3', 'report', '2024']
+
+
+def test_tokenize_cjk_bigrams_and_single_chars():
+    assert tokenize('销售报表') == ['销', '售', '报', '表', '销售', '售报', '报表']
+    # 查询时多字片段只用二元组，单字片段用单字
+    assert tokenize('销售报表', for_query=True) == ['销售', '售报', '报表']
+    assert tokenize('销 KPI', for_query=True) == ['销', 'kpi']
+
+
+def _index(*documents):
+    index = ReportSearchIndex()
+    for report_id, name, description, tags, *flags in documents:
+        is_active, is_hide_report = flags or (True, False)
+        index.add(report_id, name, description, tags, is_active, is_hide_report)
+    return index
+
+
+def test_field_weights_rank_name_over_tags_over_description():
+    index = _index((1, '月度汇总', 'revenue', ()),
+                   (2, '月度汇总', None, ('revenue',)),
+                   (3, 'revenue', None, ()))
+    assert [report_id for report_id, _ in index.search('revenue')] == [3, 2, 1]
+
+
+def test_rarer_term_scores_higher():
+    index = _index(*[(i, 'common', None, ()) for i in range(1, 10)], (10, 'rare', None, ()))
+    (_, rare_score), = index.search('rare')
+    assert rare_score > index.search('common')[0][1]
+
+
+def test_all_query_terms_required():
+    index = _index((1, 'sales north', None, ()), (2, 'sales south', None, ()))
+    assert [report_id for report_id, _ in index.search('sales north')] == [1]
+    assert index.search('sales east') == []
+    index.remove(1)
+    assert index.search('north') == []
+
+
+@pytest.mark.parametrize('query', ['报表', '销售', '标签1', '财务 报表', '基准'])
+def test_top_k_matches_full_ranking(app, query):
+    with app.app_context():
+        index = SearchService.get_index()
+        ranked = index.search(query)
+        assert ranked
+        for limit in (1, 5, 20):
+            assert index.search(query, limit=limit) == ranked[:limit]
+
+
+def test_accept_filter():
+    index = _index((1, 'kpi', None, (), True, False),
+                   (2, 'kpi', None, (), False, False),
+                   (3, 'kpi', None, (), True, True))
+
+    def accept(report_id, is_active, is_hide_report):
+        return bool(is_active) and not is_hide_report
+
+    for limit in (None, 10):
+        assert [report_id for report_id, _ in index.search('kpi', accept, limit)] == [1]
+        assert sorted(report_id for report_id, _ in index.search('kpi', None, limit)) == [1, 2, 3]
+
+
+def _write(*statements):
+    """
+    模拟其他进程写入报表：直接修改数据库并递增版本号，不经过本进程的索引增量更新
+    """
+    for statement in statements:
+        db.session.execute(statement)
+    CatalogVersionService.bump(CatalogVersionService.REPORTS)
+    db.session.commit()
+
+
+@pytest.fixture
+def search_reports(app):
+    """
+    新增三个只能通过唯一词项检索到的报表（正常、停用、隐藏），结束后删除
+    """
+    rows = [{'name': f'zqxwv {state}', 'powerbi_id': f'search-test-{state}', 'is_active': state != 'inactive',
+             'is_hide_report': state == 'hidden', 'updated_at': datetime.utcnow()}
+            for state in ('visible', 'inactive', 'hidden')]
+    with app.app_context():
+        SearchService.get_index()
+        _write(insert(reports_table).values(rows))
+        ids = dict(db.session.execute(select(reports_table.c.name, reports_table.c.id)
+                                      .where(reports_table.c.powerbi_id.startswith('search-test-'))).all())
+
+    yield {name.split()[1]: report_id for name, report_id in ids.items()}
+
+    with app.app_context():
+        _write(delete(reports_table).where(reports_table.c.powerbi_id.startswith('search-test-')))
+
+
+def _search_ids(client, query):
+    response = client.get('/api/reports/search', query_string={'q': query})
+    assert response.status_code == 200
+    return sorted(report['id'] for report in response.get_json())
+
+
+def test_search_visibility(client_as, admin_id, member_id, search_reports):
+    assert _search_ids(client_as(member_id), 'zqxwv') == [search_reports['visible']]
+    assert _search_ids(client_as(admin_id), 'zqxwv') == sorted(search_reports.values())
+
+
+def test_other_worker_writes_applied_without_rebuild(app, client_as, admin_id, search_reports, monkeypatch):
+    def rebuild(version):
+        raise AssertionError('不应全量重建索引')
+
+    client = client_as(admin_id)
+    assert _search_ids(client, 'zqxwv') == sorted(search_reports.values())
+    monkeypatch.setattr(SearchService, '_build', staticmethod(rebuild))
+
+    with app.app_context():
+        _write(update(reports_table).where(reports_table.c.id == search_reports['visible'])
+               .values(name='mnbvc renamed', updated_at=datetime.utcnow()))
+        _write(delete(reports_table).where(reports_table.c.id == search_reports['hidden']))
+    assert _search_ids(client, 'mnbvc') == [search_reports['visible']]
+    assert _search_ids(client, 'zqxwv') == [search_reports['inactive']]
+
+
+def test_other_worker_tag_change_applied(app, client_as, admin_id, search_reports, monkeypatch):
+    report_id = search_reports['visible']
+    client = client_as(admin_id)
+    monkeypatch.setitem(app.config, 'SEARCH_DELTA_OVERLAP', 0)
+    with app.app_context():
+        _write(update(reports_table).where(reports_table.c.id == report_id).values(updated_at=datetime(2024, 1, 1)))
+    assert _search_ids(client, 'ytrew') == []
+    # 只修改标签关联的写入也要更新报表修改时间，否则其他进程的增量刷新读不到
+    monkeypatch.setattr(SearchService, 'index_report', staticmethod(lambda report_id: None))
+    with app.test_request_context():
+        ReportService.add_tags_to_report(report_id, ['ytrew'])
+    try:
+        assert _search_ids(client, 'ytrew') == [report_id]
+    finally:
+        with app.test_request_context():
+            ReportService.remove_tags_from_report(report_id, ['ytrew'])
+            db.session.execute(delete(Tag.__table__).where(Tag.name == 'ytrew'))
+            db.session.commit()
+    assert _search_ids(client, 'ytrew') == []
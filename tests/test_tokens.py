@@ -0,0 +1,123 @@
+"""
+令牌认证测试：过期、类型不符、按jti吊销、按用户吊销（签发时间截止）、刷新令牌轮换和用户停用
+"""
+import time
+import pytest
+from sqlalchemy import update
+from app import db
+from app.models.user import User
+from app.services.catalog_version_service import CatalogVersionService
+from app.services.principal_service import PrincipalService
+from app.services.token_service import TokenService, TokenError, ACCESS, REFRESH
+
+
+@pytest.fixture
+def token_auth(app, monkeypatch):
+    monkeypatch.setitem(app.config, 'TOKEN_AUTH_ENABLED', True)
+    return app
+
+
+@pytest.fixture
+def issue(token_auth, member_id):
+    """
+    为普通用户签发令牌：issue(**配置覆盖) -> {access_token, refresh_token, ...}
+    """
+    def make(**overrides):
+        with token_auth.app_context():
+            saved = {key: token_auth.config.get(key) for key in overrides}
+            token_auth.config.update(overrides)
+            try:
+                return TokenService.issue(PrincipalService.get(member_id))
+            finally:
+                token_auth.config.update(saved)
+    return make
+
+
+def _get_user(app, access_token):
+    return app.test_client().get('/api/auth/user', headers={'Authorization': f'Bearer {access_token}'})
+
+
+def _refresh(app, refresh_token):
+    return app.test_client().post('/api/auth/token/refresh', json={'refresh_token': refresh_token})
+
+
+def test_access_token_authenticates(token_auth, issue, member_id):
+    response = _get_user(token_auth, issue()['access_token'])
+    assert response.status_code == 200
+    assert response.get_json()['id'] == member_id
+
+
+def test_expired_token_rejected(token_auth, issue):
+    tokens = issue(ACCESS_TOKEN_TTL=-10, REFRESH_TOKEN_TTL=-10)
+    with token_auth.app_context():
+        with pytest.raises(TokenError, match='过期'):
+            TokenService.decode(tokens['access_token'], ACCESS)
+    assert _get_user(token_auth, tokens['access_token']).status_code == 401
+    assert _refresh(token_auth, tokens['refresh_token']).status_code == 401
+
+
+def test_wrong_token_type_rejected(token_auth, issue):
+    tokens = issue()
+    with token_auth.app_context():
+        with pytest.raises(TokenError, match='类型'):
+            TokenService.decode(tokens['refresh_token'], ACCESS)
+    assert _get_user(token_auth, tokens['refresh_token']).status_code == 401
+    assert _refresh(token_auth, tokens['access_token']).status_code == 401
+
+
+def test_token_revoked_by_jti(token_auth, issue):
+    tokens = issue()
+    other = issue()
+    with token_auth.app_context():
+        TokenService.revoke(TokenService.decode(tokens['access_token'], ACCESS))
+    assert _get_user(token_auth, tokens['access_token']).status_code == 401
+    assert _get_user(token_auth, other['access_token']).status_code == 200
+
+
+def test_revoke_users_cuts_off_by_issued_at(token_auth, issue, member_id):
+    before = issue()
+    time.sleep(0.01)
+    with token_auth.app_context():
+        TokenService.revoke_users([member_id])
+    time.sleep(0.01)
+    after = issue()
+    assert _get_user(token_auth, before['access_token']).status_code == 401
+    assert _get_user(token_auth, after['access_token']).status_code == 200
+    # 按用户吊销只作用于访问令牌，刷新令牌按最新的用户信息重新签发
+    assert _refresh(token_auth, before['refresh_token']).status_code == 200
+
+
+def test_rotated_refresh_token_rejected(token_auth, issue):
+    tokens = issue()
+    response = _refresh(token_auth, tokens['refresh_token'])
+    assert response.status_code == 200
+    assert _refresh(token_auth, tokens['refresh_token']).status_code == 401
+    assert _refresh(token_auth, response.get_json()['refresh_token']).status_code == 200
+
+
+def test_concurrent_refresh_consumes_once(token_auth, issue):
+    tokens = issue()
+    with token_auth.app_context():
+        # 两个并发的刷新请求都已通过校验，只有先写入吊销记录的一个能换取新令牌
+        first = TokenService.decode(tokens['refresh_token'], REFRESH)
+        second = TokenService.decode(tokens['refresh_token'], REFRESH)
+        assert TokenService.consume(first) is True
+        assert TokenService.consume(second) is False
+
+
+def test_deactivated_user_token_rejected(token_auth, issue, member_id):
+    tokens = issue()
+
+    def set_active(active):
+        with token_auth.app_context():
+            db.session.execute(update(User).where(User.id == member_id).values(is_active=active))
+            CatalogVersionService.bump(CatalogVersionService.USERS)
+            db.session.commit()
+
+    set_active(False)
+    try:
+        assert _get_user(token_auth, tokens['access_token']).status_code == 401
+        assert _refresh(token_auth, tokens['refresh_token']).status_code == 401
+    finally:
+        set_active(True)
+    assert _get_user(token_auth, tokens['access_token']).status_code == 200
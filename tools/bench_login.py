@@ -0,0 +1,134 @@
+"""
+钉钉登录吞吐量压测
+
+并发调用 /api/auth/dingtalk/callback，统计登录吞吐量和延迟分位数；
+可同时按固定间隔请求一个探测接口（如报表列表），观察集中登录时其他请求的延迟。
+
+用法（对比 gevent 与同步工作进程）:
+    python tools/fake_dingtalk.py --port 8900 --latency 0.2 --jitter 0.05
+    DINGTALK_API_BASE=http://127.0.0.1:8900 gunicorn -c gunicorn.conf.py -w 2 run:app
+    DINGTALK_API_BASE=http://127.0.0.1:8900 GUNICORN_WORKER_CLASS=sync gunicorn -c gunicorn.conf.py -w 2 run:app
+    python tools/bench_login.py --target http://127.0.0.1:4888 --logins 2000 --concurrency 200 --probe /
+"""
+import argparse
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import requests
+
+_local = threading.local()
+
+
+def _session():
+    session = getattr(_local, 'session', None)
+    if session is None:
+        session = _local.session = requests.Session()
+    return session
+
+
+def percentile(values, q):
+    """
+    计算分位数（最近秩法）
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * len(ordered) + 0.5)) - 1)]
+
+
+def login(target, code, timeout):
+    """
+    发起一次登录，返回 (状态码或异常名, 耗时秒)
+    """
+    started = time.perf_counter()
+    try:
+        response = _session().post(f'{target}/api/auth/dingtalk/callback', json={'code': code}, timeout=timeout)
+        status = response.status_code
+    except requests.RequestException as e:
+        status = type(e).__name__
+    return status, time.perf_counter() - started
+
+
+def probe(target, path, interval, stop, samples):
+    """
+    在压测期间按固定间隔请求探测接口，记录延迟
+    """
+    session = requests.Session()
+    while not stop.is_set():
+        started = time.perf_counter()
+        try:
+            session.get(f'{target}{path}', timeout=30)
+        except requests.RequestException:
+            pass
+        samples.append(time.perf_counter() - started)
+        stop.wait(interval)
+
+
+def run(target, logins, concurrency, users, timeout, probe_path=None, probe_interval=0.1):
+    """
+    执行压测
+
+    Args:
+        target: 被测服务地址
+        logins: 登录总次数
+        concurrency: 并发客户端数
+        users: 不同用户数（授权码循环使用，模拟重复登录）
+        timeout: 单次请求超时（秒）
+        probe_path: 探测接口路径，为空时不探测
+        probe_interval: 探测间隔（秒）
+
+    Returns:
+        dict: 压测结果
+    """
+    stop = threading.Event()
+    probe_samples = []
+    prober = None
+    if probe_path:
+        prober = threading.Thread(target=probe, args=(target, probe_path, probe_interval, stop, probe_samples),
+                                  daemon=True)
+        prober.start()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda i: login(target, f'bench{i % users}', timeout), range(logins)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    if prober:
+        prober.join()
+
+    latencies = [latency for status, latency in results if status == 200]
+    summary = {
+        'logins': logins,
+        'concurrency': concurrency,
+        'elapsed': round(elapsed, 3),
+        'throughput': round(len(latencies) / elapsed, 1),
+        'status': dict(Counter(str(status) for status, _ in results)),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 1),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 1),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 1)
+    }
+    if probe_path:
+        summary['probe'] = {
+            'path': probe_path,
+            'samples': len(probe_samples),
+            'p50_ms': round(percentile(probe_samples, 50) * 1000, 1),
+            'p99_ms': round(percentile(probe_samples, 99) * 1000, 1)
+        }
+    return summary
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='钉钉登录吞吐量压测')
+    parser.add_argument('--target', default='http://127.0.0.1:4888', help='被测服务地址')
+    parser.add_argument('--logins', type=int, default=1000, help='登录总次数')
+    parser.add_argument('--concurrency', type=int, default=100, help='并发客户端数')
+    parser.add_argument('--users', type=int, default=500, help='不同用户数')
+    parser.add_argument('--timeout', type=float, default=30.0, help='单次请求超时（秒）')
+    parser.add_argument('--probe', default=None, help='压测期间同时请求的探测接口路径，如 /')
+    parser.add_argument('--probe-interval', type=float, default=0.1, help='探测间隔（秒）')
+    args = parser.parse_args()
+    result = run(args.target, args.logins, args.concurrency, args.users, args.timeout,
+                 args.probe, args.probe_interval)
+    for key, value in result.items():
+        print(f'{key}: {value}')
@@ -0,0 +1,158 @@
+"""
+本地模拟钉钉开放平台接口，用于离线压测登录流程
+
+实现登录用到的两个接口：
+    POST /v1.0/oauth2/userAccessToken  用授权码换取用户token
+    GET  /v1.0/contact/users/me         用用户token获取用户信息
+授权码即用户标识：同一个授权码总是对应同一个钉钉用户（unionId为 union-<code>）
+
+以及通讯录同步用到的接口（数据来自按参数生成的模拟通讯录，保存在 app.config['DIRECTORY']，可在测试中修改）：
+    POST /v1.0/oauth2/accessToken              获取企业内部应用token
+    POST /topapi/v2/department/listsubid       获取子部门ID列表
+    POST /topapi/v2/user/list                  分页获取部门成员
+app.config['FAILING_DEPARTMENTS'] 中的部门在后两个接口返回错误码，用于验证部门拉取失败时的处理
+
+用法:
+    python tools/fake_dingtalk.py --port 8900 --latency 0.05 --jitter 0.02 --error-rate 0.01
+    DINGTALK_API_BASE=http://127.0.0.1:8900 DINGTALK_OAPI_BASE=http://127.0.0.1:8900 python run.py
+"""
+import argparse
+import random
+import time
+from flask import Flask, request, jsonify
+
+APP_TOKEN = 'fake-app-token'
+
+
+def build_directory(departments=20, members_per_department=50):
+    """
+    生成模拟通讯录：部门1为根部门，部门i的上级为 max(1, i // 10)；
+    每50个成员中有1个同时属于根部门，用于验证跨部门成员去重
+
+    Args:
+        departments: 根部门以外的部门数量
+        members_per_department: 每个部门的成员数量
+
+    Returns:
+        dict: {'children': {部门ID: [子部门ID]}, 'members': {部门ID: [成员]}}
+    """
+    children = {1: []}
+    members = {1: []}
+    for dept_id in range(2, departments + 2):
+        children.setdefault(max(1, dept_id // 10), []).append(dept_id)
+        children.setdefault(dept_id, [])
+        members[dept_id] = []
+        for offset in range(members_per_department):
+            index = (dept_id - 2) * members_per_department + offset
+            member = {
+                'userid': f'user{index}',
+                'unionid': f'union-dir-{index}',
+                'name': f'员工{index}',
+                'email': f'user{index}@example.com',
+                'active': True
+            }
+            members[dept_id].append(member)
+            if index % 50 == 0:
+                members[1].append(member)
+    return {'children': children, 'members': members}
+
+
+def create_fake_app(latency=0.0, jitter=0.0, error_rate=0.0, directory=None):
+    """
+    创建模拟钉钉接口的Flask应用
+
+    Args:
+        latency: 每个请求的固定延迟（秒）
+        jitter: 延迟的随机波动范围（秒）
+        error_rate: 返回503的概率（0~1），用于验证重试和熔断
+        directory: 模拟通讯录，默认为 build_directory() 的结果
+
+    Returns:
+        Flask: 模拟服务应用
+    """
+    app = Flask('fake_dingtalk')
+    app.config['DIRECTORY'] = directory if directory is not None else build_directory()
+    app.config['FAILING_DEPARTMENTS'] = set()
+
+    @app.before_request
+    def simulate_network():
+        delay = latency + random.uniform(-jitter, jitter)
+        if delay > 0:
+            time.sleep(delay)
+        if error_rate and random.random() < error_rate:
+            return jsonify({'code': 'ServiceUnavailable', 'message': '模拟的服务不可用'}), 503
+
+    @app.route('/v1.0/oauth2/userAccessToken', methods=['POST'])
+    def user_access_token():
+        code = (request.get_json(silent=True) or {}).get('code')
+        if not code:
+            return jsonify({'code': 'invalidParameter', 'message': 'code不能为空'}), 400
+        return jsonify({
+            'accessToken': f'fake-{code}',
+            'refreshToken': f'fake-refresh-{code}',
+            'expireIn': 7200
+        })
+
+    @app.route('/v1.0/contact/users/me', methods=['GET'])
+    def users_me():
+        token = request.headers.get('x-acs-dingtalk-access-token', '')
+        if not token.startswith('fake-'):
+            return jsonify({'code': 'InvalidAuthentication', 'message': '无效的token'}), 401
+        code = token[len('fake-'):]
+        return jsonify({
+            'nick': f'压测用户{code}',
+            'unionId': f'union-{code}',
+            'openId': f'open-{code}',
+            'email': f'{code}@example.com'
+        })
+
+    @app.route('/v1.0/oauth2/accessToken', methods=['POST'])
+    def app_access_token():
+        data = request.get_json(silent=True) or {}
+        if 'appKey' not in data or 'appSecret' not in data:
+            return jsonify({'code': 'invalidParameter', 'message': 'appKey/appSecret不能为空'}), 400
+        return jsonify({'accessToken': APP_TOKEN, 'expireIn': 7200})
+
+    def oapi_result(result, dept_id=None):
+        if request.args.get('access_token') != APP_TOKEN:
+            return jsonify({'errcode': 40014, 'errmsg': '不合法的access_token'})
+        if dept_id in app.config['FAILING_DEPARTMENTS']:
+            return jsonify({'errcode': -1, 'errmsg': '系统繁忙'})
+        return jsonify({'errcode': 0, 'errmsg': 'ok', 'result': result})
+
+    @app.route('/topapi/v2/department/listsubid', methods=['POST'])
+    def list_sub_departments():
+        dept_id = (request.get_json(silent=True) or {}).get('dept_id')
+        return oapi_result({'dept_id_list': app.config['DIRECTORY']['children'].get(dept_id, [])}, dept_id)
+
+    @app.route('/topapi/v2/user/list', methods=['POST'])
+    def list_department_users():
+        data = request.get_json(silent=True) or {}
+        dept_id = data.get('dept_id')
+        members = app.config['DIRECTORY']['members'].get(dept_id, [])
+        cursor = int(data.get('cursor') or 0)
+        size = min(int(data.get('size') or 100), 100)
+        page = members[cursor:cursor + size]
+        has_more = cursor + size < len(members)
+        return oapi_result({
+            'has_more': has_more,
+            'next_cursor': cursor + size if has_more else None,
+            'list': page
+        }, dept_id)
+
+    return app
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='本地模拟钉钉开放平台接口')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8900)
+    parser.add_argument('--latency', type=float, default=0.0, help='每个请求的固定延迟（秒）')
+    parser.add_argument('--jitter', type=float, default=0.0, help='延迟的随机波动范围（秒）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='返回503的概率（0~1）')
+    parser.add_argument('--departments', type=int, default=20, help='模拟通讯录的部门数量')
+    parser.add_argument('--members-per-department', type=int, default=50, help='每个部门的成员数量')
+    args = parser.parse_args()
+    fake_app = create_fake_app(args.latency, args.jitter, args.error_rate,
+                               build_directory(args.departments, args.members_per_department))
+    fake_app.run(host=args.host, port=args.port, threaded=True)
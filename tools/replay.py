@@ -0,0 +1,464 @@
+"""
+请求回放压测
+
+按请求日志或合成的流量配比并发回放请求，按接口统计吞吐量、错误率和延迟分位数，
+用于在本地复现早高峰的集中登录+浏览报表。
+
+请求来源（二选一）:
+    --log   请求日志：app/utils/request_log.py 写入的JSON行日志（app/request.log，含查询参数和用户ID，
+            开启 REQUEST_LOG_BODY 时含请求体），也兼容旧版 run.py 写入 app/log.log 的
+            "请求开始 | 方法 路径 | 数据: ..." 行（没有查询参数和用户ID）
+    --spec  流量配比（JSON），见 tools/replay_morning_peak.json：
+            {
+              "requests": 5000,
+              "users": {"role": "user", "count": 500},
+              "params": {"report_id": {"range": [1, 2000]}},
+              "mix": [
+                {"name": "登录", "weight": 5, "method": "POST", "path": "/api/auth/dingtalk/callback",
+                 "json": {"code": "bench-{user_id}"}, "auth": false},
+                {"weight": 40, "path": "/api/reports", "query": "limit=50"},
+                {"weight": 20, "path": "/api/reports/{report_id}"}
+              ]
+            }
+            path/query/json 中的 {user_id} 为当前虚拟用户，{n} 为请求序号，其他占位符从 params 中随机取值
+            （列表或 {"range": [最小, 最大]}；进程内回放时 report_id/group_id 未配置则从数据库中取）
+
+被测对象（二选一）:
+    进程内（默认）  按 DATABASE_URL 创建应用，用 Flask 测试客户端回放，会话中直接写入用户ID
+    --target URL    回放到运行中的服务，每个虚拟用户先用钉钉授权码登录（配合 tools/fake_dingtalk.py，
+                    授权码 bench-<用户ID> 对应 flask seed-bench 生成的用户）
+
+默认只回放 GET 请求并跳过登出；--writes 回放全部方法（会修改数据库，请使用测试库）。
+
+用法:
+    DATABASE_URL=sqlite:///benchmarks/.data/bench_small.db python tools/replay.py --log app/request.log --concurrency 16
+    python tools/replay.py --spec tools/replay_morning_peak.json --target http://127.0.0.1:4888 --rate 200 --writes
+"""
+import argparse
+import ast
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import urlencode
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from bench_login import percentile
+
+# 旧版 run.py 经 loguru 写入的请求行
+_LEGACY_LINE = re.compile(
+    r'^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d+) \|.*?请求开始 \| (\w+) (\S+) \| 数据: (.*)$')
+_NUMERIC_SEGMENT = re.compile(r'/\d+(?=/|$)')
+_PLACEHOLDER = re.compile(r'\{(\w+)\}')
+
+# 默认不回放的路径（登出会使虚拟用户的会话失效）
+DEFAULT_EXCLUDE = r'^/api/auth/logout$|^/metrics$'
+
+
+class Job:
+    """
+    一个待回放的请求
+    """
+
+    __slots__ = ('label', 'method', 'path', 'query', 'body', 'user_id', 'at')
+
+    def __init__(self, label, method, path, query=None, body=None, user_id=None, at=0.0):
+        self.label = label
+        self.method = method
+        self.path = path
+        self.query = query
+        self.body = body
+        self.user_id = user_id
+        # 相对开始时间的计划发出时间（秒）
+        self.at = at
+
+
+def endpoint_label(method, path):
+    """
+    统计分组名：方法 + 把数字段替换为 <id> 的路径
+    """
+    return f'{method} {_NUMERIC_SEGMENT.sub("/<id>", path)}'
+
+
+def _parse_ts(value):
+    try:
+        return datetime.fromisoformat(value.rstrip('Z')).timestamp()
+    except (AttributeError, ValueError):
+        return None
+
+
+def _parse_body(value):
+    """
+    日志中的请求体：截断（以...结尾）或无法解析时返回 None
+    """
+    if not value or value.endswith('...'):
+        return None
+    try:
+        return json.loads(value)
+    except ValueError:
+        return None
+
+
+def load_log(path, limit=None):
+    """
+    解析请求日志
+
+    Args:
+        path: 日志文件路径（JSON行日志或旧版 loguru 日志，可混合）
+        limit: 最多读取的请求数
+
+    Returns:
+        list: [(时间戳或None, Job)]
+    """
+    entries = []
+    with open(path, encoding='utf-8', errors='replace') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith('{'):
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if 'method' not in entry or 'path' not in entry:
+                    continue
+                job = Job(endpoint_label(entry['method'], entry['path']), entry['method'], entry['path'],
+                          query=entry.get('query'), body=_parse_body(entry.get('request_body')),
+                          user_id=entry.get('user_id'))
+                entries.append((_parse_ts(entry.get('ts')), job))
+            else:
+                match = _LEGACY_LINE.match(line)
+                if not match:
+                    continue
+                ts, method, request_path, data = match.groups()
+                try:
+                    body = ast.literal_eval(data)
+                except (ValueError, SyntaxError):
+                    body = None
+                job = Job(endpoint_label(method, request_path), method, request_path, body=body)
+                entries.append((datetime.strptime(ts, '%Y-%m-%d %H:%M:%S.%f').timestamp(), job))
+            if limit and len(entries) >= limit:
+                break
+    return entries
+
+
+def _fill(value, values):
+    """
+    替换字符串（或JSON结构中字符串）里的占位符
+    """
+    if isinstance(value, str):
+        if value.startswith('{') and value.endswith('}') and _PLACEHOLDER.fullmatch(value):
+            # 整个值就是一个占位符时保留原类型（如数字ID）
+            return values[value[1:-1]]
+        return _PLACEHOLDER.sub(lambda m: str(values[m.group(1)]), value)
+    if isinstance(value, dict):
+        return {k: _fill(v, values) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_fill(v, values) for v in value]
+    return value
+
+
+def _param_pool(spec_value):
+    if isinstance(spec_value, dict) and 'range' in spec_value:
+        low, high = spec_value['range']
+        return range(low, high + 1)
+    return list(spec_value)
+
+
+def build_spec_jobs(spec, user_ids, params, requests_count, seed=42):
+    """
+    按流量配比生成请求序列
+
+    Args:
+        spec: 流量配比
+        user_ids: 虚拟用户ID列表
+        params: 占位符取值 {名称: 候选值序列}
+        requests_count: 请求数
+        seed: 随机种子
+
+    Returns:
+        list: [Job]
+    """
+    rng = random.Random(seed)
+    mix = spec['mix']
+    weights = [item.get('weight', 1) for item in mix]
+    jobs = []
+    for n, item in enumerate(rng.choices(mix, weights=weights, k=requests_count)):
+        user_id = rng.choice(user_ids) if user_ids else None
+        values = defaultdict(lambda: None, {'user_id': user_id, 'n': n})
+        for name in set(_PLACEHOLDER.findall(json.dumps([item.get('path'), item.get('query'), item.get('json')],
+                                                        ensure_ascii=False))) - {'user_id', 'n'}:
+            if name not in params:
+                raise SystemExit(f'占位符 {{{name}}} 未在 params 中配置')
+            values[name] = rng.choice(params[name])
+        method = item.get('method', 'GET').upper()
+        path = _fill(item['path'], values)
+        jobs.append(Job(item.get('name') or f'{method} {item["path"]}', method, path,
+                        query=_fill(item.get('query'), values), body=_fill(item.get('json'), values),
+                        user_id=user_id if item.get('auth', True) else None))
+    return jobs
+
+
+class InProcessClient:
+    """
+    进程内回放：每个线程按用户缓存已写入会话的测试客户端
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._local = threading.local()
+
+    def _client(self, user_id):
+        clients = getattr(self._local, 'clients', None)
+        if clients is None:
+            clients = self._local.clients = {}
+        client = clients.get(user_id)
+        if client is None:
+            client = clients[user_id] = self.app.test_client()
+            if user_id is not None:
+                with client.session_transaction() as session:
+                    session['_user_id'] = str(user_id)
+                    session['_fresh'] = True
+        return client
+
+    def send(self, job, timeout):
+        response = self._client(job.user_id).open(job.path, method=job.method, query_string=job.query,
+                                                  json=job.body)
+        response.close()
+        return response.status_code
+
+
+class HttpClient:
+    """
+    回放到运行中的服务：每个虚拟用户首次请求前用钉钉授权码登录一次，会话cookie在线程间共享
+    """
+
+    def __init__(self, target, login_code):
+        self.target = target.rstrip('/')
+        self.login_code = login_code
+        self._cookies = {}
+        # 每个用户一把登录锁：同一用户只登录一次，不同用户的登录并发进行
+        self._login_locks = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _session(self):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def _cookies_for(self, user_id, timeout):
+        if user_id is None:
+            return None
+        cookies = self._cookies.get(user_id)
+        if cookies is None:
+            with self._lock:
+                login_lock = self._login_locks.setdefault(user_id, threading.Lock())
+            with login_lock:
+                cookies = self._cookies.get(user_id)
+                if cookies is None:
+                    response = requests.post(f'{self.target}/api/auth/dingtalk/callback',
+                                             json={'code': self.login_code.format(user_id=user_id)}, timeout=timeout)
+                    if response.status_code != 200:
+                        raise RuntimeError(f'用户 {user_id} 登录失败: {response.status_code} {response.text[:200]}')
+                    cookies = self._cookies[user_id] = response.cookies.get_dict()
+        return cookies
+
+    def send(self, job, timeout):
+        url = f'{self.target}{job.path}'
+        if job.query:
+            url = f'{url}?{job.query if isinstance(job.query, str) else urlencode(job.query)}'
+        response = self._session().request(job.method, url, json=job.body, timeout=timeout,
+                                           cookies=self._cookies_for(job.user_id, timeout))
+        return response.status_code
+
+
+def _send(client, job, started, timeout):
+    """
+    等到计划时间后发出请求，返回 (分组名, 状态码或异常名, 耗时秒, 相对计划的延后秒数)
+    """
+    delay = started + job.at - time.perf_counter()
+    if delay > 0:
+        time.sleep(delay)
+    sent = time.perf_counter()
+    try:
+        status = client.send(job, timeout)
+    except Exception as e:
+        status = type(e).__name__
+    return job.label, status, time.perf_counter() - sent, sent - started - job.at
+
+
+def summarize(results, elapsed, paced=False):
+    """
+    按接口汇总：请求数、吞吐量、错误率（5xx和异常）、状态码分布、延迟分位数
+    """
+    def stats(items):
+        latencies = [latency for _, _, latency, _ in items]
+        errors = sum(1 for _, status, _, _ in items if not isinstance(status, int) or status >= 500)
+        return {
+            'requests': len(items),
+            'throughput': round(len(items) / elapsed, 1) if elapsed else 0.0,
+            'error_rate': round(errors / len(items), 4) if items else 0.0,
+            'status': dict(Counter(str(status) for _, status, _, _ in items)),
+            'p50_ms': round(percentile(latencies, 50) * 1000, 1),
+            'p95_ms': round(percentile(latencies, 95) * 1000, 1),
+            'p99_ms': round(percentile(latencies, 99) * 1000, 1)
+        }
+
+    groups = defaultdict(list)
+    for item in results:
+        groups[item[0]].append(item)
+    total = stats(results)
+    total['elapsed'] = round(elapsed, 3)
+    if paced:
+        # 发出时间相对计划的延后：持续偏大说明并发数不足以维持目标速率
+        total['lag_p99_ms'] = round(percentile([max(lag, 0.0) for _, _, _, lag in results], 99) * 1000, 1)
+    return {'total': total,
+            'endpoints': {label: stats(items) for label, items in sorted(groups.items(),
+                                                                       key=lambda kv: -len(kv[1]))}}
+
+
+def schedule(jobs, rate=None, timestamps=None, speed=1.0):
+    """
+    设置计划发出时间：按固定速率（开环），或按日志中的原始间隔（除以 speed 加速）；
+    都不指定时尽快发出（闭环，受并发数限制）
+    """
+    if rate:
+        for index, job in enumerate(jobs):
+            job.at = index / rate
+    elif timestamps and all(ts is not None for ts in timestamps):
+        first = timestamps[0]
+        for job, ts in zip(jobs, timestamps):
+            job.at = max(ts - first, 0.0) / speed
+    return jobs
+
+
+def run(client, jobs, concurrency, timeout=30.0):
+    """
+    并发回放
+
+    Args:
+        client: InProcessClient 或 HttpClient
+        jobs: 已设置计划时间的请求列表
+        concurrency: 并发数
+        timeout: 单次请求超时（秒，仅 HTTP 回放）
+
+    Returns:
+        dict: 汇总结果
+    """
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda job: _send(client, job, started, timeout), jobs))
+    return summarize(results, time.perf_counter() - started, paced=any(job.at for job in jobs))
+
+
+def _create_app():
+    # 回放的请求不再写入请求日志
+    os.environ['REQUEST_LOG_ENABLED'] = 'False'
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from app import create_app
+    return create_app()
+
+
+def _db_values(app, spec, names):
+    """
+    进程内回放时从数据库取虚拟用户和占位符候选值
+    """
+    from app import db
+    from app.models.user import User
+    from app.models.report import Report
+    from app.models.role_group import RoleGroup
+
+    sources = {'report_id': Report.id, 'group_id': RoleGroup.id, 'user_id': User.id}
+    users = spec.get('users', {})
+    with app.app_context():
+        user_ids = users.get('ids')
+        if not user_ids:
+            query = db.session.query(User.id).filter(User.is_active.is_(True))
+            if users.get('role'):
+                query = query.filter(User.role == users['role'])
+            user_ids = [row[0] for row in query.order_by(User.id).limit(users.get('count', 100))]
+        params = {name: [row[0] for row in db.session.query(sources[name])] for name in names if name in sources}
+    return user_ids, params
+
+
+def main():
+    parser = argparse.ArgumentParser(description='请求回放压测')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--log', help='请求日志路径（app/request.log 或旧版 app/log.log）')
+    source.add_argument('--spec', help='流量配比JSON文件')
+    parser.add_argument('--target', default=None, help='被测服务地址，不指定时进程内回放')
+    parser.add_argument('--concurrency', type=int, default=16, help='并发数')
+    parser.add_argument('--rate', type=float, default=None, help='目标速率（请求/秒），不指定时尽快发出')
+    parser.add_argument('--speed', type=float, default=None, help='按日志原始间隔回放的加速倍数（仅 --log）')
+    parser.add_argument('--requests', type=int, default=None, help='请求数（日志为最多读取的条数，配比默认取 requests）')
+    parser.add_argument('--as-user', type=int, default=None, help='日志中已登录的请求统一以该用户身份回放')
+    parser.add_argument('--writes', action='store_true', help='回放全部方法（默认只回放GET）')
+    parser.add_argument('--include', default=None, help='只回放路径匹配该正则的请求')
+    parser.add_argument('--exclude', default=DEFAULT_EXCLUDE, help='跳过路径匹配该正则的请求')
+    parser.add_argument('--login-code', default='bench-{user_id}', help='HTTP回放时虚拟用户的钉钉授权码模板')
+    parser.add_argument('--timeout', type=float, default=30.0, help='单次请求超时（秒）')
+    parser.add_argument('--seed', type=int, default=42, help='随机种子')
+    parser.add_argument('--json', action='store_true', help='以JSON输出结果')
+    args = parser.parse_args()
+
+    app = None if args.target else _create_app()
+    timestamps = None
+    if args.log:
+        entries = load_log(args.log, args.requests)
+        timestamps = [ts for ts, _ in entries]
+        jobs = [job for _, job in entries]
+        if args.as_user is not None:
+            for job in jobs:
+                if job.user_id is not None:
+                    job.user_id = args.as_user
+    else:
+        with open(args.spec, encoding='utf-8') as f:
+            spec = json.load(f)
+        params = {name: _param_pool(value) for name, value in spec.get('params', {}).items()}
+        if app is not None:
+            user_ids, db_params = _db_values(app, spec, ['report_id', 'group_id'])
+            params = {**db_params, **params}
+        else:
+            users = spec.get('users', {})
+            user_ids = users.get('ids') or list(range(1, users.get('count', 100) + 1))
+        jobs = build_spec_jobs(spec, user_ids, params, args.requests or spec.get('requests', 1000), args.seed)
+
+    include = re.compile(args.include) if args.include else None
+    exclude = re.compile(args.exclude) if args.exclude else None
+    kept = [(job, ts) for job, ts in zip(jobs, timestamps or [None] * len(jobs))
+            if (args.writes or job.method == 'GET')
+            and (include is None or include.search(job.path))
+            and (exclude is None or not exclude.search(job.path))]
+    if not kept:
+        raise SystemExit('没有可回放的请求')
+    jobs = [job for job, _ in kept]
+    schedule(jobs, rate=args.rate, timestamps=[ts for _, ts in kept] if args.speed else None, speed=args.speed or 1.0)
+
+    client = HttpClient(args.target, args.login_code) if args.target else InProcessClient(app)
+    result = run(client, jobs, args.concurrency, args.timeout)
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+        return
+    total = result['total']
+    print(f"requests: {total['requests']}  elapsed: {total['elapsed']}s  throughput: {total['throughput']}/s  "
+          f"error_rate: {total['error_rate']}  p50/p95/p99: {total['p50_ms']}/{total['p95_ms']}/{total['p99_ms']} ms"
+          + (f"  lag_p99: {total['lag_p99_ms']} ms" if 'lag_p99_ms' in total else ''))
+    # 接口名可能含中文，放在最后一列避免对不齐
+    print(f"{'requests':>8}  {'rps':>8}  {'errors':>7}  {'p50_ms':>8}  {'p95_ms':>8}  {'p99_ms':>8}  endpoint  status")
+    for label, stats in result['endpoints'].items():
+        print(f"{stats['requests']:>8}  {stats['throughput']:>8}  {stats['error_rate']:>7.2%}  "
+              f"{stats['p50_ms']:>8}  {stats['p95_ms']:>8}  {stats['p99_ms']:>8}  {label}  {stats['status']}")
+
+
+if __name__ == '__main__':
+    main()